@@ -0,0 +1,52 @@
+import copy
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+from app.config import ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL
+
+
+class AnswerCache:
+    """LRU + TTL cache of finished answers, keyed on the parse and both boards' data versions."""
+
+    def __init__(self, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key):
+        """Return `(answer, age_seconds)` for a live entry, or None."""
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(entry[1]), now - entry[0]
+
+    def put(self, key, answer):
+        entry = (monotonic(), copy.deepcopy(answer))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+answer_cache = AnswerCache()
@@ -1,9 +1,20 @@
+import asyncio
 import json
+import threading
+import weakref
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from app.config import GEMINI_API_KEY, GEMINI_MODEL
+try:
+    import httpx
+except ModuleNotFoundError:
+    httpx = None
+
+from app.agent.parse_cache import get_parse_cache
+from app.config import GEMINI_API_KEY, GEMINI_MODEL, GEMINI_POOL_MAXSIZE, GEMINI_TIMEOUT
+from app.tools.trace import trace_span
 
 ALLOWED_INTENTS = {
     "pipeline",
@@ -25,6 +36,33 @@ ALLOWED_SECTORS = {
 
 DEFAULT_CLARIFICATION = "Which timeframe should I use (this quarter, last quarter, this month, or all-time)?"
 
+SYSTEM_PROMPT = (
+    "You are an intent parser for a BI agent. Return ONLY valid JSON with keys: "
+    "intent, sector, timeframe, needs_clarification, clarification_question. "
+    "intent must be one of: pipeline, receivables, conversion, sector_performance, overview. "
+    "sector must be one of: mining, renewables, railways, powerline, construction, others, or null. "
+    "timeframe must be a short phrase such as this quarter, last month, Q3 2025, March 2025, 2025, "
+    "2025-01-01 to 2025-03-31, or all-time, or null when none is given. "
+    "If timeframe is missing for a business summary question, set needs_clarification=true "
+    "and provide a short clarification_question."
+)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Shared keep-alive session for Gemini calls, so repeat questions skip the TLS handshake."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=GEMINI_POOL_MAXSIZE))
+                _session = session
+    return _session
+
 
 def _validate_payload(payload: dict[str, Any]) -> dict[str, Any]:
     intent = str(payload.get("intent", "overview")).strip()
@@ -53,39 +91,34 @@ def _validate_payload(payload: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def parse_query_with_llm(question: str) -> dict[str, Any]:
-    if not GEMINI_API_KEY:
-        raise RuntimeError("GEMINI_API_KEY is not configured")
-
-    system = (
-        "You are an intent parser for a BI agent. Return ONLY valid JSON with keys: "
-        "intent, sector, timeframe, needs_clarification, clarification_question. "
-        "intent must be one of: pipeline, receivables, conversion, sector_performance, overview. "
-        "sector must be one of: mining, renewables, railways, powerline, construction, others, or null. "
-        "If timeframe is missing for a business summary question, set needs_clarification=true "
-        "and provide a short clarification_question."
-    )
+def _cached_parse(question, tracer):
+    """Validated cached parse of `question`, or None; the lookup is traced."""
+    cache = get_parse_cache()
+    if not cache.enabled:
+        return None
+    with trace_span(tracer, "llm_parse_cache", rows=0) as span:
+        cached = cache.get(question, GEMINI_MODEL, SYSTEM_PROMPT)
+        span.detail = f"{'hit' if cached is not None else 'miss'}: model={GEMINI_MODEL}"
+    return None if cached is None else _validate_payload(cached)
 
-    user = f"Question: {question}"
 
+def _gemini_request(question):
     url = (
         f"https://generativelanguage.googleapis.com/v1beta/models/"
         f"{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
     )
-
     payload = {
-        "system_instruction": {"parts": [{"text": system}]},
-        "contents": [{"role": "user", "parts": [{"text": user}]}],
+        "system_instruction": {"parts": [{"text": SYSTEM_PROMPT}]},
+        "contents": [{"role": "user", "parts": [{"text": f"Question: {question}"}]}],
         "generationConfig": {
             "temperature": 0,
             "responseMimeType": "application/json",
         },
     }
+    return url, payload
 
-    resp = requests.post(url, json=payload, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
 
+def _gemini_result(question, data):
     try:
         text = data["candidates"][0]["content"]["parts"][0]["text"]
     except Exception as exc:
@@ -94,4 +127,60 @@ def parse_query_with_llm(question: str) -> dict[str, Any]:
     parsed = json.loads(text)
     if not isinstance(parsed, dict):
         raise RuntimeError("Gemini returned non-dict payload")
-    return _validate_payload(parsed)
+    result = _validate_payload(parsed)
+    cache = get_parse_cache()
+    if cache.enabled:
+        cache.put(question, GEMINI_MODEL, SYSTEM_PROMPT, result)
+    return result
+
+
+def parse_query_with_llm(question: str, tracer=None) -> dict[str, Any]:
+    """Parse `question` with Gemini, checking the parse cache first."""
+    cached = _cached_parse(question, tracer)
+    if cached is not None:
+        return cached
+    if not GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY is not configured")
+
+    url, payload = _gemini_request(question)
+    resp = get_session().post(url, json=payload, timeout=GEMINI_TIMEOUT)
+    resp.raise_for_status()
+    return _gemini_result(question, resp.json())
+
+
+# httpx async clients are bound to the event loop they were first used on.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _async_client():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = httpx.AsyncClient(
+            timeout=GEMINI_TIMEOUT,
+            limits=httpx.Limits(max_connections=GEMINI_POOL_MAXSIZE, max_keepalive_connections=GEMINI_POOL_MAXSIZE),
+        )
+    return client
+
+
+async def aclose_async_client():
+    """Close the running loop's Gemini client, if it opened one."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def parse_query_with_llm_async(question: str, tracer=None) -> dict[str, Any]:
+    """Async `parse_query_with_llm`; cache lookups run in worker threads."""
+    if httpx is None:
+        return await asyncio.to_thread(parse_query_with_llm, question, tracer)
+    cached = await asyncio.to_thread(_cached_parse, question, tracer)
+    if cached is not None:
+        return cached
+    if not GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY is not configured")
+
+    url, payload = _gemini_request(question)
+    resp = await _async_client().post(url, json=payload)
+    resp.raise_for_status()
+    return await asyncio.to_thread(_gemini_result, question, resp.json())
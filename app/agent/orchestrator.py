@@ -1,19 +1,148 @@
+import asyncio
+import atexit
+import copy
+import re
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from functools import partial
+from time import perf_counter, perf_counter_ns
+
+from app.config import (
+    BATCH_PARSE_WORKERS,
+    GEMINI_API_KEY,
+    LLM_LATENCY_BUDGET,
+    MONDAY_SNAPSHOT_MAX_STALENESS,
+    RULES_CONFIDENCE_THRESHOLD,
+    SPECULATIVE_PREFETCH,
+)
+from app.schemas import matches_ci
+from app.tools.monday_async import aclose_async_client as aclose_monday_client
 from app.tools.trace import Tracer
-from app.tools.deals_tool import get_deals
-from app.tools.work_orders_tool import get_work_orders
-from app.agent.llm_router import DEFAULT_CLARIFICATION, parse_query_with_llm
-from app.services.analytics import (
-    pipeline_summary,
-    receivable_summary,
-    cross_board_overlap,
-    pipeline_by_stage_status,
-    sector_performance,
-    conversion_metrics,
-    receivable_risk,
+from app.tools.deals_tool import (
+    DATE_COLUMN as DEALS_DATE_COLUMN,
+    data_version as deals_version,
+    get_deals,
+    get_deals_async,
+)
+from app.tools.work_orders_tool import (
+    DATE_COLUMN as WO_DATE_COLUMN,
+    data_version as work_orders_version,
+    get_work_orders,
+    get_work_orders_async,
 )
+from app.agent.answer_cache import answer_cache
+from app.agent.llm_router import (
+    ALLOWED_INTENTS,
+    DEFAULT_CLARIFICATION,
+    aclose_async_client as aclose_llm_client,
+    parse_query_with_llm,
+    parse_query_with_llm_async,
+)
+from app.services.cube import cube_views
+from app.services.metrics import MetricsEngine
+from app.services.timeframe import filter_frame, resolve_timeframe
 
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+_LLM_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-parse")
+# Tasks that must outlive the request that started them (LLM parses that
+# missed their budget still warm the parse cache).
+_BACKGROUND_TASKS = set()
+_loop = None
+_loop_lock = threading.Lock()
+SECTOR_COLUMNS = {"get_deals": "Sector/service", "get_work_orders": "Sector"}
 SECTORS = ["mining", "renewables", "railways", "powerline", "construction", "others"]
+# Logical columns each intent reads from each board. pipeline_summary,
+# receivable_summary and cross_board_overlap run for every intent, so their
+# inputs are part of every projection.
+_BASE_DEAL_COLUMNS = ["Deal Name", "Deal Status", "Deal Stage"]
+_BASE_WO_COLUMNS = ["Deal name masked", "Amount Receivable (Masked)"]
+INTENT_COLUMNS = {
+    "pipeline": {
+        "get_deals": _BASE_DEAL_COLUMNS,
+        "get_work_orders": _BASE_WO_COLUMNS,
+    },
+    "conversion": {
+        "get_deals": _BASE_DEAL_COLUMNS,
+        "get_work_orders": _BASE_WO_COLUMNS,
+    },
+    "receivables": {
+        "get_deals": _BASE_DEAL_COLUMNS,
+        "get_work_orders": _BASE_WO_COLUMNS + ["Sector"],
+    },
+    "sector_performance": {
+        "get_deals": _BASE_DEAL_COLUMNS + ["Sector/service"],
+        "get_work_orders": _BASE_WO_COLUMNS + ["Sector"],
+    },
+    "overview": {
+        "get_deals": _BASE_DEAL_COLUMNS + ["Sector/service"],
+        "get_work_orders": _BASE_WO_COLUMNS + ["Sector"],
+    },
+}
+# Metrics each intent reports. The first three feed the common answer fields.
+_BASE_METRICS = ["pipeline_summary", "receivable_summary", "cross_board_overlap"]
+INTENT_METRICS = {
+    "pipeline": _BASE_METRICS + ["pipeline_by_stage_status"],
+    "sector_performance": _BASE_METRICS + ["sector_performance"],
+    "conversion": _BASE_METRICS + ["conversion_metrics"],
+    "receivables": _BASE_METRICS + ["receivable_risk"],
+    "overview": _BASE_METRICS
+    + ["pipeline_by_stage_status", "conversion_metrics", "receivable_risk", "sector_performance"],
+}
 TIME_HINTS = ["this quarter", "last quarter", "this month", "last month", "this year", "last year", "all-time", "q1", "q2", "q3", "q4"]
+# Questions about closed deals filter deals on the actual close date instead
+# of the created date. Close dates are sparse, so this is opt-in.
+CLOSE_DATE_HINTS = ["closed", "close date", "closing"]
+# Words that signal a time window. Any of them left out of the resolved
+# timeframe's label ("h1 2025" resolving to "2025", "last two quarters" to
+# nothing) means the rules misread the window, so the parse loses confidence.
+TIME_WORDS = re.compile(
+    r"\b(?:q[1-4]|h[12]|half|quarters?|months?|weeks?|years?|days?|past|last|previous|since|ytd|20\d{2})\b"
+)
+TIME_WORD_ALIASES = {"past": "last", "previous": "last", "ytd": "year"}
+# Keyword groups per intent, in the priority order `_detect_intent` applies
+# them. Questions matching none of them default to "overview".
+INTENT_KEYWORDS = [
+    ("receivables", ["receivable", "collection", "outstanding", "accounts receivable"]),
+    ("conversion", ["conversion", "won rate", "win rate", "dead rate"]),
+    ("sector_performance", ["sector", "industry", "segment"]),
+    ("pipeline", ["stage", "pipeline"]),
+    ("overview", ["overview", "summary", "snapshot"]),
+]
+
+
+def _event_loop():
+    """The shared event loop sync callers run on, started on first use."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="orchestrator-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+async def aclose_clients():
+    """Close the HTTP clients the running loop opened; await before a loop you own shuts down."""
+    await asyncio.gather(aclose_monday_client(), aclose_llm_client())
+
+
+@atexit.register
+def _shutdown_event_loop(timeout=5):
+    loop = _loop
+    if loop is None or not loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(aclose_clients(), loop).result(timeout)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def _background(coro):
+    task = asyncio.ensure_future(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return task
 
 
 def _extract_sector(q):
@@ -24,92 +153,476 @@ def _extract_sector(q):
 
 
 def _detect_intent(q):
-    if any(k in q for k in ["receivable", "collection", "outstanding", "accounts receivable"]):
-        return "receivables"
-    if any(k in q for k in ["conversion", "won rate", "win rate", "dead rate"]):
-        return "conversion"
-    if any(k in q for k in ["sector", "industry", "segment"]):
-        return "sector_performance"
-    if any(k in q for k in ["stage", "pipeline"]):
-        return "pipeline"
+    for intent, keywords in INTENT_KEYWORDS:
+        if any(k in q for k in keywords):
+            return intent
     return "overview"
 
 
+def _score_rules(q):
+    """Keyword-rule parse plus how unambiguous it is, as `(parsed, confidence, reasons)`."""
+    intents = [intent for intent, keywords in INTENT_KEYWORDS if any(k in q for k in keywords)]
+    sectors = [s for s in SECTORS if s in q]
+    timeframe = _extract_timeframe(q)
+    confidence, reasons = 0.0, []
+
+    if len(intents) == 1:
+        confidence += 0.5
+        reasons.append(f"intent={intents[0]}")
+    elif intents:
+        confidence += 0.25
+        reasons.append(f"ambiguous_intent={'/'.join(intents)}")
+    else:
+        confidence += 0.1
+        reasons.append("no_intent_keyword")
+
+    if len(sectors) == 1:
+        confidence += 0.2
+        reasons.append(f"sector={sectors[0]}")
+    elif sectors:
+        reasons.append(f"multiple_sectors={'/'.join(sectors)}")
+    else:
+        confidence += 0.15
+        reasons.append("no_sector")
+
+    if timeframe:
+        confidence += 0.3
+        reasons.append(f"timeframe={timeframe}")
+    else:
+        reasons.append("no_timeframe")
+
+    unused = _unused_time_words(q, timeframe)
+    if unused:
+        confidence -= 0.3
+        reasons.append(f"unresolved_time_words={'/'.join(unused)}")
+
+    intent = _detect_intent(q)
+    parsed = {
+        "source": "rules",
+        "intent": intent if intent in ALLOWED_INTENTS else "overview",
+        "sector": _extract_sector(q),
+        "timeframe": timeframe,
+        "needs_clarification": _needs_time_clarification(q),
+        "clarification_question": DEFAULT_CLARIFICATION,
+    }
+    return parsed, round(max(confidence, 0.0), 2), reasons
+
+
+def _unused_time_words(q, timeframe):
+    """Time words in `q` that do not appear in the resolved timeframe label."""
+    label = {_time_word(w) for w in re.findall(r"[a-z0-9]+", (timeframe or "").lower())}
+    words = []
+    for word in TIME_WORDS.findall(q):
+        if _time_word(word) not in label and word not in words:
+            words.append(word)
+    return words
+
+
+def _time_word(word):
+    word = TIME_WORD_ALIASES.get(word, word)
+    return word[:-1] if word.endswith("s") and not word[:-1].isdigit() else word
+
+
+class ParsePathStats:
+    """How often each parse path answered, for the rules fast-path hit rate."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"rules": 0, "llm": 0, "rules_fallback": 0}
+
+    def record(self, path):
+        with self._lock:
+            self.counts[path] += 1
+
+    @property
+    def fast_path_hit_rate(self):
+        with self._lock:
+            total = sum(self.counts.values())
+            return self.counts["rules"] / total if total else 0.0
+
+
+parse_path_stats = ParsePathStats()
+
+
+def _extract_timeframe(q):
+    timeframe = resolve_timeframe(q)
+    if timeframe is not None:
+        return timeframe.label
+    return "all-time" if "all-time" in q or "all time" in q else None
+
+
 def _needs_time_clarification(q):
     business = any(k in q for k in ["pipeline", "revenue", "sector", "performance", "receivable", "deals", "conversion"])
-    has_time = any(t in q for t in TIME_HINTS)
+    has_time = any(t in q for t in TIME_HINTS) or resolve_timeframe(q) is not None
     return business and not has_time
 
 
-def _scope_text(sector):
-    return f"for {sector.title()}" if sector else "across all sectors"
+def _resolve_timeframe(parsed, question):
+    """Turn the parsed timeframe text into a date range (None means all-time)."""
+    text = parsed.get("timeframe")
+    if text and "all" in text.lower() and "time" in text.lower():
+        return None
+    return resolve_timeframe(text) or resolve_timeframe(question)
+
+
+def _date_columns(q):
+    deals_column = "Close Date (A)" if any(k in q for k in CLOSE_DATE_HINTS) else DEALS_DATE_COLUMN
+    return {"get_deals": deals_column, "get_work_orders": WO_DATE_COLUMN}
+
+
+def _timeframe_phrase(timeframe):
+    label = timeframe.label
+    if label.startswith("last ") and label[5:6].isdigit():
+        return f"over the {label}"
+    if label.startswith(("this ", "last ", "since ", "year to date")):
+        return label
+    if " to " in label:
+        return f"from {label}"
+    return f"in {label}"
+
+
+def _scope_text(sector, timeframe=None):
+    scope = f"for {sector.title()}" if sector else "across all sectors"
+    return f"{scope} {_timeframe_phrase(timeframe)}" if timeframe else scope
+
+
+def _timeframe_caveats(timeframe, date_columns, deals, wos):
+    caveats = [
+        f"Timeframe {timeframe.describe()} applied to deals by {date_columns['get_deals']} "
+        f"and to work orders by {date_columns['get_work_orders']}."
+    ]
+    undated_deals = deals.attrs.get("undated_rows", 0)
+    undated_wos = wos.attrs.get("undated_rows", 0)
+    if undated_deals or undated_wos:
+        caveats.append(
+            f"Excluded {undated_deals} deals and {undated_wos} work orders with no date in those columns."
+        )
+    if deals.empty and wos.empty:
+        caveats.append("No dated rows fall inside this timeframe.")
+    return caveats
 
 
 def _append_plain_caveat(text):
     return f"{text} Note: results may be affected by missing or inconsistent source data."
 
 
-def _parse_query(question: str, tracer: Tracer):
-    q = question.lower()
-    # Try LLM parse first. If it fails, fallback to deterministic parser.
-    try:
-        parsed = parse_query_with_llm(question)
-        intent = parsed["intent"]
-        sector = parsed["sector"]
-        needs_clarification = parsed["needs_clarification"]
-        clarification_question = parsed["clarification_question"] or DEFAULT_CLARIFICATION
-        tracer.add(
-            "llm_intent_parse",
-            f"intent={intent}, sector={sector}, timeframe={parsed.get('timeframe')}",
-            rows=0,
-            ms=0,
+def _rules_parse(q, tracer):
+    """Score the keyword parse; return `(parse, fast)` and trace the path taken."""
+    with tracer.span("intent_parse_path", rows=0) as span:
+        rules, confidence, reasons = _score_rules(q)
+        # A parse that needs clarification always goes to the LLM.
+        fast = confidence >= RULES_CONFIDENCE_THRESHOLD and not rules["needs_clarification"]
+        if fast:
+            parse_path_stats.record("rules")
+        span.detail = (
+            f"path={'rules' if fast else 'llm'}, confidence={confidence:.2f}, "
+            f"threshold={RULES_CONFIDENCE_THRESHOLD}, reasons={';'.join(reasons)}, "
+            f"fast_path_hit_rate={parse_path_stats.fast_path_hit_rate:.2f}"
         )
-        return {
-            "source": "llm",
-            "intent": intent,
-            "sector": sector,
-            "needs_clarification": needs_clarification,
-            "clarification_question": clarification_question,
-        }
-    except Exception as exc:
-        intent = _detect_intent(q)
-        sector = _extract_sector(q)
-        needs_clarification = _needs_time_clarification(q)
-        tracer.add(
-            "intent_parse_fallback",
-            f"intent={intent}, sector={sector}, reason={exc}",
-            rows=0,
-            ms=0,
-        )
-        return {
-            "source": "rules",
-            "intent": intent,
-            "sector": sector,
-            "needs_clarification": needs_clarification,
-            "clarification_question": DEFAULT_CLARIFICATION,
-        }
+    return rules, fast
 
 
-def answer_question(question: str):
-    tracer = Tracer()
-    parsed = _parse_query(question, tracer)
+def _accept_llm_parse(parsed, tracer, llm_tracer, span):
     intent = parsed["intent"]
     sector = parsed["sector"]
+    parse_path_stats.record("llm")
+    tracer.extend(llm_tracer)
+    span.detail = f"intent={intent}, sector={sector}, timeframe={parsed.get('timeframe')}"
+    return {
+        "source": "llm",
+        "intent": intent,
+        "sector": sector,
+        "timeframe": parsed.get("timeframe"),
+        "needs_clarification": parsed["needs_clarification"],
+        "clarification_question": parsed["clarification_question"] or DEFAULT_CLARIFICATION,
+    }
 
-    if parsed["needs_clarification"]:
-        tracer.add("clarification", "Missing timeframe for business question", rows=0, ms=0)
-        return {
+
+def _fallback_parse(rules, exc, finished, tracer, llm_tracer, span):
+    if finished:
+        tracer.extend(llm_tracer)
+    else:
+        exc = f"LLM exceeded {LLM_LATENCY_BUDGET}s budget, finishing in background"
+    parse_path_stats.record("rules_fallback")
+    span.step = "intent_parse_fallback"
+    span.detail = f"intent={rules['intent']}, sector={rules['sector']}, timeframe={rules['timeframe']}, reason={exc}"
+    return rules
+
+
+def _parse_query(question: str, tracer: Tracer, before_llm=None, budget=LLM_LATENCY_BUDGET):
+    """Parse the question, rules first; `budget=None` calls the LLM in this thread."""
+    # Confident keyword parses skip the LLM; the rest try the LLM first and
+    # fall back to the same deterministic parser if it fails.
+    rules, fast = _rules_parse(question.lower(), tracer)
+    if fast:
+        return rules
+
+    if before_llm is not None and GEMINI_API_KEY:
+        before_llm()
+    # The LLM call runs on its own tracer and thread so a slow response can be
+    # abandoned at the latency budget; it still finishes in the background
+    # and stores its parse in the parse cache for the next asker.
+    llm_tracer = Tracer()
+    with tracer.span("llm_intent_parse", rows=0) as span:
+        if budget is None:
+            try:
+                parsed = parse_query_with_llm(question, llm_tracer)
+            except Exception as exc:
+                return _fallback_parse(rules, exc, True, tracer, llm_tracer, span)
+            return _accept_llm_parse(parsed, tracer, llm_tracer, span)
+        future = _LLM_POOL.submit(parse_query_with_llm, question, llm_tracer)
+        try:
+            parsed = future.result(timeout=budget)
+        except Exception as exc:
+            return _fallback_parse(rules, exc, future.done(), tracer, llm_tracer, span)
+        return _accept_llm_parse(parsed, tracer, llm_tracer, span)
+
+
+async def _parse_query_async(question: str, tracer: Tracer, before_llm=None):
+    """Async `_parse_query`; the LLM task is shielded so it outlives the budget."""
+    rules, fast = _rules_parse(question.lower(), tracer)
+    if fast:
+        return rules
+
+    if before_llm is not None and GEMINI_API_KEY:
+        before_llm()
+    llm_tracer = Tracer()
+    with tracer.span("llm_intent_parse", rows=0) as span:
+        task = _background(parse_query_with_llm_async(question, llm_tracer))
+        try:
+            parsed = await asyncio.wait_for(asyncio.shield(task), LLM_LATENCY_BUDGET)
+        except Exception as exc:
+            return _fallback_parse(rules, exc, task.done(), tracer, llm_tracer, span)
+        return _accept_llm_parse(parsed, tracer, llm_tracer, span)
+
+
+def _answer_cache_key(intent, sector, timeframe, date_columns):
+    """Cache key for a parsed question, or None when its data has no version token."""
+    if not answer_cache.enabled:
+        return None
+    try:
+        versions = (deals_version(MONDAY_SNAPSHOT_MAX_STALENESS), work_orders_version(MONDAY_SNAPSHOT_MAX_STALENESS))
+    except Exception:
+        return None
+    if None in versions:
+        return None
+    window = None if timeframe is None else (timeframe.label, timeframe.start, timeframe.end)
+    return (intent, sector, window, tuple(sorted(date_columns.items()))) + versions
+
+
+def _timed_fetch(fn, tracer, sector, columns, cancel_event, started, timeframe=None, date_column=None):
+    kwargs = {"timeframe": timeframe, "date_column": date_column} if timeframe is not None else {}
+    out = fn(
+        tracer,
+        sector=sector,
+        cancel_event=cancel_event,
+        columns=columns,
+        max_staleness=MONDAY_SNAPSHOT_MAX_STALENESS,
+        **kwargs,
+    )
+    return out, int((perf_counter() - started) * 1000)
+
+
+def _fetch_boards(tracer: Tracer, sector, intent=None, timeframe=None, date_columns=None, cancel_event=None):
+    """Fetch both boards concurrently; a failure stops the sibling at its next page."""
+    date_columns = date_columns or {}
+    projection = INTENT_COLUMNS.get(intent, {})
+    jobs = [("get_deals", get_deals), ("get_work_orders", get_work_orders)]
+    child_tracers = {name: Tracer() for name, _ in jobs}
+    cancel_event = cancel_event or threading.Event()
+    started = perf_counter()
+    results = {}
+
+    with tracer.span("parallel_fetch") as span:
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="board-fetch") as pool:
+            futures = {
+                name: pool.submit(
+                    _timed_fetch,
+                    fn,
+                    child_tracers[name],
+                    sector,
+                    projection.get(name),
+                    cancel_event,
+                    started,
+                    timeframe,
+                    date_columns.get(name),
+                )
+                for name, fn in jobs
+            }
+            wait(futures.values(), return_when=FIRST_EXCEPTION)
+            failed = [name for name, fut in futures.items() if fut.done() and fut.exception()]
+            if failed:
+                cancel_event.set()
+                for fut in futures.values():
+                    fut.cancel()
+            wait(futures.values())
+
+        for name, _ in jobs:
+            tracer.extend(child_tracers[name])
+
+        if failed:
+            cancelled = [name for name in futures if name not in failed]
+            span.detail = f"failed={','.join(failed)}, cancelled={','.join(cancelled) or 'none'}"
+            span.rows = 0
+        else:
+            for name, fut in futures.items():
+                results[name] = fut.result()
+            critical = max(results, key=lambda name: results[name][1])
+            serial_ms = sum(ms for _, ms in results.values())
+            span.detail = f"critical_path={critical}, serial_ms={serial_ms}"
+
+    if failed:
+        raise futures[failed[0]].exception()
+    return results["get_deals"][0], results["get_work_orders"][0]
+
+
+async def _timed_fetch_async(fn, tracer, sector, columns, cancel_event, started, timeframe=None, date_column=None):
+    kwargs = {"timeframe": timeframe, "date_column": date_column} if timeframe is not None else {}
+    out = await fn(
+        tracer,
+        sector=sector,
+        cancel_event=cancel_event,
+        columns=columns,
+        max_staleness=MONDAY_SNAPSHOT_MAX_STALENESS,
+        **kwargs,
+    )
+    return out, int((perf_counter() - started) * 1000)
+
+
+async def _fetch_boards_async(tracer: Tracer, sector, intent=None, timeframe=None, date_columns=None):
+    """Async `_fetch_boards`; a failure cancels the sibling task."""
+    date_columns = date_columns or {}
+    projection = INTENT_COLUMNS.get(intent, {})
+    jobs = [("get_deals", get_deals_async), ("get_work_orders", get_work_orders_async)]
+    child_tracers = {name: Tracer() for name, _ in jobs}
+    cancel_event = threading.Event()
+    started = perf_counter()
+    with tracer.span("parallel_fetch") as span:
+        tasks = {
+            name: asyncio.ensure_future(
+                _timed_fetch_async(
+                    fn,
+                    child_tracers[name],
+                    sector,
+                    projection.get(name),
+                    cancel_event,
+                    started,
+                    timeframe,
+                    date_columns.get(name),
+                )
+            )
+            for name, fn in jobs
+        }
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            cancel_event.set()
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            for name, _ in jobs:
+                tracer.extend(child_tracers[name])
+            failed = [name for name, t in tasks.items() if not t.cancelled() and t.exception() is not None]
+            cancelled = [name for name in tasks if name not in failed]
+            span.detail = f"failed={','.join(failed) or 'none'}, cancelled={','.join(cancelled) or 'none'}"
+            span.rows = 0
+            raise
+
+        for name, _ in jobs:
+            tracer.extend(child_tracers[name])
+        results = {name: task.result() for name, task in tasks.items()}
+        critical = max(results, key=lambda name: results[name][1])
+        serial_ms = sum(ms for _, ms in results.values())
+        span.detail = f"critical_path={critical}, serial_ms={serial_ms}"
+    return results["get_deals"][0], results["get_work_orders"][0]
+
+
+def _narrow(df, sector, sector_column, columns, timeframe, date_column):
+    """Apply a parsed question's sector, timeframe and projection to a prefetched board."""
+    view = cube_views.get(df)
+    out = df
+    if sector and sector_column in out.columns:
+        out = out[matches_ci(out[sector_column], sector)]
+    if timeframe is not None:
+        out = filter_frame(out, date_column, timeframe)
+    if columns is not None:
+        wanted = set(columns) | ({sector_column} if sector else set()) | {date_column}
+        out = out[[c for c in out.columns if c in wanted]]
+    if out is df:
+        out = df.copy(deep=False)
+    if view is not None:
+        # Same cube view a dataset-cache load would attach, so cube reads still apply.
+        narrowed = view.narrowed(sector, timeframe, date_column)
+        if narrowed is not None:
+            cube_views.attach(out, narrowed)
+    return out
+
+
+class SpeculativePrefetch:
+    """Fetch both full boards in the background while the LLM parses the question."""
+
+    def __init__(self):
+        self.tracer = Tracer()
+        self.task = None
+        self.started = None
+
+    def start(self):
+        self.started = perf_counter()
+        self.task = asyncio.ensure_future(_fetch_boards_async(self.tracer, None))
+
+    def cancel(self, tracer, reason):
+        if self.task is None:
+            return
+        with tracer.span("speculative_prefetch", f"discarded: {reason}", rows=0):
+            self.task.cancel()
+
+    async def result(self, tracer, sector, intent, timeframe, date_columns):
+        """Narrowed `(deals, work_orders)`, or None when nothing usable was prefetched."""
+        if self.task is None:
+            return None
+        waited = perf_counter()
+        with tracer.span("speculative_prefetch") as span:
+            try:
+                deals, wos = await self.task
+            except Exception as exc:
+                tracer.extend(self.tracer)
+                span.detail = f"failed, refetching: {exc}"
+                span.rows = 0
+                return None
+            tracer.extend(self.tracer)
+            waited_ms = int((perf_counter() - waited) * 1000)
+            with tracer.span("prefetch_narrow", f"sector={sector}, intent={intent}") as narrow:
+                projection = INTENT_COLUMNS.get(intent, {})
+                boards = tuple(
+                    _narrow(
+                        df,
+                        sector,
+                        SECTOR_COLUMNS[name],
+                        projection.get(name),
+                        timeframe,
+                        date_columns[name],
+                    )
+                    for name, df in (("get_deals", deals), ("get_work_orders", wos))
+                )
+                narrow.rows = len(boards[0]) + len(boards[1])
+            span.detail = f"used: sector={sector}, overlapped_ms={int((waited - self.started) * 1000)}, waited_ms={waited_ms}"
+            span.rows = narrow.rows
+        return boards
+
+
+def _clarification_answer(parsed, tracer):
+    with tracer.span("clarification", "Missing timeframe for business question", rows=0):
+        answer = {
             "clarification_needed": True,
             "question": parsed["clarification_question"],
             "caveats": ["I can answer now, but timeframe assumptions may be wrong."],
-        }, tracer.dump()
+        }
+    return answer, tracer.dump()
 
-    try:
-        deals = get_deals(tracer, sector=sector)
-        wos = get_work_orders(tracer, sector=sector)
-    except Exception as exc:
-        tracer.add("error", f"data_fetch_failed: {exc}", rows=0, ms=0)
-        return {
+
+def _fetch_error_answer(exc, tracer):
+    with tracer.span("error", f"data_fetch_failed: {exc}", rows=0):
+        answer = {
             "clarification_needed": False,
             "error": "Data fetch failed. Check monday token, board IDs, and column mappings.",
             "details": str(exc),
@@ -117,62 +630,110 @@ def answer_question(question: str):
             "caveats": [
                 "No analytics were computed because live data access failed.",
             ],
-        }, tracer.dump()
+        }
+    return answer, tracer.dump()
+
+
+def _lookup_answer(parsed, timeframe, date_columns, tracer):
+    """Return `(cache_key, cached_answer)`; the answer is None on a miss."""
+    intent, sector = parsed["intent"], parsed["sector"]
+    lookup_started = perf_counter_ns()
+    cache_key = _answer_cache_key(intent, sector, timeframe, date_columns)
+    if cache_key is None:
+        return None, None
+    cached = answer_cache.get(cache_key)
+    if cached is None:
+        tracer.add("answer_cache", "miss", rows=0, start_ns=lookup_started)
+        return cache_key, None
+    answer, age = cached
+    answer["intent_parser_source"] = parsed["source"]
+    tracer.add(
+        "answer_cache",
+        f"hit: intent={intent}, sector={sector}, age_s={age:.1f}, versions={','.join(cache_key[-2:])}",
+        rows=0,
+        start_ns=lookup_started,
+    )
+    return cache_key, answer
+
+
+def _store_answer(cache_key, parsed, timeframe, date_columns, answer):
+    # A snapshot synced by this very fetch only has a version token now.
+    cache_key = cache_key or _answer_cache_key(parsed["intent"], parsed["sector"], timeframe, date_columns)
+    if cache_key is not None:
+        answer_cache.put(cache_key, answer)
+
+
+def _trace_timeframe(tracer, timeframe, date_columns, deals, wos, start_ns):
+    """Summarise the timeframe filter; its time runs from `start_ns` (the fetch or narrowing start)."""
+    tracer.add(
+        "timeframe_filter",
+        (
+            f"timeframe={timeframe.describe()}, deals_date_column={date_columns['get_deals']}, "
+            f"work_orders_date_column={date_columns['get_work_orders']}, "
+            f"undated_deals={deals.attrs.get('undated_rows', 0)}, "
+            f"undated_work_orders={wos.attrs.get('undated_rows', 0)}"
+        ),
+        rows=len(deals) + len(wos),
+        start_ns=start_ns,
+    )
 
-    pipe = pipeline_summary(deals)
-    recv = receivable_summary(wos)
-    overlap = cross_board_overlap(deals, wos)
+
+def _compose_answer(parsed, timeframe, date_columns, deals, wos, metrics):
+    """Build the answer payload for one parsed question from its computed metrics."""
+    intent = parsed["intent"]
+    sector = parsed["sector"]
+    pipe = metrics["pipeline_summary"]
+    recv = metrics["receivable_summary"]
+    overlap = metrics["cross_board_overlap"]
 
     # intent-specific block
     if intent == "pipeline":
-        details = pipeline_by_stage_status(deals)
+        details = metrics["pipeline_by_stage_status"]
         status = pipe["by_status"]
         won = int(status.get("Won", 0))
         open_ = int(status.get("Open", 0))
         dead = int(status.get("Dead", 0))
         final_answer = (
-            f"Pipeline {_scope_text(sector)} has {pipe['rows']} deals: "
+            f"Pipeline {_scope_text(sector, timeframe)} has {pipe['rows']} deals: "
             f"{won} won, {open_} open, and {dead} dead."
         )
     elif intent == "sector_performance":
-        details = sector_performance(deals, wos)
+        details = metrics["sector_performance"]
         top = details["sector_metrics"][0]["index"] if details.get("sector_metrics") else "N/A"
         final_answer = (
-            f"Sector performance {_scope_text(sector)} is computed from deals and work orders. "
+            f"Sector performance {_scope_text(sector, timeframe)} is computed from deals and work orders. "
             f"Top sector by deal volume: {top}."
         )
     elif intent == "conversion":
-        details = conversion_metrics(deals)
+        details = metrics["conversion_metrics"]
         final_answer = (
-            f"Conversion {_scope_text(sector)}: "
+            f"Conversion {_scope_text(sector, timeframe)}: "
             f"win rate {details['won_rate']:.1%}, dead rate {details['dead_rate']:.1%}, "
             f"open rate {details['open_rate']:.1%}."
         )
     elif intent == "receivables":
-        details = receivable_risk(wos)
+        details = metrics["receivable_risk"]
         final_answer = (
-            f"Receivable risk {_scope_text(sector)} shows "
+            f"Receivable risk {_scope_text(sector, timeframe)} shows "
             f"{details['negative_rows']} negative receivable rows and "
             f"{details['high_outstanding_rows']} high-outstanding rows."
         )
     else:
         details = {
-            "pipeline": pipeline_by_stage_status(deals),
-            "conversion": conversion_metrics(deals),
-            "receivable_risk": receivable_risk(wos),
-            "sector_performance": sector_performance(deals, wos),
+            "pipeline": metrics["pipeline_by_stage_status"],
+            "conversion": metrics["conversion_metrics"],
+            "receivable_risk": metrics["receivable_risk"],
+            "sector_performance": metrics["sector_performance"],
         }
         final_answer = (
-            f"Overview {_scope_text(sector)}: {pipe['rows']} deals, "
+            f"Overview {_scope_text(sector, timeframe)}: {pipe['rows']} deals, "
             f"total receivables {recv['total_receivable']:.2f}, and "
             f"{overlap['overlap_count']} cross-board linked deals."
         )
 
     final_answer = _append_plain_caveat(final_answer)
 
-    tracer.add("analytics_compute", f"intent={intent}", rows=0, ms=0)
-
-    answer = {
+    return {
         "clarification_needed": False,
         "intent_parser_source": parsed["source"],
         "intent": intent,
@@ -187,10 +748,176 @@ def answer_question(question: str):
         "pipeline": pipe,
         "receivables": recv,
         "cross_board": overlap,
+        "timeframe": None
+        if timeframe is None
+        else {
+            "label": timeframe.label,
+            "start": timeframe.start.isoformat(),
+            "end": timeframe.last_day.isoformat(),
+            "date_columns": date_columns,
+        },
         "caveats": [
             "Data includes missing values and flagged anomalies.",
             "Close dates and deal values are sparse in parts of deals data.",
-        ],
+        ]
+        + (_timeframe_caveats(timeframe, date_columns, deals, wos) if timeframe else []),
         "next_question_suggestion": "Do you want this split by owner or by deal stage?",
     }
+
+
+def _compute_answer(parsed, timeframe, date_columns, deals, wos, tracer):
+    with tracer.span("analytics_compute", rows=0) as span:
+        engine = MetricsEngine(deals, wos, tracer=tracer)
+        metrics = engine.compute(INTENT_METRICS.get(parsed["intent"], INTENT_METRICS["overview"]))
+        with tracer.span("compose_answer", f"intent={parsed['intent']}"):
+            answer = _compose_answer(parsed, timeframe, date_columns, deals, wos, metrics)
+        span.detail = f"intent={parsed['intent']}, metrics={len(metrics)}, intermediates={engine.intermediates}"
+    return answer
+
+
+async def answer_question_async(question: str):
+    """Answer one question without holding a thread across network waits."""
+    tracer = Tracer()
+    prefetch = SpeculativePrefetch()
+    parsed = await _parse_query_async(question, tracer, before_llm=prefetch.start if SPECULATIVE_PREFETCH else None)
+    intent = parsed["intent"]
+    sector = parsed["sector"]
+    timeframe = _resolve_timeframe(parsed, question)
+    date_columns = _date_columns(question.lower())
+
+    if parsed["needs_clarification"]:
+        prefetch.cancel(tracer, "clarification needed")
+        return _clarification_answer(parsed, tracer)
+
+    # Version tokens stat files and read the snapshot store; keep that off the loop.
+    cache_key, cached = await asyncio.to_thread(_lookup_answer, parsed, timeframe, date_columns, tracer)
+    if cached is not None:
+        prefetch.cancel(tracer, "answer cache hit")
+        return cached, tracer.dump()
+
+    fetch_started = perf_counter_ns()
+    try:
+        boards = await prefetch.result(tracer, sector, intent, timeframe, date_columns)
+        deals, wos = boards or await _fetch_boards_async(tracer, sector, intent, timeframe, date_columns)
+    except Exception as exc:
+        return _fetch_error_answer(exc, tracer)
+
+    if timeframe is not None:
+        _trace_timeframe(tracer, timeframe, date_columns, deals, wos, fetch_started)
+
+    answer = await asyncio.to_thread(_compute_answer, parsed, timeframe, date_columns, deals, wos, tracer)
+    await asyncio.to_thread(_store_answer, cache_key, parsed, timeframe, date_columns, answer)
     return answer, tracer.dump()
+
+
+def answer_question(question: str):
+    """Blocking wrapper running `answer_question_async` on the shared event loop."""
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is not None and running is _loop:
+        raise RuntimeError("answer_question() called from the orchestrator event loop; await answer_question_async()")
+    return asyncio.run_coroutine_threadsafe(answer_question_async(question), _event_loop()).result()
+
+
+def answer_questions(questions: list[str]):
+    """Answer many questions, sharing parsing, board loads and metrics; returns `(results, summary)`."""
+    started = perf_counter()
+    fetch_tracer = Tracer()
+    cancel_event = threading.Event()
+    fetch = _PREFETCH_POOL.submit(_fetch_boards, fetch_tracer, None, cancel_event=cancel_event)
+
+    tracers = [Tracer() for _ in questions]
+    # Batch parses call the LLM directly: routed through the small _LLM_POOL,
+    # queue time would count against the per-question budget and push
+    # questions onto the rules fallback.
+    with ThreadPoolExecutor(max_workers=BATCH_PARSE_WORKERS, thread_name_prefix="batch-parse") as pool:
+        parses = list(pool.map(partial(_parse_query, budget=None), questions, tracers))
+    parse_ms = int((perf_counter() - started) * 1000)
+
+    results = [None] * len(questions)
+    groups = {}
+    cache_hits = clarifications = 0
+    for i, (question, parsed, tracer) in enumerate(zip(questions, parses, tracers)):
+        timeframe = _resolve_timeframe(parsed, question)
+        date_columns = _date_columns(question.lower())
+        if parsed["needs_clarification"]:
+            clarifications += 1
+            results[i] = _clarification_answer(parsed, tracer)
+            continue
+        cache_key, cached = _lookup_answer(parsed, timeframe, date_columns, tracer)
+        if cached is not None:
+            cache_hits += 1
+            results[i] = (cached, tracer.dump())
+            continue
+        window = None if timeframe is None else (timeframe.start, timeframe.end)
+        group = (parsed["sector"], window, tuple(sorted(date_columns.items())))
+        groups.setdefault(group, []).append((i, parsed, timeframe, date_columns, cache_key))
+
+    fetch_started = perf_counter()
+    boards = error = None
+    if groups:
+        try:
+            boards = fetch.result()
+        except Exception as exc:
+            error = exc
+    else:
+        cancel_event.set()
+        fetch.cancel()
+    fetch_wait_ms = int((perf_counter() - fetch_started) * 1000)
+
+    compute_started = perf_counter()
+    for n, members in enumerate(groups.values()):
+        _, first, timeframe, date_columns, _ = members[0]
+        if error is not None:
+            for i, *_ in members:
+                results[i] = _fetch_error_answer(error, tracers[i])
+            continue
+        # The group's narrowing and metrics are traced once and copied into
+        # every member's trace.
+        group_tracer = Tracer()
+        group_started = perf_counter_ns()
+        with group_tracer.span("batch_group") as group_span:
+            with group_tracer.span("batch_narrow", f"sector={first['sector']}") as narrow:
+                deals, wos = (
+                    _narrow(df, first["sector"], SECTOR_COLUMNS[name], None, timeframe, date_columns[name])
+                    for name, df in zip(("get_deals", "get_work_orders"), boards)
+                )
+                narrow.rows = len(deals) + len(wos)
+            names = [m for _, parsed, *_ in members for m in INTENT_METRICS.get(parsed["intent"], INTENT_METRICS["overview"])]
+            engine = MetricsEngine(deals, wos, tracer=group_tracer)
+            metrics = engine.compute(list(dict.fromkeys(names)))
+            group_span.detail = (
+                f"group={n}, sector={first['sector']}, questions={len(members)}, "
+                f"metrics={len(metrics)}, intermediates={engine.intermediates}, "
+                f"shared_fetch_rows={len(boards[0]) + len(boards[1])}"
+            )
+            group_span.rows = len(deals) + len(wos)
+        for i, parsed, timeframe, date_columns, cache_key in members:
+            tracer = tracers[i]
+            tracer.extend(group_tracer)
+            if timeframe is not None:
+                _trace_timeframe(tracer, timeframe, date_columns, deals, wos, group_started)
+            with tracer.span("analytics_compute", rows=0) as span:
+                answer = _compose_answer(parsed, timeframe, date_columns, deals, wos, copy.deepcopy(metrics))
+                span.detail = f"intent={parsed['intent']}, shared_by={len(members)}"
+            _store_answer(cache_key, parsed, timeframe, date_columns, answer)
+            results[i] = (answer, tracer.dump())
+
+    summary = {
+        "questions": len(questions),
+        "groups": len(groups),
+        "answer_cache_hits": cache_hits,
+        "clarifications": clarifications,
+        "errors": sum(1 for answer, _ in results if "error" in answer),
+        "parse_sources": {
+            source: sum(1 for p in parses if p["source"] == source) for source in dict.fromkeys(p["source"] for p in parses)
+        },
+        "parse_ms": parse_ms,
+        "fetch_wait_ms": fetch_wait_ms,
+        "compute_ms": int((perf_counter() - compute_started) * 1000),
+        "total_ms": int((perf_counter() - started) * 1000),
+        "fetch_trace": fetch_tracer.dump(),
+    }
+    return results, summary
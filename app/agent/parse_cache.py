@@ -0,0 +1,122 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from time import time
+
+from app.config import LLM_PARSE_CACHE_MAX_ENTRIES, LLM_PARSE_CACHE_PATH, LLM_PARSE_CACHE_TTL
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    question TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parses_by_use ON parses (used_at);
+"""
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", str(question)).strip().lower().rstrip("?!. ")
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class ParseCache:
+    """SQLite cache of validated LLM parses, keyed on question, model and prompt hash."""
+
+    def __init__(self, path=LLM_PARSE_CACHE_PATH, ttl=LLM_PARSE_CACHE_TTL, max_entries=LLM_PARSE_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def key(question, model, prompt):
+        raw = "\x1f".join([model, prompt_hash(prompt), normalize_question(question)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, question, model, prompt):
+        """Return the cached validated payload, or None on a miss."""
+        key = self.key(question, model, prompt)
+        now = time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT payload, created_at FROM parses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl:
+                    conn.execute("DELETE FROM parses WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE parses SET used_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0])
+
+    def put(self, question, model, prompt, payload):
+        now = time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO parses (key, model, question, payload, created_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        self.key(question, model, prompt),
+                        model,
+                        normalize_question(question),
+                        json.dumps(payload),
+                        now,
+                        now,
+                    ),
+                )
+                conn.execute(
+                    "DELETE FROM parses WHERE key IN "
+                    "(SELECT key FROM parses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error:
+            pass
+
+    def invalidate(self, model=None, older_than=None):
+        """Delete entries, optionally only for `model` or older than `older_than` seconds; returns the count."""
+        clauses, params = [], []
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        if older_than is not None:
+            clauses.append("created_at < ?")
+            params.append(time() - older_than)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(f"DELETE FROM parses{where}", params).rowcount
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParseCache()
+    return _cache
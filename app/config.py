@@ -17,3 +17,68 @@ MONDAY_WORK_ORDERS_BOARD_ID = os.getenv("MONDAY_WORK_ORDERS_BOARD_ID", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 
+MONDAY_POOL_CONNECTIONS = int(os.getenv("MONDAY_POOL_CONNECTIONS", "4"))
+MONDAY_POOL_MAXSIZE = int(os.getenv("MONDAY_POOL_MAXSIZE", "8"))
+MONDAY_POOL_BLOCK = os.getenv("MONDAY_POOL_BLOCK", "true").lower() == "true"
+MONDAY_KEEP_ALIVE = os.getenv("MONDAY_KEEP_ALIVE", "true").lower() == "true"
+MONDAY_TIMEOUT = float(os.getenv("MONDAY_TIMEOUT", "30"))
+MONDAY_SNAPSHOT_PATH = os.getenv("MONDAY_SNAPSHOT_PATH", "data/snapshots/monday.sqlite")
+# Seconds a board snapshot may age before the next read triggers a sync.
+# Leave unset to keep the default of fetching live on every question.
+MONDAY_SNAPSHOT_MAX_STALENESS = (
+    float(os.getenv("MONDAY_SNAPSHOT_MAX_STALENESS"))
+    if os.getenv("MONDAY_SNAPSHOT_MAX_STALENESS")
+    else None
+)
+# Seconds between the item-ID sweeps that drop deleted items from a snapshot;
+# incremental syncs in between only fetch updated items.
+MONDAY_SNAPSHOT_SWEEP_INTERVAL = float(os.getenv("MONDAY_SNAPSHOT_SWEEP_INTERVAL", "3600"))
+MONDAY_COMPLEXITY_BUDGET = int(os.getenv("MONDAY_COMPLEXITY_BUDGET", "5000000"))
+MONDAY_COMPLEXITY_RESERVE = float(os.getenv("MONDAY_COMPLEXITY_RESERVE", "0.1"))
+MONDAY_MIN_PAGE_SIZE = int(os.getenv("MONDAY_MIN_PAGE_SIZE", "25"))
+MONDAY_MAX_RETRIES = int(os.getenv("MONDAY_MAX_RETRIES", "4"))
+MONDAY_BACKOFF_BASE = float(os.getenv("MONDAY_BACKOFF_BASE", "1.0"))
+# Seconds a board's status-column labels are reused for sector pushdown.
+MONDAY_LABELS_TTL = float(os.getenv("MONDAY_LABELS_TTL", "300"))
+LOCAL_CACHE_MAX_MB = float(os.getenv("LOCAL_CACHE_MAX_MB", "256"))
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "8"))
+# ISO date that relative timeframes ("this quarter", "last month") are
+# resolved against. Leave unset to use the current date.
+TIMEFRAME_TODAY = os.getenv("TIMEFRAME_TODAY", "")
+# "exact" computes receivable quantiles from raw rows; "approx" answers them
+# from per-sector/per-month KLL sketches (rank error ~2.3/k, 1.3% at k=200).
+RECEIVABLE_QUANTILE_MODE = os.getenv("RECEIVABLE_QUANTILE_MODE", "exact").lower()
+QUANTILE_SKETCH_K = int(os.getenv("QUANTILE_SKETCH_K", "200"))
+# Finished answers are reused for repeat questions over unchanged data for
+# up to ANSWER_CACHE_TTL seconds (0 disables the cache).
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "300"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))
+# Validated Gemini intent parses are cached on disk, keyed on the question,
+# GEMINI_MODEL and the system prompt. Clear with scripts/clear_parse_cache.py.
+LLM_PARSE_CACHE_PATH = os.getenv("LLM_PARSE_CACHE_PATH", "data/cache/llm_parses.sqlite")
+LLM_PARSE_CACHE_TTL = float(os.getenv("LLM_PARSE_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_PARSE_CACHE_MAX_ENTRIES = int(os.getenv("LLM_PARSE_CACHE_MAX_ENTRIES", "10000"))
+# Keyword parses scoring at least this confidence (0-1) skip the LLM call.
+# Set above 1 to always ask the LLM first.
+RULES_CONFIDENCE_THRESHOLD = float(os.getenv("RULES_CONFIDENCE_THRESHOLD", "0.8"))
+# Start fetching both boards while the LLM parses the question.
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "true").lower() == "true"
+# Per-request Gemini timeout, and the time a question waits for the LLM parse
+# before answering from the rules parser (the LLM call keeps running and
+# warms the parse cache).
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "15"))
+GEMINI_POOL_MAXSIZE = int(os.getenv("GEMINI_POOL_MAXSIZE", "4"))
+LLM_LATENCY_BUDGET = float(os.getenv("LLM_LATENCY_BUDGET", "3"))
+# Threads parsing questions in parallel in answer_questions().
+BATCH_PARSE_WORKERS = int(os.getenv("BATCH_PARSE_WORKERS", "8"))
+# Headless query service (python -m app.server). Requests beyond
+# SERVICE_WORKERS running + SERVICE_QUEUE_SIZE waiting get HTTP 503; a
+# request not answered within SERVICE_DEADLINE seconds gets HTTP 504.
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "4"))
+SERVICE_QUEUE_SIZE = int(os.getenv("SERVICE_QUEUE_SIZE", "16"))
+SERVICE_DEADLINE = float(os.getenv("SERVICE_DEADLINE", "30"))
+# Record each trace span's tracemalloc peak allocation (alloc_peak_kb).
+# Tracing allocations slows pandas work noticeably, so it is off by default.
+TRACE_MEMORY = os.getenv("TRACE_MEMORY", "false").lower() == "true"
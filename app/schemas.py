@@ -0,0 +1,230 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ModuleNotFoundError:
+    pa = None
+    pq = None
+
+DEAL_STATUSES = ("Dead", "On Hold", "Open", "Won")
+CLOSURE_PROBABILITIES = ("High", "Low", "Medium")
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Canonical type of one board column; `categories` lists the known values first."""
+
+    kind: str = "string"
+    categories: tuple | None = None
+    required: bool = False
+
+
+# Canonical schema of each board, shared by the CSV/Parquet and monday
+# loaders and by the cleaning scripts. Columns not listed stay as text.
+DEALS_SCHEMA = {
+    "Deal Name": ColumnSpec("string", required=True),
+    "Owner code": ColumnSpec("category"),
+    "Client Code": ColumnSpec("string"),
+    "Deal Status": ColumnSpec("category", DEAL_STATUSES, required=True),
+    "Close Date (A)": ColumnSpec("date"),
+    "Closure Probability": ColumnSpec("category", CLOSURE_PROBABILITIES),
+    "Masked Deal value": ColumnSpec("float", required=True),
+    "Tentative Close Date": ColumnSpec("date"),
+    "Deal Stage": ColumnSpec("category", required=True),
+    "Product deal": ColumnSpec("category"),
+    "Sector/service": ColumnSpec("category", required=True),
+    "Created Date": ColumnSpec("date"),
+    "source_row_number": ColumnSpec("int"),
+    "quality_flag": ColumnSpec("string"),
+}
+
+WO_SCHEMA = {
+    "Deal name masked": ColumnSpec("string", required=True),
+    "Customer Name Code": ColumnSpec("string"),
+    "Serial #": ColumnSpec("string"),
+    "Nature of Work": ColumnSpec("category"),
+    "Last executed month of recurring project": ColumnSpec("category"),
+    "Execution Status": ColumnSpec("category"),
+    "Data Delivery Date": ColumnSpec("date"),
+    "Date of PO/LOI": ColumnSpec("date"),
+    "Document Type": ColumnSpec("category"),
+    "Probable Start Date": ColumnSpec("date"),
+    "Probable End Date": ColumnSpec("date"),
+    "BD/KAM Personnel code": ColumnSpec("category"),
+    "Sector": ColumnSpec("category", required=True),
+    "Type of Work": ColumnSpec("category"),
+    "Is any Skylark software platform part of the client deliverables in this deal?": ColumnSpec("category"),
+    "Last invoice date": ColumnSpec("date"),
+    "latest invoice no.": ColumnSpec("string"),
+    "Amount in Rupees (Excl of GST) (Masked)": ColumnSpec("float"),
+    "Amount in Rupees (Incl of GST) (Masked)": ColumnSpec("float"),
+    "Billed Value in Rupees (Excl of GST.) (Masked)": ColumnSpec("float"),
+    "Billed Value in Rupees (Incl of GST.) (Masked)": ColumnSpec("float"),
+    "Collected Amount in Rupees (Incl of GST.) (Masked)": ColumnSpec("float"),
+    "Amount to be billed in Rs. (Exl. of GST) (Masked)": ColumnSpec("float"),
+    "Amount to be billed in Rs. (Incl. of GST) (Masked)": ColumnSpec("float"),
+    "Amount Receivable (Masked)": ColumnSpec("float", required=True),
+    "AR Priority account": ColumnSpec("category"),
+    "Quantity by Ops": ColumnSpec("float"),
+    "Quantities as per PO": ColumnSpec("string"),
+    "Quantity billed (till date)": ColumnSpec("float"),
+    "Balance in quantity": ColumnSpec("float"),
+    "Invoice Status": ColumnSpec("category"),
+    "Expected Billing Month": ColumnSpec("string"),
+    "Actual Billing Month": ColumnSpec("category"),
+    "Actual Collection Month": ColumnSpec("string"),
+    "WO Status (billed)": ColumnSpec("category"),
+    "Collection status": ColumnSpec("string"),
+    "Collection Date": ColumnSpec("date"),
+    "Billing Status": ColumnSpec("category"),
+    "source_row_number": ColumnSpec("int"),
+    "quality_flag": ColumnSpec("string"),
+}
+
+
+def columnar_available() -> bool:
+    return pa is not None
+
+
+def _arrow_type(spec):
+    return {
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "date": pa.date32(),
+        "float": pa.float64(),
+        "int": pa.int64(),
+    }.get(spec.kind if spec else None, pa.string())
+
+
+def _arrow_array(series: pd.Series, spec):
+    kind = spec.kind if spec else None
+    if kind == "float":
+        return pa.array(pd.to_numeric(series, errors="coerce"), type=pa.float64(), from_pandas=True)
+    if kind == "int":
+        return pa.array(pd.to_numeric(series, errors="coerce").astype("Int64"), type=pa.int64(), from_pandas=True)
+    if kind == "date":
+        parsed = pd.to_datetime(series, errors="coerce")
+        return pa.array(
+            [None if pd.isna(v) else v.date() for v in parsed],
+            type=pa.date32(),
+        )
+    values = [None if pd.isna(v) or v == "" else str(v) for v in series]
+    if kind != "category":
+        return pa.array(values, type=pa.string())
+    # Sorted dictionaries keep category order stable across rewrites.
+    categories = sorted({v for v in values if v is not None})
+    codes = {v: i for i, v in enumerate(categories)}
+    return pa.DictionaryArray.from_arrays(
+        pa.array([None if v is None else codes[v] for v in values], type=pa.int32()),
+        pa.array(categories, type=pa.string()),
+    )
+
+
+def arrow_schema(columns, schema):
+    return pa.schema([pa.field(c, _arrow_type(schema.get(c))) for c in columns])
+
+
+def write_parquet(df: pd.DataFrame, path, schema):
+    """Write `df` with explicit date32 / float64 / dictionary column types."""
+    arrow = arrow_schema(df.columns, schema)
+    arrays = [_arrow_array(df[c], schema.get(c)) for c in df.columns]
+    pq.write_table(pa.Table.from_arrays(arrays, schema=arrow), path)
+
+
+def columnar_path(csv_path) -> Path:
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def preferred_dataset_path(csv_path) -> str:
+    """Return the Parquet sibling of `csv_path` when it is usable and current."""
+    parquet = columnar_path(csv_path)
+    if not columnar_available() or not parquet.exists():
+        return str(csv_path)
+    if os.path.exists(csv_path) and os.stat(csv_path).st_mtime_ns > parquet.stat().st_mtime_ns:
+        return str(csv_path)
+    return str(parquet)
+
+
+def read_dataset(path) -> pd.DataFrame:
+    if str(path).endswith(".parquet"):
+        return pq.read_table(path, memory_map=True).to_pandas()
+    return pd.read_csv(path)
+
+
+def parse_amount(series: pd.Series) -> pd.Series:
+    """Parse currency-formatted text ("₹1,200") into float64."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype("float64")
+    cleaned = (
+        series.astype(str)
+        .str.replace(",", "", regex=False)
+        .str.replace("₹", "", regex=False)
+        .str.strip()
+        .replace({"": pd.NA, "nan": pd.NA, "None": pd.NA, "<NA>": pd.NA})
+    )
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64")
+
+
+def _empty(spec, rows):
+    if spec.kind == "float":
+        return pd.Series([float("nan")] * rows, dtype="float64")
+    if spec.kind == "date":
+        return pd.Series([pd.NaT] * rows, dtype="datetime64[ns]")
+    if spec.kind == "category":
+        return pd.Series(pd.Categorical([None] * rows, categories=list(spec.categories or [])))
+    return pd.Series([pd.NA] * rows, dtype=object)
+
+
+def _coerce(series: pd.Series, spec: ColumnSpec) -> pd.Series:
+    if spec.kind == "float":
+        return parse_amount(series)
+    if spec.kind == "int":
+        return pd.to_numeric(series, errors="coerce").astype("Int64")
+    if spec.kind == "date":
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return pd.to_datetime(series, errors="coerce", format="mixed")
+    if spec.kind == "category":
+        if spec.categories is not None:
+            values = series.astype(object).where(series.notna() & (series.astype(str) != ""))
+            extra = sorted(set(values.dropna()) - set(spec.categories), key=str)
+            return pd.Series(
+                pd.Categorical(values, categories=[*spec.categories, *extra]),
+                index=series.index,
+                name=series.name,
+            )
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series
+        return series.astype(object).where(series.notna() & (series.astype(str) != "")).astype("category")
+    return series
+
+
+def ensure_columns(df: pd.DataFrame, schema) -> pd.DataFrame:
+    """Add any missing required columns as empty, correctly typed columns."""
+    for name, spec in schema.items():
+        if spec.required and name not in df.columns:
+            df[name] = _empty(spec, len(df)).set_axis(df.index)
+    return df
+
+
+def apply_schema(df: pd.DataFrame, schema) -> pd.DataFrame:
+    """Coerce a freshly loaded board frame to its canonical dtypes."""
+    df = ensure_columns(df, schema)
+    for name in df.columns:
+        spec = schema.get(name)
+        if spec is not None:
+            df[name] = _coerce(df[name], spec)
+    return df
+
+
+def matches_ci(series: pd.Series, value: str) -> pd.Series:
+    """Case-insensitive equality; categorical columns compare categories once."""
+    target = str(value).lower()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        hits = [c for c in series.cat.categories if str(c).lower() == target]
+        return series.isin(hits)
+    return series.astype(str).str.lower() == target
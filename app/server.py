@@ -0,0 +1,294 @@
+"""Headless JSON-over-HTTP query service.
+
+    PYTHONPATH=. python -m app.server [--host HOST] [--port PORT] [--workers N] [--no-warm]
+
+Endpoints:
+    POST /ask        {"question": "...", "deadline_s": 10}   -> {"answer", "trace", "ms"}
+    POST /ask_batch  {"questions": [...], "deadline_s": 60}  -> {"results", "summary", "ms"}
+    GET  /healthz                                            -> {"status": "ok", ...}
+    GET  /metrics                                            -> Prometheus text format
+"""
+
+import argparse
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from app.agent.answer_cache import answer_cache
+from app.agent.orchestrator import answer_question, answer_questions, parse_path_stats
+from app.config import (
+    DATA_BACKEND,
+    SERVICE_DEADLINE,
+    SERVICE_HOST,
+    SERVICE_PORT,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_WORKERS,
+)
+from app.tools.dataset_cache import dataset_cache
+from app.tools.trace import Tracer
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Overloaded(RuntimeError):
+    """Raised when the worker pool and its queue are full."""
+
+
+class BadRequest(ValueError):
+    """Raised when a request body fails validation (HTTP 400)."""
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram per (endpoint, status) in Prometheus layout."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, labels, seconds):
+        with self._lock:
+            series = self._series.setdefault(labels, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += seconds
+            series["count"] += 1
+
+    def render(self, name):
+        lines = [f"# TYPE {name} histogram"]
+        with self._lock:
+            for (endpoint, status), series in sorted(self._series.items()):
+                labels = f'endpoint="{endpoint}",status="{status}"'
+                for bound, count in zip(self.buckets, series["counts"]):
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {series["count"]}')
+                lines.append(f"{name}_sum{{{labels}}} {series['sum']:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {series['count']}")
+        return lines
+
+
+class QueryService:
+    """Bounded worker pool in front of the orchestrator; `submit()` raises Overloaded when full."""
+
+    def __init__(self, workers=SERVICE_WORKERS, queue_size=SERVICE_QUEUE_SIZE, deadline=SERVICE_DEADLINE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.deadline = deadline
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query-worker")
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise Overloaded(f"{self.pending} requests in flight or queued")
+            self.pending += 1
+        future = self.pool.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn, *args, deadline=None):
+        """Run `fn(*args)` on the pool and wait at most `deadline` seconds for it."""
+        future = self.submit(fn, *args)
+        timeout = self.deadline if deadline is None else min(deadline, self.deadline)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def warm(self):
+        """Load both datasets (and their cubes) once so the first question is not a cold start."""
+        from app.agent.orchestrator import _fetch_boards
+
+        if DATA_BACKEND == "monday":
+            return 0
+        deals, wos = _fetch_boards(Tracer(), None)
+        return len(deals) + len(wos)
+
+    def metrics(self):
+        lines = self.latency.render("bi_request_duration_seconds")
+        with self._lock:
+            gauges = {
+                "bi_requests_pending": self.pending,
+                "bi_requests_rejected_total": self.rejected,
+                "bi_requests_timed_out_total": self.timeouts,
+            }
+        gauges.update(
+            {
+                "bi_worker_pool_size": self.workers,
+                "bi_queue_capacity": self.queue_size,
+                "bi_dataset_cache_hits_total": dataset_cache.hits,
+                "bi_dataset_cache_misses_total": dataset_cache.misses,
+                "bi_answer_cache_hits_total": answer_cache.hits,
+                "bi_answer_cache_misses_total": answer_cache.misses,
+            }
+        )
+        lines += [f"{name} {value}" for name, value in gauges.items()]
+        lines += [f'bi_parse_path_total{{path="{path}"}} {n}' for path, n in parse_path_stats.counts.items()]
+        lines.append(f"bi_parse_fast_path_hit_rate {parse_path_stats.fast_path_hit_rate:.4f}")
+        return "\n".join(lines) + "\n"
+
+
+def _jsonable(obj):
+    # Answers carry pandas/numpy scalars and non-string dict keys.
+    if isinstance(obj, dict):
+        return {k if isinstance(k, str) else str(_jsonable(k)): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
+
+
+def _validate(endpoint, payload):
+    """Check a request body; return `(fn, arg, deadline)` or raise BadRequest."""
+    deadline = payload.get("deadline_s")
+    if deadline is not None:
+        if isinstance(deadline, bool) or not isinstance(deadline, (int, float)):
+            raise BadRequest("deadline_s must be a number of seconds")
+        if not math.isfinite(deadline) or deadline <= 0:
+            raise BadRequest("deadline_s must be positive")
+        deadline = float(deadline)
+    if endpoint == "/ask":
+        question = payload.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise BadRequest("question must be a non-empty string")
+        return answer_question, question, deadline
+    questions = payload.get("questions")
+    if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+        raise BadRequest("questions must be a list of strings")
+    return answer_questions, questions, deadline
+
+
+def _response(endpoint, result):
+    if endpoint == "/ask":
+        answer, trace = result
+        return {"answer": answer, "trace": trace}
+    results, summary = result
+    return {
+        "results": [{"answer": answer, "trace": trace} for answer, trace in results],
+        "summary": summary,
+    }
+
+
+def make_handler(service: QueryService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            return
+
+        def _send(self, status, body, content_type="application/json", headers=None):
+            data = body.encode("utf-8") if isinstance(body, str) else json.dumps(_jsonable(body)).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError as exc:
+                raise BadRequest(f"invalid JSON body: {exc}") from exc
+            if not isinstance(payload, dict):
+                raise BadRequest("request body must be a JSON object")
+            return payload
+
+        def do_GET(self):
+            started = perf_counter()
+            path = urlsplit(self.path).path
+            if path == "/healthz":
+                status, body = 200, {"status": "ok", "backend": DATA_BACKEND, "workers": service.workers}
+                self._send(status, body)
+            elif path == "/metrics":
+                status = 200
+                self._send(status, service.metrics(), content_type="text/plain; version=0.0.4")
+            else:
+                status = 404
+                self._send(status, {"error": f"unknown path {self.path}"})
+            service.latency.observe((path if status != 404 else "other", status), perf_counter() - started)
+
+        def do_POST(self):
+            started = perf_counter()
+            path = urlsplit(self.path).path
+            endpoint = path if path in ("/ask", "/ask_batch") else "other"
+            try:
+                if endpoint == "other":
+                    status, body = 404, {"error": f"unknown path {self.path}"}
+                else:
+                    fn, arg, deadline = _validate(endpoint, self._read_json())
+                    status, body = 200, _response(endpoint, service.run(fn, arg, deadline=deadline))
+            except BadRequest as exc:
+                status, body = 400, {"error": f"bad request: {exc}"}
+            except Overloaded as exc:
+                status, body = 503, {"error": "overloaded, retry later", "details": str(exc)}
+            except FutureTimeout:
+                status, body = 504, {"error": "deadline exceeded"}
+            except Exception as exc:
+                status, body = 500, {"error": "internal error", "details": str(exc)}
+            if status == 200:
+                body["ms"] = int((perf_counter() - started) * 1000)
+            self._send(status, body, headers={"Retry-After": "1"} if status == 503 else None)
+            service.latency.observe((endpoint, status), perf_counter() - started)
+
+    return Handler
+
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS, warm=True):
+    service = QueryService(workers=workers)
+    if warm:
+        rows = service.warm()
+        print(f"Warmed dataset cache with {rows} rows")
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    print(f"Serving {DATA_BACKEND} backend on http://{host}:{server.server_address[1]} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monday BI Agent query service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS)
+    parser.add_argument("--no-warm", action="store_true", help="skip preloading the local datasets")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, warm=not args.no_warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from app.config import QUANTILE_SKETCH_K
+from app.schemas import parse_amount
+from app.services.sketch import KLLSketch, merge_all
+
+ORDER_KEY = "source_row_number"
+RECEIVABLE_COLUMN = "Amount Receivable (Masked)"
+
+
+class AggregateCube:
+    """Additive aggregates of a board keyed by categorical dimensions x month, updatable in place."""
+
+    def __init__(self, dims, date_column, measures, sketch=None):
+        self.dims = list(dims)
+        self.date_column = date_column
+        self.measures = measures
+        self.sketch = sketch
+        self.keys = self.dims + ["month"]
+        extra = ["sketch"] if sketch else []
+        self.cells = pd.DataFrame(columns=self.keys + ["rows", *measures, "first", *extra])
+        self._merged = OrderedDict()
+        self._merged_lock = threading.Lock()
+
+    def _row_table(self, frame: pd.DataFrame) -> pd.DataFrame:
+        rows = pd.DataFrame(index=frame.index)
+        for dim in self.dims:
+            rows[dim] = frame[dim] if dim in frame.columns else pd.Series(pd.NA, index=frame.index, dtype=object)
+        dates = frame[self.date_column] if self.date_column in frame.columns else pd.Series(pd.NaT, index=frame.index)
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce", format="mixed")
+        rows["month"] = dates.to_numpy(dtype="datetime64[M]").astype("datetime64[ns]")
+        rows["rows"] = 1
+        for name, fn in self.measures.items():
+            rows[name] = fn(frame)
+        rows["first"] = frame[ORDER_KEY].to_numpy() if ORDER_KEY in frame.columns else frame.index.to_numpy()
+        if self.sketch:
+            rows["sketch"] = self.sketch(frame)
+        return rows
+
+    def _aggregate(self, frame):
+        rows = self._row_table(frame)
+        agg = {c: "sum" for c in ["rows", *self.measures]}
+        agg["first"] = "min"
+        if self.sketch:
+            agg["sketch"] = lambda s: KLLSketch.from_values(s.to_numpy(), k=QUANTILE_SKETCH_K)
+        return rows.groupby(self.keys, dropna=False, observed=True, sort=False).agg(agg)
+
+    @classmethod
+    def from_frame(cls, frame, dims, date_column, measures, sketch=None):
+        cube = cls(dims, date_column, measures, sketch=sketch)
+        cube.cells = cube._aggregate(frame).reset_index()
+        return cube
+
+    def copy(self):
+        cube = AggregateCube(self.dims, self.date_column, self.measures, sketch=self.sketch)
+        cube.cells = self.cells.copy()
+        if self.sketch:
+            cube.cells["sketch"] = [s.copy() for s in cube.cells["sketch"]]
+        return cube
+
+    def apply(self, added=None, removed=None, current=None):
+        """Fold added rows in and subtract removed ones; `current` is the board after the change."""
+        dtypes = self.cells.dtypes.to_dict()
+        totals = ["rows", *self.measures]
+        cells = self.cells.set_index(self.keys)
+        if added is not None and len(added):
+            delta = self._aggregate(added)
+            cells = cells.reindex(cells.index.union(delta.index, sort=False))
+            cells[totals] = cells[totals].fillna(0)
+            cells.loc[delta.index, totals] += delta[totals]
+            cells["first"] = np.fmin(cells["first"], delta["first"].reindex(cells.index))
+            if self.sketch:
+                cells["sketch"] = [
+                    s.merged(d) if isinstance(s, KLLSketch) and isinstance(d, KLLSketch) else (
+                        s if isinstance(s, KLLSketch) else d
+                    )
+                    for s, d in zip(cells["sketch"], delta["sketch"].reindex(cells.index))
+                ]
+        if removed is not None and len(removed):
+            delta = self._aggregate(removed)
+            cells.loc[delta.index, totals] = cells.loc[delta.index, totals] - delta[totals]
+            if self.sketch:
+                stale = delta.index
+            else:
+                stale = delta.index[cells.loc[delta.index, "first"].to_numpy() == delta["first"].to_numpy()]
+            cells = cells[cells["rows"] > 0]
+            stale = stale[stale.isin(cells.index)]
+            if len(stale) and current is not None:
+                fresh = self._aggregate(current)
+                refreshed = ["first", "sketch"] if self.sketch else ["first"]
+                cells.loc[stale, refreshed] = fresh.loc[stale, refreshed]
+        self.cells = cells.reset_index().astype(self._restore(dtypes, cells))
+        with self._merged_lock:
+            self._merged.clear()
+        return self
+
+    def _restore(self, dtypes, cells):
+        # Keep categorical dimensions categorical, widened by any value first
+        # seen in this update; casting to the old categories would turn new
+        # sectors / statuses / stages into NaN.
+        out = dict(dtypes)
+        for dim in self.dims:
+            dtype = dtypes.get(dim)
+            if isinstance(dtype, pd.CategoricalDtype):
+                values = pd.Index(cells.index.get_level_values(dim).dropna().unique()).astype(object)
+                extra = values.difference(dtype.categories.astype(object), sort=False)
+                if len(extra):
+                    out[dim] = pd.CategoricalDtype(dtype.categories.append(extra), ordered=dtype.ordered)
+        return out
+
+    def slice(self, sector_dim=None, sector=None, timeframe=None, date_column=None):
+        """Cells inside a sector / timeframe view, or None if the cube cannot answer it."""
+        cells = self.cells
+        if timeframe is not None:
+            if date_column != self.date_column or timeframe.start.day != 1 or timeframe.end.day != 1:
+                return None
+            start = np.datetime64(timeframe.start, "ns")
+            end = np.datetime64(timeframe.end, "ns")
+            months = cells["month"].to_numpy(dtype="datetime64[ns]")
+            cells = cells[(months >= start) & (months < end)]
+        if sector:
+            cells = cells[cells[sector_dim].astype(str).str.lower() == sector.lower()]
+        return cells
+
+    def merged_sketch(self, sector_dim=None, sector=None, timeframe=None, date_column=None, max_entries=64):
+        """`(rows, sketch)` merged over a slice's cells and cached; the sketch is shared, do not update it."""
+        if not self.sketch:
+            return None
+        window = None if timeframe is None else (timeframe.start, timeframe.end, date_column)
+        key = (sector_dim, sector.lower() if sector else None, window)
+        with self._merged_lock:
+            hit = self._merged.get(key)
+            if hit is not None:
+                self._merged.move_to_end(key)
+                return hit
+        cells = self.slice(sector_dim, sector, timeframe, date_column)
+        if cells is None:
+            return None
+        merged = (int(cells["rows"].sum()), merge_all(cells["sketch"], k=QUANTILE_SKETCH_K))
+        with self._merged_lock:
+            self._merged[key] = merged
+            while len(self._merged) > max_entries:
+                self._merged.popitem(last=False)
+        return merged
+
+
+def counts(cells: pd.DataFrame, dim, measure="rows") -> pd.Series:
+    """Per-value totals of `dim` in first-appearance order, stably sorted descending."""
+    grouped = cells.groupby(dim, dropna=False, observed=True, sort=False).agg(n=(measure, "sum"), first=("first", "min"))
+    grouped = grouped[grouped["n"] > 0].sort_values("first", kind="stable")
+    return grouped["n"].astype("int64").sort_values(ascending=False, kind="stable").rename("count")
+
+
+def build_deals_cube(frame: pd.DataFrame) -> AggregateCube:
+    return AggregateCube.from_frame(
+        frame,
+        dims=["Sector/service", "Deal Status", "Deal Stage"],
+        date_column="Created Date",
+        measures={
+            "named": lambda df: df["Deal Name"].notna().astype("int64"),
+            "value": lambda df: parse_amount(df["Masked Deal value"]).fillna(0) if "Masked Deal value" in df.columns else 0.0,
+        },
+    )
+
+
+def build_work_orders_cube(frame: pd.DataFrame) -> AggregateCube:
+    def _receivable(df):
+        return parse_amount(df[RECEIVABLE_COLUMN]).fillna(0) if RECEIVABLE_COLUMN in df.columns else 0.0
+
+    return AggregateCube.from_frame(
+        frame,
+        dims=["Sector"],
+        date_column="Date of PO/LOI",
+        measures={
+            "named": lambda df: df["Deal name masked"].notna().astype("int64"),
+            "receivable": _receivable,
+            "negative": lambda df: (_receivable(df) < 0).astype("int64") if RECEIVABLE_COLUMN in df.columns else 0,
+        },
+        sketch=_receivable,
+    )
+
+
+class CubeView:
+    """The slice of `cube` one frame was cut from (sector, timeframe, date column)."""
+
+    def __init__(self, cube, sector=None, timeframe=None, date_column=None):
+        self.cube = cube
+        self.sector = sector
+        self.timeframe = timeframe
+        self.date_column = date_column
+
+    def narrowed(self, sector, timeframe, date_column):
+        """View of a sub-slice; only an unfiltered view can be narrowed."""
+        if self.sector or self.timeframe is not None:
+            return None
+        return CubeView(self.cube, sector, timeframe, date_column)
+
+
+class CubeViews:
+    """Cube views keyed on frame identity, so derived frames never reuse their source's cube."""
+
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def attach(self, frame, view):
+        key = id(frame)
+        with self._lock:
+            self._views[key] = (weakref.ref(frame), view)
+        weakref.finalize(frame, self._drop, key)
+
+    def _drop(self, key):
+        with self._lock:
+            entry = self._views.get(key)
+            if entry is not None and entry[0]() is None:
+                del self._views[key]
+
+    def get(self, frame):
+        if frame is None:
+            return None
+        with self._lock:
+            entry = self._views.get(id(frame))
+        if entry is None or entry[0]() is not frame:
+            return None
+        return entry[1]
+
+
+cube_views = CubeViews()
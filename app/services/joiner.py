@@ -0,0 +1,143 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEALS_KEY = "Deal Name"
+WO_KEY = "Deal name masked"
+
+
+def key_codes(values) -> np.ndarray:
+    """Key code per value: a 63-bit hash of the stripped name, -1 where missing."""
+    values = pd.Series(values, dtype=object)
+    present = values.notna().to_numpy()
+    codes = np.full(len(values), -1, dtype=np.int64)
+    if present.any():
+        names = values[present].astype(str).str.strip().to_numpy(dtype=object)
+        codes[present] = (pd.util.hash_array(names) >> np.uint64(1)).astype(np.int64)
+    return codes
+
+
+class _BoardKeys:
+    def __init__(self, version, keys, codes):
+        self.version = version
+        self.keys = keys
+        self.codes = codes
+        self._by_code = None
+
+    def by_code(self):
+        """(sorted codes, row labels in that order), built once per entry."""
+        if self._by_code is None:
+            self._by_code = _sorted_codes(self.codes)
+        return self._by_code
+
+
+def _sorted_codes(codes: pd.Series):
+    values = codes.to_numpy()
+    order = np.argsort(values, kind="stable")
+    return values[order], codes.index[order]
+
+
+class JoinIndex:
+    """Cross-board join index on normalised deal names, cached per board data version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boards = {}
+        self.rows_encoded = 0
+
+    def _encode(self, values: pd.Series) -> pd.Series:
+        self.rows_encoded += len(values)
+        return pd.Series(key_codes(values), index=values.index)
+
+    def _update(self, entry, version, values: pd.Series) -> _BoardKeys:
+        """Entry for `version` covering `values`, reusing codes of unchanged rows."""
+        values = values.astype(object)
+        reused = values.index.intersection(entry.keys.index) if entry is not None else values.index[:0]
+        if len(reused):
+            old, new = entry.keys.loc[reused], values.loc[reused]
+            same = old.eq(new).fillna(False) | (old.isna() & new.isna())
+            reused = reused[same.to_numpy(dtype=bool)]
+        fresh = values.index.difference(reused)
+        parts = [entry.codes.loc[reused]] if len(reused) else []
+        if len(fresh) or not parts:
+            parts.append(self._encode(values.loc[fresh]))
+        codes = pd.concat(parts) if len(parts) > 1 else parts[0]
+        if entry is not None and entry.version == version:
+            # Same data, more rows: keep what earlier views already encoded.
+            extra = entry.keys.index.difference(values.index)
+            values = pd.concat([entry.keys.loc[extra], values])
+            codes = pd.concat([entry.codes.loc[extra], codes])
+        return _BoardKeys(version, values, codes)
+
+    def codes(self, board, df: pd.DataFrame, column) -> pd.Series:
+        """Key code for each row of `df` (-1 where the key is missing)."""
+        if column not in df.columns:
+            return pd.Series(-1, index=df.index, dtype=np.int64)
+        version = df.attrs.get("data_version")
+        with self._lock:
+            if version is None or not df.index.is_unique:
+                return self._encode(df[column])
+            entry = self._boards.get(board)
+            if entry is None or entry.version != version:
+                entry = self._boards[board] = self._update(entry, version, df[column])
+            else:
+                missing = df.index.difference(entry.codes.index)
+                if len(missing):
+                    entry = self._boards[board] = self._update(entry, version, df[column].loc[missing])
+            return entry.codes.loc[df.index]
+
+    def deal_codes(self, deals: pd.DataFrame) -> pd.Series:
+        return self.codes("deals", deals, DEALS_KEY)
+
+    def work_order_codes(self, work_orders: pd.DataFrame) -> pd.Series:
+        return self.codes("work_orders", work_orders, WO_KEY)
+
+    def overlap_count(self, deals: pd.DataFrame, work_orders: pd.DataFrame) -> int:
+        d = self.deal_codes(deals).to_numpy()
+        w = self.work_order_codes(work_orders).to_numpy()
+        return len(np.intersect1d(d[d >= 0], w[w >= 0]))
+
+    def _work_orders_by_code(self, work_orders: pd.DataFrame):
+        """Code-sorted codes and labels, and whether they cover more rows than `work_orders`."""
+        w = self.work_order_codes(work_orders)
+        version = work_orders.attrs.get("data_version")
+        with self._lock:
+            entry = self._boards.get("work_orders")
+        if version is None or entry is None or entry.version != version or WO_KEY not in work_orders.columns:
+            return _sorted_codes(w), False
+        sorted_codes, labels = entry.by_code()
+        return (sorted_codes, labels), len(labels) != len(w)
+
+    def pairs(self, deals: pd.DataFrame, work_orders: pd.DataFrame) -> pd.DataFrame:
+        """Matching (deal row label, work-order row label) pairs for joined metrics."""
+        d = self.deal_codes(deals)
+        d = d[d.to_numpy() >= 0]
+        (sorted_codes, labels), wider = self._work_orders_by_code(work_orders)
+        keys = d.to_numpy()
+        start = np.searchsorted(sorted_codes, keys, side="left")
+        counts = np.searchsorted(sorted_codes, keys, side="right") - start
+        total = int(counts.sum())
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        out = pd.DataFrame(
+            {
+                "key": np.repeat(keys, counts),
+                "deal_row": np.repeat(d.index.to_numpy(), counts),
+                "work_order_row": labels[np.repeat(start, counts) + offsets],
+            }
+        )
+        if wider:
+            # The cached version covers more rows than this (filtered) view.
+            out = out[out["work_order_row"].isin(work_orders.index)].reset_index(drop=True)
+        return out
+
+    def work_orders_for(self, deal_name, work_orders: pd.DataFrame) -> pd.DataFrame:
+        """Work-order rows linked to `deal_name` (deal-to-work-order drilldown)."""
+        codes = self.work_order_codes(work_orders)
+        code = key_codes([deal_name])[0]
+        if code < 0:
+            return work_orders.iloc[:0]
+        return work_orders[codes.to_numpy() == code]
+
+
+join_index = JoinIndex()
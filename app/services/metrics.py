@@ -0,0 +1,269 @@
+import numpy as np
+import pandas as pd
+
+from app.config import RECEIVABLE_QUANTILE_MODE
+from app.services.cube import RECEIVABLE_COLUMN, counts, cube_views
+from app.services.joiner import join_index
+from app.services.sketch import KLLSketch
+from app.tools.trace import trace_span
+
+# Shared intermediates each metric reads. The engine computes the union of
+# these once per request, so adding a metric that reuses existing
+# intermediates costs only its own (cheap) final step.
+METRIC_INPUTS = {
+    "pipeline_summary": ("status_counts", "stage_counts"),
+    "receivable_summary": ("receivable_totals",),
+    "cross_board_overlap": ("deal_keys", "wo_keys"),
+    "pipeline_by_stage_status": ("stage_status_pivot",),
+    "sector_performance": ("sector_status_counts", "wo_sector_counts"),
+    "conversion_metrics": ("status_counts",),
+    "receivable_risk": ("receivable_distribution",),
+}
+
+
+def _num(series):
+    # Frames loaded through the tools already hold float amounts.
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    cleaned = (
+        series.astype(str)
+        .str.replace(",", "", regex=False)
+        .str.replace("₹", "", regex=False)
+        .str.strip()
+        .replace({"": pd.NA, "nan": pd.NA, "None": pd.NA})
+    )
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+def _counts(series):
+    # Count in first-appearance order and sort stably so ties rank the same
+    # whether the column is object or categorical. Categorical columns also
+    # report unobserved categories, which are dropped here.
+    counts = series.value_counts(dropna=False, sort=False)
+    counts = counts[counts > 0].reindex(pd.unique(series))
+    return counts.sort_values(ascending=False, kind="stable")
+
+
+def _cube_cells(frame, sector_dim):
+    # Only frames the dataset cache handed out with a cube view attached
+    # (see `cube_views`) are answered from the cube.
+    view = cube_views.get(frame)
+    if view is None:
+        return None
+    cells = view.cube.slice(sector_dim, view.sector, view.timeframe, view.date_column)
+    if cells is None or int(cells["rows"].sum()) != len(frame):
+        return None
+    return cells
+
+
+def _cube_sketch(frame, sector_dim):
+    # The merged sketch is cached on the (per-version) cube for each slice.
+    view = cube_views.get(frame)
+    if view is None:
+        return None
+    merged = view.cube.merged_sketch(sector_dim, view.sector, view.timeframe, view.date_column)
+    if merged is None or merged[0] != len(frame):
+        return None
+    return merged[1]
+
+
+class MetricsEngine:
+    """Analytics metrics over one deals / work-orders pair, with memoised intermediates."""
+
+    def __init__(
+        self,
+        deals: pd.DataFrame | None = None,
+        work_orders: pd.DataFrame | None = None,
+        quantile_mode=RECEIVABLE_QUANTILE_MODE,
+        tracer=None,
+    ):
+        self.deals = deals
+        self.work_orders = work_orders
+        self.quantile_mode = quantile_mode
+        self.tracer = tracer
+        self._memo = {}
+
+    def _get(self, name):
+        if name not in self._memo:
+            with trace_span(self.tracer, "metric_input", name):
+                self._memo[name] = getattr(self, f"_build_{name}")()
+        return self._memo[name]
+
+    @property
+    def intermediates(self):
+        return len(self._memo)
+
+    def compute(self, metrics):
+        """Return `{metric: result}`, building each shared intermediate once."""
+        for name in dict.fromkeys(i for m in metrics for i in METRIC_INPUTS[m]):
+            self._get(name)
+        results = {}
+        for m in metrics:
+            with trace_span(self.tracer, "metric", m):
+                results[m] = getattr(self, m)()
+        return results
+
+    # Intermediates
+
+    def _build_deal_cells(self):
+        return _cube_cells(self.deals, "Sector/service")
+
+    def _build_wo_cells(self):
+        return _cube_cells(self.work_orders, "Sector")
+
+    def _build_status_counts(self):
+        cells = self._get("deal_cells")
+        if cells is not None:
+            return counts(cells, "Deal Status")
+        return _counts(self.deals["Deal Status"])
+
+    def _build_stage_counts(self):
+        cells = self._get("deal_cells")
+        if cells is not None:
+            return counts(cells, "Deal Stage")
+        return _counts(self.deals["Deal Stage"])
+
+    def _build_receivables(self):
+        if RECEIVABLE_COLUMN not in self.work_orders.columns:
+            return None
+        return _num(self.work_orders[RECEIVABLE_COLUMN]).fillna(0)
+
+    def _build_receivable_totals(self):
+        if RECEIVABLE_COLUMN not in self.work_orders.columns:
+            return None
+        cells = self._get("wo_cells")
+        if cells is not None:
+            return float(cells["receivable"].sum()), int(cells["negative"].sum())
+        s = self._get("receivables")
+        return float(s.sum()), int((s < 0).sum())
+
+    def _build_receivable_distribution(self):
+        if RECEIVABLE_COLUMN not in self.work_orders.columns:
+            return None
+        if self.quantile_mode == "approx":
+            sketch = _cube_sketch(self.work_orders, "Sector")
+            if sketch is not None:
+                return sketch
+        return self._get("receivables")
+
+    def _build_deal_keys(self):
+        codes = join_index.deal_codes(self.deals).to_numpy()
+        return np.unique(codes[codes >= 0])
+
+    def _build_wo_keys(self):
+        codes = join_index.work_order_codes(self.work_orders).to_numpy()
+        return np.unique(codes[codes >= 0])
+
+    def _build_stage_status_pivot(self):
+        # Returns the stage x status pivot and the first status seen, which
+        # the pipeline table is sorted by.
+        cells = self._get("deal_cells")
+        if cells is not None:
+            statuses = cells.dropna(subset=["Deal Status"])
+            first = [statuses["Deal Status"].loc[statuses["first"].idxmin()]] if len(statuses) else []
+            pivot = (
+                statuses.dropna(subset=["Deal Stage"])
+                .groupby(["Deal Stage", "Deal Status"], observed=True)["named"]
+                .sum()
+                .unstack("Deal Status", fill_value=0)
+            )
+            return pivot, first
+        pivot = self.deals.pivot_table(
+            index="Deal Stage",
+            columns="Deal Status",
+            values="Deal Name",
+            aggfunc="count",
+            fill_value=0,
+            observed=True,
+        )
+        return pivot, list(self.deals["Deal Status"].dropna().unique())[:1]
+
+    def _build_sector_status_counts(self):
+        cells = self._get("deal_cells")
+        if cells is not None:
+            return cells.groupby(["Sector/service", "Deal Status"], dropna=False, observed=True)["named"].sum()
+        return self.deals.groupby(["Sector/service", "Deal Status"], dropna=False, observed=True)["Deal Name"].count()
+
+    def _build_wo_sector_counts(self):
+        cells = self._get("wo_cells")
+        if cells is not None:
+            return cells.groupby("Sector", dropna=False, observed=True)["named"].sum()
+        return self.work_orders.groupby("Sector", dropna=False, observed=True)["Deal name masked"].count()
+
+    # Metrics
+
+    def pipeline_summary(self):
+        by_status = self._get("status_counts").to_dict()
+        by_stage = self._get("stage_counts").head(8).to_dict()
+        return {"by_status": by_status, "top_stages": by_stage, "rows": len(self.deals)}
+
+    def receivable_summary(self):
+        totals = self._get("receivable_totals")
+        if totals is None:
+            return {"total_receivable": None, "negative_count": None}
+        return {"total_receivable": totals[0], "negative_count": totals[1]}
+
+    def cross_board_overlap(self):
+        keys = np.intersect1d(self._get("deal_keys"), self._get("wo_keys"), assume_unique=True)
+        return {"overlap_count": len(keys)}
+
+    def pipeline_by_stage_status(self):
+        pivot, first_status = self._get("stage_status_pivot")
+        pivot = pivot.sort_values(by=first_status, ascending=False).head(10)
+        return {"stage_status_table": pivot.to_dict()}
+
+    def sector_performance(self):
+        counts = self._get("sector_status_counts")
+        deals_sector = counts.groupby(level=0, dropna=False, observed=True).sum().rename("deal_count")
+        won = counts[counts.index.get_level_values(1) == "Won"]
+        won = won[won.index.get_level_values(0).notna()]
+        won_sector = won.droplevel(1).rename("won_count")
+        wo_sector = self._get("wo_sector_counts").rename("work_order_count")
+
+        merged = pd.concat([deals_sector, won_sector, wo_sector], axis=1).fillna(0)
+        merged["win_rate"] = (merged["won_count"] / merged["deal_count"].replace(0, pd.NA)).fillna(0)
+        merged = merged.sort_values("deal_count", ascending=False).head(10)
+        return {"sector_metrics": merged.reset_index().to_dict(orient="records")}
+
+    def conversion_metrics(self):
+        status = self._get("status_counts")
+        total = max(len(self.deals), 1)
+        won = int(status.get("Won", 0))
+        dead = int(status.get("Dead", 0))
+        open_ = int(status.get("Open", 0))
+        return {
+            "won_count": won,
+            "dead_count": dead,
+            "open_count": open_,
+            "won_rate": won / total,
+            "dead_rate": dead / total,
+            "open_rate": open_ / total,
+            "total_deals": len(self.deals),
+        }
+
+    def receivable_risk(self):
+        dist = self._get("receivable_distribution")
+        if dist is None:
+            return {"negative_rows": 0, "high_outstanding_rows": 0, "threshold": None}
+
+        if isinstance(dist, KLLSketch):
+            total, negatives = self._get("receivable_totals")
+            threshold = dist.quantile(0.9) if dist.n else 0.0
+            return {
+                "negative_rows": negatives,
+                "high_outstanding_rows": dist.n - dist.count_below(threshold),
+                "threshold": threshold,
+                "total_outstanding": total,
+                "quantile_mode": "approx",
+                "rank_error": round(dist.rank_error, 4),
+            }
+
+        s = dist
+        threshold = float(s.quantile(0.9)) if len(s) else 0.0
+        return {
+            "negative_rows": int((s < 0).sum()),
+            "high_outstanding_rows": int((s >= threshold).sum()),
+            "threshold": threshold,
+            "total_outstanding": float(s.sum()),
+            "quantile_mode": "exact",
+        }
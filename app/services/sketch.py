@@ -0,0 +1,110 @@
+import math
+
+import numpy as np
+
+
+def kll_rank_error(k):
+    """Normalized rank error (99% confidence) of a KLL sketch with parameter `k`."""
+    return 2.296 / k**0.9723
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch (Karnin-Lang-Liberty), exact until it first compacts."""
+
+    def __init__(self, k=200, c=2 / 3, seed=0):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return int(math.ceil(self.c**depth * self.k)) + 1
+
+    def _size(self):
+        return sum(len(level) for level in self.levels)
+
+    def _max_size(self):
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for h, level in enumerate(self.levels):
+                if len(level) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                ordered = np.sort(level)
+                keep = ordered[: len(ordered) % 2]
+                promoted = ordered[len(ordered) % 2 :][self._rng.integers(2) :: 2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                break
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    @classmethod
+    def from_values(cls, values, k=200):
+        return cls(k=k).update(values)
+
+    def merged(self, other):
+        """A new sketch summarising both inputs; neither input is modified."""
+        out = KLLSketch(k=self.k, c=self.c)
+        depth = max(len(self.levels), len(other.levels))
+        out.levels = [
+            np.concatenate(
+                [a.levels[h] if h < len(a.levels) else np.empty(0) for a in (self, other)]
+            )
+            for h in range(depth)
+        ]
+        out.n = self.n + other.n
+        out._compress()
+        return out
+
+    def copy(self):
+        out = KLLSketch(k=self.k, c=self.c)
+        out.levels = [level.copy() for level in self.levels]
+        out.n = self.n
+        return out
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2**h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], weights[order]
+
+    def quantile(self, q):
+        """Value at normalized rank `q` with pandas' linear interpolation, or NaN when empty."""
+        if self.n == 0:
+            return float("nan")
+        values, weights = self._weighted()
+        cumulative = np.cumsum(weights)
+        rank = q * (cumulative[-1] - 1)
+        lo, hi = np.searchsorted(cumulative, [math.floor(rank), math.ceil(rank)], side="right")
+        lo, hi = min(lo, len(values) - 1), min(hi, len(values) - 1)
+        return float(values[lo] + (rank - math.floor(rank)) * (values[hi] - values[lo]))
+
+    def count_below(self, x):
+        """Estimated number of inputs strictly less than `x`."""
+        values, weights = self._weighted()
+        return int(weights[: np.searchsorted(values, x, side="left")].sum())
+
+    @property
+    def rank_error(self):
+        return kll_rank_error(self.k)
+
+
+def merge_all(sketches, k=200):
+    out = KLLSketch(k=k)
+    for sketch in sketches:
+        out = out.merged(sketch)
+    return out
@@ -0,0 +1,202 @@
+import calendar
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.config import TIMEFRAME_TODAY
+
+_MONTHS = {
+    name: i + 1
+    for i, names in enumerate(
+        [
+            ("january", "jan"),
+            ("february", "feb"),
+            ("march", "mar"),
+            ("april", "apr"),
+            ("may",),
+            ("june", "jun"),
+            ("july", "jul"),
+            ("august", "aug"),
+            ("september", "sep", "sept"),
+            ("october", "oct"),
+            ("november", "nov"),
+            ("december", "dec"),
+        ]
+    )
+    for name in names
+}
+_FULL_MONTHS = {date(2000, m, 1).strftime("%B").lower() for m in range(1, 13)}
+_ISO_DATE = r"(\d{4}-\d{2}-\d{2})"
+_ALL_TIME = re.compile(r"\ball[- ]time\b")
+_RANGE = re.compile(rf"(?:between|from)?\s*{_ISO_DATE}\s*(?:to|until|through|and|-)\s*{_ISO_DATE}")
+_SINCE = re.compile(rf"\bsince\s+{_ISO_DATE}")
+_LAST_N = re.compile(r"\b(?:last|past)\s+(\d+)\s+(day|week|month)s?\b")
+_RELATIVE = re.compile(r"\b(this|last|previous|current)\s+(quarter|month|year)\b")
+_YTD = re.compile(r"\b(?:ytd|year to date)\b")
+_QUARTER = re.compile(r"\b(?:q([1-4])(?:\s*'?(\d{4}))?|(\d{4})\s*q([1-4]))\b")
+_MONTH = re.compile(r"\b(" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\b(?:\s+(\d{4}))?")
+_YEAR = re.compile(r"\b(20\d{2})\b")
+
+
+@dataclass(frozen=True)
+class Timeframe:
+    """A resolved date window: `start` inclusive, `end` exclusive (both dates)."""
+
+    label: str
+    start: date
+    end: date
+
+    @property
+    def last_day(self) -> date:
+        return self.end - timedelta(days=1)
+
+    def describe(self) -> str:
+        return f"{self.label} ({self.start.isoformat()} to {self.last_day.isoformat()})"
+
+
+def _today():
+    return date.fromisoformat(TIMEFRAME_TODAY) if TIMEFRAME_TODAY else date.today()
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _shift_months(day: date, months: int) -> date:
+    first = _add_months(day.replace(day=1), months)
+    return first.replace(day=min(day.day, calendar.monthrange(first.year, first.month)[1]))
+
+
+def _month(year, month, label):
+    start = date(year, month, 1)
+    return Timeframe(label, start, _add_months(start, 1))
+
+
+def _quarter(year, quarter, label):
+    start = date(year, 3 * (quarter - 1) + 1, 1)
+    return Timeframe(label, start, _add_months(start, 3))
+
+
+def _year(year, label):
+    return Timeframe(label, date(year, 1, 1), date(year + 1, 1, 1))
+
+
+def resolve_timeframe(text, today=None):
+    """Resolve text such as "last quarter" or "q3 2025" to a Timeframe, or None for all-time."""
+    if not text:
+        return None
+    q = str(text).lower()
+    today = today or _today()
+
+    if _ALL_TIME.search(q):
+        return None
+
+    m = _RANGE.search(q)
+    if m:
+        start, last = sorted(date.fromisoformat(d) for d in m.groups())
+        return Timeframe(f"{start.isoformat()} to {last.isoformat()}", start, last + timedelta(days=1))
+
+    m = _SINCE.search(q)
+    if m:
+        start = date.fromisoformat(m.group(1))
+        return Timeframe(f"since {start.isoformat()}", start, today + timedelta(days=1))
+
+    m = _LAST_N.search(q)
+    if m:
+        n, unit = int(m.group(1)), m.group(2)
+        if unit == "month":
+            start = _shift_months(today, -n)
+        else:
+            start = today - timedelta(days=n * (7 if unit == "week" else 1))
+        label = f"last {n} {unit}{'s' if n != 1 else ''}"
+        return Timeframe(label, start + timedelta(days=1), today + timedelta(days=1))
+
+    m = _RELATIVE.search(q)
+    if m:
+        which, unit = m.groups()
+        back = 1 if which in ("last", "previous") else 0
+        label = f"{'last' if back else 'this'} {unit}"
+        if unit == "month":
+            start = _add_months(today.replace(day=1), -back)
+            return Timeframe(label, start, _add_months(start, 1))
+        if unit == "quarter":
+            start = _add_months(date(today.year, 3 * ((today.month - 1) // 3) + 1, 1), -3 * back)
+            return Timeframe(label, start, _add_months(start, 3))
+        return _year(today.year - back, label)
+
+    if _YTD.search(q):
+        return Timeframe("year to date", date(today.year, 1, 1), today + timedelta(days=1))
+
+    m = _QUARTER.search(q)
+    if m:
+        quarter = int(m.group(1) or m.group(4))
+        year = int(m.group(2) or m.group(3) or today.year)
+        return _quarter(year, quarter, f"Q{quarter} {year}")
+
+    for m in _MONTH.finditer(q):
+        name, year = m.groups()
+        # "may" and abbreviations are too ambiguous to accept without a year.
+        if year is None and (name == "may" or name not in _FULL_MONTHS):
+            continue
+        month = _MONTHS[name]
+        year = int(year or today.year)
+        return _month(year, month, date(year, month, 1).strftime("%B %Y"))
+
+    m = _YEAR.search(q)
+    if m:
+        return _year(int(m.group(1)), m.group(1))
+    return None
+
+
+def _date_values(series: pd.Series) -> np.ndarray:
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors="coerce", format="mixed")
+    return series.to_numpy(dtype="datetime64[ns]")
+
+
+class DateIndex:
+    """Positions of a date column's rows sorted by date, for binary-searched range lookups."""
+
+    def __init__(self, series: pd.Series):
+        values = _date_values(series)
+        dated = ~np.isnat(values)
+        order = np.argsort(values[dated], kind="stable")
+        self.dates = values[dated][order]
+        self.positions = np.flatnonzero(dated)[order]
+        self.undated = np.flatnonzero(~dated)
+
+    def select(self, timeframe: Timeframe, within=None):
+        """Return `(positions, undated_count)` for rows inside `timeframe`, in row order."""
+        lo, hi = np.searchsorted(
+            self.dates,
+            [np.datetime64(timeframe.start, "ns"), np.datetime64(timeframe.end, "ns")],
+            side="left",
+        )
+        rows = np.sort(self.positions[lo:hi])
+        undated = self.undated
+        if within is not None:
+            rows = np.intersect1d(rows, within, assume_unique=True)
+            undated = np.intersect1d(undated, within, assume_unique=True)
+        return rows, len(undated)
+
+
+def filter_frame(df: pd.DataFrame, column, timeframe: Timeframe, index: DateIndex | None = None) -> pd.DataFrame:
+    """Rows of `df` whose `column` falls in `timeframe`; undated rows are counted in attrs."""
+    if column not in df.columns:
+        out = df.iloc[:0]
+        out.attrs["undated_rows"] = len(df)
+        return out
+    if index is not None:
+        rows, undated = index.select(timeframe)
+        out = df.iloc[rows]
+    else:
+        values = _date_values(df[column])
+        start, end = np.datetime64(timeframe.start, "ns"), np.datetime64(timeframe.end, "ns")
+        out = df[(values >= start) & (values < end)]
+        undated = int(np.isnat(values).sum())
+    out.attrs["undated_rows"] = undated
+    return out
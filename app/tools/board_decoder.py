@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+
+def _is_numeric_column(column_id):
+    return str(column_id).startswith("numeric_")
+
+
+def _to_float(text):
+    if text is None or text == "":
+        return np.nan
+    try:
+        return float(str(text).replace(",", ""))
+    except ValueError:
+        return np.nan
+
+
+class ColumnarDecoder:
+    """Decode monday item pages straight into typed column buffers; call `frame()` once at the end."""
+
+    def __init__(self, name_column, column_map, capacity=0):
+        self.name_column = name_column
+        self.column_map = column_map
+        self.rows = 0
+        self._capacity = capacity
+        self._buffers = {name_column: np.empty(capacity, dtype=object)}
+        self._numeric = {name_column: False}
+        self._slots = {}
+
+    def _grow(self, needed):
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2)
+        for name, buf in self._buffers.items():
+            fresh = np.full(capacity, np.nan) if self._numeric[name] else np.empty(capacity, dtype=object)
+            fresh[: self.rows] = buf[: self.rows]
+            self._buffers[name] = fresh
+        self._capacity = capacity
+
+    def _slot(self, column_id):
+        name = self._slots.get(column_id)
+        if name is None:
+            name = self.column_map.get(column_id, column_id)
+            numeric = _is_numeric_column(column_id)
+            self._numeric[name] = numeric
+            self._buffers[name] = (
+                np.full(self._capacity, np.nan) if numeric else np.empty(self._capacity, dtype=object)
+            )
+            self._slots[column_id] = name
+        return name
+
+    def decode(self, items):
+        self._grow(self.rows + len(items))
+        names = self._buffers[self.name_column]
+        for offset, item in enumerate(items):
+            row = self.rows + offset
+            names[row] = item.get("name")
+            for col in item.get("column_values", []):
+                name = self._slot(col.get("id"))
+                text = col.get("text")
+                self._buffers[name][row] = _to_float(text) if self._numeric[name] else text
+        self.rows += len(items)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: buf[: self.rows] for name, buf in self._buffers.items()})
@@ -0,0 +1,170 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from app.config import LOCAL_CACHE_MAX_ENTRIES, LOCAL_CACHE_MAX_MB
+from app.services.cube import ORDER_KEY, CubeView, cube_views
+from app.services.timeframe import DateIndex
+from app.tools.trace import trace_span
+
+
+def file_version(path) -> str:
+    """Version token of a file on disk: name, mtime and size."""
+    st = os.stat(path)
+    return f"{os.path.basename(path)}:{st.st_mtime_ns}:{st.st_size}"
+
+
+class CachedDataset:
+    """A parsed, read-only dataset plus lazily built lookups for cheap `view()`s."""
+
+    def __init__(self, path, frame, version, previous=None):
+        self.path = path
+        self.frame = frame
+        self.version = version
+        # Only a previous version with a cube can seed an incremental rebuild.
+        self._previous = previous if previous is not None and previous._cube is not None else None
+        self._cube = None
+        self.nbytes = int(frame.memory_usage(deep=True).sum())
+        self._sector_rows = {}
+        self._date_indexes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def footprint(self) -> int:
+        """Bytes held by this entry, including a retained previous frame."""
+        previous = self._previous
+        return self.nbytes + (previous.nbytes if previous is not None else 0)
+
+    def _rows_for(self, column, value):
+        with self._lock:
+            index = self._sector_rows.get(column)
+            if index is None:
+                keys = self.frame[column].astype(str).str.lower()
+                index = pd.Series(range(len(keys))).groupby(keys.values).indices
+                self._sector_rows[column] = index
+        return index.get(value.lower(), [])
+
+    def _date_index(self, column):
+        with self._lock:
+            index = self._date_indexes.get(column)
+            if index is None:
+                index = self._date_indexes[column] = DateIndex(self.frame[column])
+        return index
+
+    def _changed_rows(self, old: pd.DataFrame):
+        """Rows removed from `old` and added in the current frame, by content hash."""
+        old_hash = pd.util.hash_pandas_object(old, index=False)
+        new_hash = pd.util.hash_pandas_object(self.frame, index=False)
+        return self.frame[~new_hash.isin(old_hash).to_numpy()], old[~old_hash.isin(new_hash).to_numpy()]
+
+    def cube(self, builder, tracer=None):
+        """Aggregate cube of this dataset, updated from the previous version's cube when possible."""
+        with self._lock:
+            if self._cube is not None:
+                return self._cube
+            with trace_span(tracer, "aggregate_cube") as span:
+                previous, self._previous = self._previous, None
+                if (
+                    previous is not None
+                    and previous._cube is not None
+                    and ORDER_KEY in previous.frame.columns
+                    and ORDER_KEY in self.frame.columns
+                    and list(previous.frame.columns) == list(self.frame.columns)
+                ):
+                    added, removed = self._changed_rows(previous.frame)
+                    self._cube = previous._cube.copy().apply(added=added, removed=removed, current=self.frame)
+                    mode = f"incremental, added={len(added)}, removed={len(removed)}"
+                else:
+                    self._cube = builder(self.frame)
+                    mode = "full"
+                span.detail = f"build={mode}: {os.path.basename(self.path)}"
+                span.rows = len(self._cube.cells)
+            return self._cube
+
+    def view(self, columns=None, sector=None, sector_column=None, timeframe=None, date_column=None) -> pd.DataFrame:
+        df = self.frame
+        rows = None
+        if sector and sector_column in df.columns:
+            rows = self._rows_for(sector_column, sector)
+        undated = None
+        if timeframe is not None:
+            if date_column in df.columns:
+                rows, undated = self._date_index(date_column).select(timeframe, within=rows)
+            else:
+                rows, undated = [], (len(df) if rows is None else len(rows))
+        if rows is not None:
+            df = df.iloc[rows]
+        if columns is not None:
+            df = df[[c for c in df.columns if c in columns]]
+        if df is self.frame:
+            df = df.copy(deep=False)
+        df.attrs["data_version"] = self.version
+        if self._cube is not None:
+            cube_views.attach(df, CubeView(self._cube, sector, timeframe, date_column))
+        if undated is not None:
+            df.attrs["undated_rows"] = undated
+        return df
+
+
+class DatasetCache:
+    """Process-wide LRU cache of parsed local datasets, keyed on path, mtime and size."""
+
+    def __init__(self, max_bytes=int(LOCAL_CACHE_MAX_MB * 1024 * 1024), max_entries=LOCAL_CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def _path_lock(self, path):
+        with self._lock:
+            return self._load_locks.setdefault(path, threading.Lock())
+
+    def get(self, path, loader, tracer=None) -> CachedDataset:
+        """Return the cached dataset for `path`, parsing it with `loader` on a miss."""
+        path = os.path.abspath(path)
+        with trace_span(tracer, "dataset_cache") as span, self._path_lock(path):
+            version = file_version(path)
+            with self._lock:
+                entry = previous = self._entries.get(path)
+                if entry is not None and entry.version == version:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    hit = True
+                else:
+                    self.misses += 1
+                    hit = False
+            if not hit:
+                entry = CachedDataset(path, loader(path), version, previous=previous)
+                with self._lock:
+                    self._entries[path] = entry
+                    self._entries.move_to_end(path)
+                    self._evict()
+            span.detail = f"{'hit' if hit else 'miss'}: {os.path.basename(path)}, version={version}"
+            span.rows = len(entry.frame)
+        return entry
+
+    def _evict(self):
+        total = sum(e.footprint for e in self._entries.values())
+        # Previous versions only speed up a cube rebuild; drop them before whole entries.
+        for entry in self._entries.values():
+            previous = entry._previous
+            if total <= self.max_bytes:
+                break
+            if previous is not None:
+                entry._previous = None
+                total -= previous.nbytes
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.footprint
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+dataset_cache = DatasetCache()
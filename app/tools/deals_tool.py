@@ -1,7 +1,32 @@
+import asyncio
+from time import perf_counter_ns
+
 import pandas as pd
+from app.schemas import (
+    DEALS_SCHEMA,
+    apply_schema,
+    ensure_columns,
+    matches_ci,
+    preferred_dataset_path,
+    read_dataset,
+)
 from app.config import DATA_BACKEND, DEALS_CSV, MONDAY_DEALS_BOARD_ID
-from app.tools.trace import timed_call
-from app.tools.monday_client import fetch_board_items
+from app.services.cube import build_deals_cube
+from app.services.timeframe import filter_frame
+from app.tools.singleflight import aload_once, load_once
+from app.tools.snapshot_store import get_snapshot_store
+from app.tools.trace import timed_call, trace_span
+from app.tools.board_decoder import ColumnarDecoder
+from app.tools.dataset_cache import dataset_cache, file_version
+from app.tools.monday_async import aconsume_board_pages, astatus_labels
+from app.tools.monday_client import (
+    MondayQueryError,
+    any_of_rule,
+    build_query_params,
+    iter_board_pages,
+    label_indexes,
+    status_labels,
+)
 
 # Fill this after running scripts/probe_monday_boards.py.
 # Example:
@@ -28,55 +53,284 @@ DEALS_COLUMN_MAP = {
 }
 
 
+# Date column that timeframes are applied to unless the caller picks another.
+DATE_COLUMN = "Created Date"
+
+
 def _ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
-    required = [
-        "Deal Name",
-        "Deal Status",
-        "Deal Stage",
-        "Sector/service",
-        "Masked Deal value",
-    ]
-    for col in required:
-        if col not in df.columns:
-            df[col] = pd.NA
-    return df
+    return ensure_columns(df, DEALS_SCHEMA)
 
 
-def _load_local(sector=None):
-    df = pd.read_csv(DEALS_CSV)
-    df = _ensure_columns(df)
-    if sector:
-        df = df[df["Sector/service"].astype(str).str.lower() == sector.lower()]
+def _projection(columns, sector=None, date_column=None):
+    """Logical columns to load, or None when the caller wants all of them."""
+    if columns is None:
+        return None
+    wanted = list(dict.fromkeys(columns))
+    if sector and "Sector/service" not in wanted:
+        wanted.append("Sector/service")
+    if date_column and date_column not in wanted:
+        wanted.append(date_column)
+    return wanted
+
+
+def _column_ids(columns):
+    if columns is None or not DEALS_COLUMN_MAP:
+        return None
+    by_name = {name: col_id for col_id, name in DEALS_COLUMN_MAP.items()}
+    return [by_name[c] for c in columns if c in by_name]
+
+
+def _sector_column(sector):
+    """monday column ID to push a sector filter down to, or None."""
+    column_ids = _column_ids(["Sector/service"]) if sector else None
+    return column_ids[0] if column_ids else None
+
+
+def _sector_query_params(sector, labels):
+    """monday status-label rule matching the sector, or None to filter in pandas."""
+    indexes = label_indexes(labels, sector)
+    if not indexes:
+        return None
+    return build_query_params([any_of_rule(_sector_column(sector), indexes)])
+
+
+def _read_local(path):
+    return apply_schema(read_dataset(path), DEALS_SCHEMA)
+
+
+def _load_local(sector=None, columns=None, tracer=None, timeframe=None, date_column=DATE_COLUMN):
+    dataset = dataset_cache.get(preferred_dataset_path(DEALS_CSV), _read_local, tracer=tracer)
+    dataset.cube(build_deals_cube, tracer=tracer)
+    with trace_span(tracer, "dataset_view", _view_detail(sector, timeframe, date_column)) as span:
+        df = dataset.view(
+            columns=_projection(columns, sector, date_column if timeframe else None),
+            sector=sector,
+            sector_column="Sector/service",
+            timeframe=timeframe,
+            date_column=date_column,
+        )
+        span.rows = len(df)
+    return _ensure_columns(df)
+
+
+def _decode(pages, tracer=None):
+    with trace_span(tracer, "decode") as span:
+        decoder = ColumnarDecoder("Deal Name", DEALS_COLUMN_MAP)
+        for page in pages:
+            decoder.decode(page)
+        df = apply_schema(decoder.frame(), DEALS_SCHEMA)
+        span.rows = len(df)
     return df
 
 
-def _load_monday(sector=None):
-    items = fetch_board_items(MONDAY_DEALS_BOARD_ID)
-    rows = []
-    for item in items:
-        row = {"Deal Name": item.get("name")}
-        for col in item.get("column_values", []):
-            row[col.get("id")] = col.get("text")
-        rows.append(row)
+def _view_detail(sector, timeframe, date_column):
+    return f"sector={sector}" + (f", timeframe={timeframe.label}, date_column={date_column}" if timeframe else "")
 
-    df = pd.DataFrame(rows)
-    if not df.empty and DEALS_COLUMN_MAP:
-        df = df.rename(columns=DEALS_COLUMN_MAP)
 
+def _finish_monday(df, sector, pushed, timeframe, date_column, tracer=None):
     df = _ensure_columns(df)
-    if sector:
-        df = df[df["Sector/service"].astype(str).str.lower() == sector.lower()]
+    if (sector and not pushed) or timeframe is not None:
+        with trace_span(tracer, "pandas_filter", _view_detail(sector, timeframe, date_column)) as span:
+            df = _filter_monday(df, sector, pushed, timeframe, date_column)
+            span.rows = len(df)
     return df
 
-def get_deals(tracer, sector=None):
+
+def _filter_monday(df, sector, pushed, timeframe, date_column):
+    # Pandas filtering is only needed when the predicate was not pushed down.
+    if sector and not pushed:
+        df = df[matches_ci(df["Sector/service"], sector)]
+    if timeframe is not None:
+        df = filter_frame(df, date_column, timeframe)
+    return df
+
+
+def _load_monday(
+    sector=None,
+    tracer=None,
+    cancel_event=None,
+    columns=None,
+    max_staleness=None,
+    timeframe=None,
+    date_column=DATE_COLUMN,
+):
+    projection = _projection(columns, sector, date_column if timeframe else None)
+
+    def _fetch(query_params):
+        return _decode(
+            iter_board_pages(
+                MONDAY_DEALS_BOARD_ID,
+                tracer=tracer,
+                cancel_event=cancel_event,
+                column_ids=_column_ids(projection),
+                query_params=query_params,
+            ),
+            tracer,
+        )
+
+    started = perf_counter_ns()
+    query_params = None
+    column_id = _sector_column(sector)
+    if max_staleness is not None:
+        # Serve from the local snapshot, filtering the sector in SQLite.
+        store = get_snapshot_store()
+        store.ensure_fresh(MONDAY_DEALS_BOARD_ID, max_staleness, tracer=tracer, cancel_event=cancel_event)
+        match = (column_id, sector) if column_id is not None else None
+        df = _decode([store.items(MONDAY_DEALS_BOARD_ID, column_ids=_column_ids(projection), match=match)], tracer)
+        pushed = match is not None
+    else:
+        try:
+            if column_id is not None:
+                labels = status_labels(MONDAY_DEALS_BOARD_ID, column_id, cancel_event=cancel_event)
+                query_params = _sector_query_params(sector, labels)
+            df = _fetch(query_params)
+        except MondayQueryError as exc:
+            # Only a rejected rule or label lookup falls back; throttling that
+            # outlasted the retries and network errors propagate.
+            if column_id is None:
+                raise
+            if tracer is not None:
+                tracer.add("filter_pushdown_fallback", f"sector={sector}, reason={exc}", rows=0, start_ns=started)
+            query_params = None
+            df = _fetch(None)
+        else:
+            if query_params is not None and tracer is not None:
+                tracer.add("filter_pushdown", f"sector={sector}, rules={len(query_params['rules'])}", rows=len(df), start_ns=started)
+        pushed = query_params is not None
+
+    return _finish_monday(df, sector, pushed, timeframe, date_column, tracer)
+
+
+def _load_key(sector, columns, max_staleness, timeframe, date_column):
+    source = MONDAY_DEALS_BOARD_ID if DATA_BACKEND == "monday" else DEALS_CSV
+    key = (DATA_BACKEND, source, tuple(columns) if columns else None, sector, max_staleness)
+    if timeframe is not None:
+        key += (timeframe.start, timeframe.end, date_column)
+    return key
+
+
+def _fetch_detail(sector, columns, timeframe, date_column):
+    return f"backend={DATA_BACKEND}, sector={sector}, columns={len(columns) if columns else 'all'}" + (
+        f", timeframe={timeframe.label}, date_column={date_column}" if timeframe else ""
+    )
+
+
+def get_deals(
+    tracer,
+    sector=None,
+    cancel_event=None,
+    columns=None,
+    max_staleness=None,
+    timeframe=None,
+    date_column=DATE_COLUMN,
+):
+    """Load the board as a DataFrame; `max_staleness` reads the snapshot store instead of live monday."""
+
     def _load():
         if DATA_BACKEND == "monday":
-            return _load_monday(sector=sector)
-        return _load_local(sector=sector)
+            return _load_monday(
+                sector=sector,
+                tracer=tracer,
+                cancel_event=cancel_event,
+                columns=columns,
+                max_staleness=max_staleness,
+                timeframe=timeframe,
+                date_column=date_column,
+            )
+        return _load_local(
+            sector=sector,
+            columns=columns,
+            tracer=tracer,
+            timeframe=timeframe,
+            date_column=date_column,
+        )
 
+    key = _load_key(sector, columns, max_staleness, timeframe, date_column)
     return timed_call(
         tracer,
         "get_deals",
-        f"backend={DATA_BACKEND}, sector={sector}",
-        _load,
+        _fetch_detail(sector, columns, timeframe, date_column),
+        lambda: load_once(key, _load, tracer=tracer, cancel_event=cancel_event),
     )
+
+
+
+async def get_deals_async(
+    tracer,
+    sector=None,
+    cancel_event=None,
+    columns=None,
+    max_staleness=None,
+    timeframe=None,
+    date_column=DATE_COLUMN,
+):
+    """Async `get_deals`; only live monday fetches run on the event loop."""
+    if DATA_BACKEND != "monday" or max_staleness is not None:
+        return await asyncio.to_thread(
+            get_deals,
+            tracer,
+            sector=sector,
+            cancel_event=cancel_event,
+            columns=columns,
+            max_staleness=max_staleness,
+            timeframe=timeframe,
+            date_column=date_column,
+        )
+
+    projection = _projection(columns, sector, date_column if timeframe else None)
+
+    async def _fetch(query_params):
+        # Pages are decoded in worker threads as they arrive, like the sync
+        # path's streaming decode, so pandas work stays off the event loop.
+        with trace_span(tracer, "decode") as span:
+            decoder = ColumnarDecoder("Deal Name", DEALS_COLUMN_MAP)
+            await aconsume_board_pages(
+                MONDAY_DEALS_BOARD_ID,
+                decoder.decode,
+                tracer=tracer,
+                column_ids=_column_ids(projection),
+                query_params=query_params,
+                cancel_event=cancel_event,
+            )
+            df = await asyncio.to_thread(apply_schema, decoder.frame(), DEALS_SCHEMA)
+            span.rows = len(df)
+        return df
+
+    async def _load():
+        started = perf_counter_ns()
+        column_id = _sector_column(sector)
+        query_params = None
+        try:
+            if column_id is not None:
+                query_params = _sector_query_params(sector, await astatus_labels(MONDAY_DEALS_BOARD_ID, column_id))
+            df = await _fetch(query_params)
+        except MondayQueryError as exc:
+            if column_id is None:
+                raise
+            if tracer is not None:
+                tracer.add("filter_pushdown_fallback", f"sector={sector}, reason={exc}", rows=0, start_ns=started)
+            query_params = None
+            df = await _fetch(None)
+        else:
+            if query_params is not None and tracer is not None:
+                tracer.add("filter_pushdown", f"sector={sector}, rules={len(query_params['rules'])}", rows=len(df), start_ns=started)
+        return await asyncio.to_thread(_finish_monday, df, sector, query_params is not None, timeframe, date_column, tracer)
+
+    key = _load_key(sector, columns, max_staleness, timeframe, date_column)
+    with trace_span(tracer, "get_deals", _fetch_detail(sector, columns, timeframe, date_column)) as span:
+        df = await aload_once(key, _load, tracer=tracer, cancel_event=cancel_event)
+        span.rows = len(df)
+    return df
+
+
+def data_version(max_staleness=None):
+    """Token that changes whenever the board's data may have changed, or None if there is none."""
+    if DATA_BACKEND != "monday":
+        return file_version(preferred_dataset_path(DEALS_CSV))
+    if max_staleness is None:
+        return None
+    store = get_snapshot_store()
+    age = store.age(MONDAY_DEALS_BOARD_ID)
+    if age is None or age > max_staleness:
+        return None
+    return store.version(MONDAY_DEALS_BOARD_ID)
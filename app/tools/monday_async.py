@@ -0,0 +1,302 @@
+import asyncio
+import weakref
+
+try:
+    import httpx
+except ModuleNotFoundError:
+    httpx = None
+
+from app.config import (
+    MONDAY_API_TOKEN,
+    MONDAY_API_URL,
+    MONDAY_KEEP_ALIVE,
+    MONDAY_POOL_CONNECTIONS,
+    MONDAY_POOL_MAXSIZE,
+    MONDAY_TIMEOUT,
+)
+from app.tools.monday_client import (
+    LABELS_QUERY,
+    FetchCancelled,
+    MondayQueryError,
+    MondayThrottled,
+    _throttle_from_errors,
+    cached_status_labels,
+    fetch_board_items,
+    get_client,
+    iter_board_pages,
+    page_queries,
+    parse_status_labels,
+    run_monday_query,
+    status_labels,
+    store_status_labels,
+    trace_fetch_stats,
+)
+from app.tools.trace import trace_span
+
+
+class AsyncMondayClient:
+    """Asyncio `MondayClient` over a pooled `httpx.AsyncClient`, sharing the sync client's scheduler."""
+
+    def __init__(
+        self,
+        api_url=MONDAY_API_URL,
+        token=MONDAY_API_TOKEN,
+        pool_connections=MONDAY_POOL_CONNECTIONS,
+        pool_maxsize=MONDAY_POOL_MAXSIZE,
+        keep_alive=MONDAY_KEEP_ALIVE,
+        timeout=MONDAY_TIMEOUT,
+    ):
+        self.api_url = api_url
+        self.token = token
+        self.requests = 0
+        self.scheduler = get_client().scheduler
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_connections if keep_alive else 0,
+            ),
+            headers={
+                "Content-Type": "application/json",
+                "Connection": "keep-alive" if keep_alive else "close",
+            },
+        )
+
+    async def post(self, query: str, variables: dict | None = None, stats=None) -> dict:
+        """POST one query; `stats["new_connections"]` counts connections it opened."""
+        if not self.token:
+            raise RuntimeError("MONDAY_API_TOKEN is not set")
+
+        opened = 0
+
+        async def _trace(event, info):
+            # httpcore only connects when the pool has no idle connection.
+            nonlocal opened
+            if event == "connection.connect_tcp.complete":
+                opened += 1
+
+        resp = await self.http.post(
+            self.api_url,
+            json={"query": query, "variables": variables or {}},
+            headers={"Authorization": self.token},
+            extensions={"trace": _trace},
+        )
+        if stats is not None:
+            stats["new_connections"] = stats.get("new_connections", 0) + opened
+        self.requests += 1
+        if resp.status_code == 429 or resp.status_code >= 500:
+            retry_after = resp.headers.get("Retry-After")
+            raise MondayThrottled(
+                f"Monday API returned HTTP {resp.status_code}",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def execute(self, query: str, variables: dict | None = None, page_size=None, stats=None):
+        """Async `MondayClient.execute`: scheduled, with throttled attempts retried."""
+        stats = stats if stats is not None else {}
+        attempt = 0
+        while True:
+            cost = self.scheduler.estimate(page_size)
+            while delay := self.scheduler.try_acquire(cost):
+                await asyncio.sleep(delay)
+                stats["waited_s"] = stats.get("waited_s", 0) + delay
+            try:
+                stats["requests"] = stats.get("requests", 0) + 1
+                payload = await self.post(query, variables, stats=stats)
+                errors = payload.get("errors") or (
+                    [payload["error_message"]] if payload.get("error_code") else None
+                )
+                if errors:
+                    throttled = _throttle_from_errors(errors)
+                    if throttled is None:
+                        raise MondayQueryError(f"Monday API errors: {errors}")
+                    raise throttled
+            except MondayThrottled as exc:
+                if attempt >= self.scheduler.max_retries:
+                    raise RuntimeError(f"{exc} (gave up after {attempt} retries)") from exc
+                delay = self.scheduler.backoff(attempt, exc.retry_after)
+                attempt += 1
+                stats["retries"] = stats.get("retries", 0) + 1
+                await asyncio.sleep(delay)
+                stats["waited_s"] = stats.get("waited_s", 0) + delay
+                continue
+
+            data = payload.get("data", {})
+            self.scheduler.record(data.get("complexity"), page_size)
+            return data
+
+
+# httpx async clients are bound to the event loop they were first used on.
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> AsyncMondayClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncMondayClient()
+    return client
+
+
+async def aclose_async_client():
+    """Close the running loop's monday.com client, if it opened one."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.http.aclose()
+
+
+async def arun_monday_query(query: str, variables: dict | None = None) -> dict:
+    if httpx is None:
+        return await asyncio.to_thread(run_monday_query, query, variables)
+    return await get_async_client().execute(query, variables)
+
+
+async def astatus_labels(board_id, column_id) -> dict[int, str]:
+    """Async `status_labels`, sharing its cache."""
+    labels = cached_status_labels(board_id, column_id)
+    if labels is not None:
+        return labels
+    if httpx is None:
+        return await asyncio.to_thread(status_labels, board_id, column_id)
+    data = await get_async_client().execute(LABELS_QUERY, {"board_id": [str(board_id)], "column_ids": [column_id]})
+    return store_status_labels(board_id, column_id, parse_status_labels(data))
+
+
+async def aiter_board_pages(
+    board_id: str,
+    max_page_size: int = 500,
+    tracer=None,
+    column_ids: list[str] | None = None,
+    query_params: dict | None = None,
+    prefetch: bool = True,
+    cancel_event=None,
+):
+    """Async `iter_board_pages`: yield a board's items page by page."""
+    if not board_id:
+        raise RuntimeError("Board ID is not configured")
+
+    client = get_async_client()
+    first_page_query, next_page_query = page_queries(column_ids, query_params)
+    extra = {"column_ids": list(column_ids)} if column_ids is not None else {}
+    stats = {}
+    page_sizes = []
+    parent = tracer.current() if tracer is not None else None
+
+    async def _page(query, variables, key):
+        limit = client.scheduler.page_size(max_page_size)
+        with trace_span(tracer, "monday_page", f"board={board_id}, limit={limit}", parent=parent) as span:
+            data = await client.execute(query, {**variables, "limit": limit, **extra}, page_size=limit, stats=stats)
+            page_sizes.append(limit)
+            if key == "boards":
+                boards = data.get("boards", [])
+                page = boards[0].get("items_page", {}) if boards else {}
+            else:
+                page = data.get(key, {})
+            span.rows = len(page.get("items", []))
+        return page
+
+    def _next(cursor):
+        if not cursor or not prefetch:
+            return None
+        return asyncio.create_task(_page(next_page_query, {"cursor": cursor}, "next_items_page"))
+
+    rows = 0
+    pending = None
+    try:
+        page = await _page(
+            first_page_query,
+            {
+                "board_id": str(board_id),
+                **({"query_params": query_params} if query_params is not None else {}),
+            },
+            "boards",
+        )
+        cursor = page.get("cursor")
+        pending = _next(cursor)
+        while True:
+            rows += len(page.get("items", []))
+            yield page.get("items", [])
+            if not cursor:
+                break
+            if cancel_event is not None and cancel_event.is_set():
+                raise FetchCancelled(f"Fetch of board {board_id} cancelled after {rows} items")
+            if pending is not None:
+                page = await pending
+            else:
+                page = await _page(next_page_query, {"cursor": cursor}, "next_items_page")
+            cursor = page.get("cursor")
+            pending = _next(cursor)
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+        if tracer is not None:
+            trace_fetch_stats(tracer, client, board_id, stats, page_sizes, rows, transport="httpx-async")
+
+
+async def aconsume_board_pages(
+    board_id: str,
+    consume,
+    max_page_size: int = 500,
+    tracer=None,
+    column_ids: list[str] | None = None,
+    query_params: dict | None = None,
+    cancel_event=None,
+):
+    """Pass each page of a board to `consume(items)` in a worker thread as it arrives."""
+    if httpx is None:
+
+        def _run():
+            for page in iter_board_pages(
+                board_id,
+                max_page_size=max_page_size,
+                tracer=tracer,
+                cancel_event=cancel_event,
+                column_ids=column_ids,
+                query_params=query_params,
+            ):
+                consume(page)
+
+        return await asyncio.to_thread(_run)
+    async for page in aiter_board_pages(
+        board_id,
+        max_page_size=max_page_size,
+        tracer=tracer,
+        column_ids=column_ids,
+        query_params=query_params,
+        cancel_event=cancel_event,
+    ):
+        await asyncio.to_thread(consume, page)
+
+
+async def afetch_board_items(
+    board_id: str,
+    max_page_size: int = 500,
+    tracer=None,
+    column_ids: list[str] | None = None,
+    query_params: dict | None = None,
+    cancel_event=None,
+) -> list[dict]:
+    """Download every item of a board as one list, without blocking the event loop."""
+    if httpx is None:
+        return await asyncio.to_thread(
+            fetch_board_items,
+            board_id,
+            max_page_size=max_page_size,
+            tracer=tracer,
+            cancel_event=cancel_event,
+            column_ids=column_ids,
+            query_params=query_params,
+        )
+    items: list[dict] = []
+    async for page in aiter_board_pages(
+        board_id,
+        max_page_size=max_page_size,
+        tracer=tracer,
+        column_ids=column_ids,
+        query_params=query_params,
+        cancel_event=cancel_event,
+    ):
+        items.extend(page)
+    return items
@@ -1,87 +1,572 @@
+import json
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+
 import requests
-from app.config import MONDAY_API_TOKEN, MONDAY_API_URL
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
+from app.config import (
+    MONDAY_API_TOKEN,
+    MONDAY_API_URL,
+    MONDAY_BACKOFF_BASE,
+    MONDAY_COMPLEXITY_BUDGET,
+    MONDAY_COMPLEXITY_RESERVE,
+    MONDAY_KEEP_ALIVE,
+    MONDAY_LABELS_TTL,
+    MONDAY_MAX_RETRIES,
+    MONDAY_MIN_PAGE_SIZE,
+    MONDAY_POOL_BLOCK,
+    MONDAY_POOL_CONNECTIONS,
+    MONDAY_POOL_MAXSIZE,
+    MONDAY_TIMEOUT,
+)
+from app.tools.trace import trace_span
 
-def run_monday_query(query: str, variables: dict | None = None) -> dict:
-    if not MONDAY_API_TOKEN:
-        raise RuntimeError("MONDAY_API_TOKEN is not set")
-
-    resp = requests.post(
-        MONDAY_API_URL,
-        json={"query": query, "variables": variables or {}},
-        headers={
-            "Authorization": MONDAY_API_TOKEN,
-            "Content-Type": "application/json",
-        },
-        timeout=30,
+
+class FetchCancelled(RuntimeError):
+    """Raised when a board fetch is abandoned because a sibling fetch failed."""
+
+
+class MondayQueryError(RuntimeError):
+    """Raised when monday rejects a query with GraphQL errors (not throttling)."""
+
+
+class MondayThrottled(RuntimeError):
+    """Raised for 429/5xx responses and complexity-budget errors."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+_RESET_IN = re.compile(r"reset in (\d+) seconds?", re.IGNORECASE)
+
+
+def _throttle_from_errors(errors) -> MondayThrottled | None:
+    text = str(errors)
+    if "complexity" not in text.lower() and "rate limit" not in text.lower():
+        return None
+    match = _RESET_IN.search(text)
+    return MondayThrottled(
+        f"Monday API throttled: {errors}",
+        retry_after=float(match.group(1)) if match else None,
     )
-    resp.raise_for_status()
-    payload = resp.json()
-    if "errors" in payload:
-        raise RuntimeError(f"Monday API errors: {payload['errors']}")
-    return payload.get("data", {})
 
 
-def fetch_board_items(board_id: str, limit: int = 500) -> list[dict]:
-    if not board_id:
-        raise RuntimeError("Board ID is not configured")
+def _sleep(delay, cancel_event=None):
+    if cancel_event is None:
+        sleep(delay)
+    elif cancel_event.wait(delay):
+        raise FetchCancelled("Fetch cancelled while waiting for monday complexity budget")
+
+
+class ComplexityScheduler:
+    """Paces monday requests against the shared per-minute complexity budget."""
+
+    def __init__(
+        self,
+        budget=MONDAY_COMPLEXITY_BUDGET,
+        reserve=MONDAY_COMPLEXITY_RESERVE,
+        min_page_size=MONDAY_MIN_PAGE_SIZE,
+        max_retries=MONDAY_MAX_RETRIES,
+        backoff_base=MONDAY_BACKOFF_BASE,
+    ):
+        self.budget = budget
+        self.reserve = reserve
+        self.min_page_size = min_page_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.remaining = budget
+        self.reset_at = None
+        self.cost_per_item = None
+        self._lock = threading.Lock()
+
+    def page_size(self, max_page_size: int) -> int:
+        with self._lock:
+            if not self.cost_per_item:
+                return max_page_size
+            spendable = self.remaining - self.reserve * self.budget
+            affordable = int(spendable // self.cost_per_item)
+        return max(self.min_page_size, min(max_page_size, affordable))
+
+    def estimate(self, page_size: int | None) -> float:
+        with self._lock:
+            if not self.cost_per_item or not page_size:
+                return 0
+            return self.cost_per_item * page_size
+
+    def try_acquire(self, cost: float) -> float:
+        """Try to reserve `cost` now; return 0 on success, else seconds until the reset."""
+        with self._lock:
+            now = monotonic()
+            if self.reset_at is not None and now >= self.reset_at:
+                self.remaining = self.budget
+                self.reset_at = None
+            floor = self.reserve * self.budget
+            if self.reset_at is None or self.remaining - cost >= floor:
+                self.remaining -= cost
+                return 0.0
+            return self.reset_at - now
+
+    def acquire(self, cost: float, cancel_event=None) -> float:
+        """Reserve `cost` from the budget, waiting for a reset if needed; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(cost)
+            if not delay:
+                return waited
+            _sleep(delay, cancel_event)
+            waited += delay
+
+    def record(self, complexity: dict | None, page_size: int | None = None):
+        if not complexity:
+            return
+        with self._lock:
+            if complexity.get("after") is not None:
+                self.remaining = complexity["after"]
+            if complexity.get("reset_in_x_seconds") is not None:
+                self.reset_at = monotonic() + complexity["reset_in_x_seconds"]
+            if page_size and complexity.get("query"):
+                observed = complexity["query"] / page_size
+                self.cost_per_item = (
+                    observed if self.cost_per_item is None else (self.cost_per_item + observed) / 2
+                )
+
+    def backoff(self, attempt: int, retry_after=None) -> float:
+        base = retry_after if retry_after else self.backoff_base * (2 ** attempt)
+        return base * (0.5 + random.random())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"remaining": self.remaining, "cost_per_item": self.cost_per_item}
+
+
+# Connections opened by the request running on this thread; urllib3 opens
+# them on the requesting thread, so each request sees only its own.
+_opened = threading.local()
+
+
+def _count_new_connection():
+    _opened.count = getattr(_opened, "count", 0) + 1
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count_new_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count_new_connection()
+        return super()._new_conn()
+
+
+class _CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+class MondayClient:
+    """Shared GraphQL client that keeps pooled TLS connections to monday alive."""
+
+    def __init__(
+        self,
+        api_url=MONDAY_API_URL,
+        token=MONDAY_API_TOKEN,
+        pool_connections=MONDAY_POOL_CONNECTIONS,
+        pool_maxsize=MONDAY_POOL_MAXSIZE,
+        pool_block=MONDAY_POOL_BLOCK,
+        keep_alive=MONDAY_KEEP_ALIVE,
+        timeout=MONDAY_TIMEOUT,
+    ):
+        self.api_url = api_url
+        self.token = token
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._requests = 0
+        self.scheduler = ComplexityScheduler()
+
+        self._adapter = _CountingAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self.session.headers.update(
+            {
+                "Content-Type": "application/json",
+                "Connection": "keep-alive" if keep_alive else "close",
+            }
+        )
+
+    def post(self, query: str, variables: dict | None = None, stats=None) -> dict:
+        """POST one query; `stats["new_connections"]` counts connections it opened."""
+        if not self.token:
+            raise RuntimeError("MONDAY_API_TOKEN is not set")
+
+        _opened.count = 0
+        resp = self.session.post(
+            self.api_url,
+            json={"query": query, "variables": variables or {}},
+            headers={"Authorization": self.token},
+            timeout=self.timeout,
+        )
+        if stats is not None:
+            stats["new_connections"] = stats.get("new_connections", 0) + _opened.count
+        with self._lock:
+            self._requests += 1
+        if resp.status_code == 429 or resp.status_code >= 500:
+            retry_after = resp.headers.get("Retry-After")
+            raise MondayThrottled(
+                f"Monday API returned HTTP {resp.status_code}",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        resp.raise_for_status()
+        return resp.json()
+
+    def execute(self, query: str, variables: dict | None = None, page_size=None, cancel_event=None, stats=None):
+        """Run a query through the scheduler, retrying throttled attempts."""
+        stats = stats if stats is not None else {}
+        attempt = 0
+        while True:
+            stats["waited_s"] = stats.get("waited_s", 0) + self.scheduler.acquire(
+                self.scheduler.estimate(page_size),
+                cancel_event,
+            )
+            try:
+                stats["requests"] = stats.get("requests", 0) + 1
+                payload = self.post(query, variables, stats=stats)
+                errors = payload.get("errors") or (
+                    [payload["error_message"]] if payload.get("error_code") else None
+                )
+                if errors:
+                    throttled = _throttle_from_errors(errors)
+                    if throttled is None:
+                        raise MondayQueryError(f"Monday API errors: {errors}")
+                    raise throttled
+            except MondayThrottled as exc:
+                if attempt >= self.scheduler.max_retries:
+                    raise RuntimeError(f"{exc} (gave up after {attempt} retries)") from exc
+                delay = self.scheduler.backoff(attempt, exc.retry_after)
+                attempt += 1
+                stats["retries"] = stats.get("retries", 0) + 1
+                _sleep(delay, cancel_event)
+                stats["waited_s"] += delay
+                continue
+
+            data = payload.get("data", {})
+            self.scheduler.record(data.get("complexity"), page_size)
+            return data
+
+    def stats(self) -> dict:
+        """Return cumulative request and connection counts for this client."""
+        pools = self._adapter.poolmanager.pools
+        with pools.lock:
+            connections = sum(pools[key].num_connections for key in pools.keys())
+        with self._lock:
+            total = self._requests
+        return {
+            "requests": total,
+            "new_connections": connections,
+            "reused_connections": max(total - connections, 0),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
 
+
+def get_client() -> MondayClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MondayClient()
+    return _client
+
+
+def any_of_rule(column_id: str, values) -> dict:
+    return {"column_id": column_id, "compare_value": list(values), "operator": "any_of"}
+
+
+LABELS_QUERY = """
+query ($board_id: [ID!], $column_ids: [String!]) {
+  boards(ids: $board_id) { columns(ids: $column_ids) { id settings_str } }
+}
+"""
+
+# (board_id, column_id) -> (fetched_at, {label index: label text})
+_labels = {}
+_labels_lock = threading.Lock()
+
+
+def parse_status_labels(data: dict) -> dict[int, str]:
+    """Label index -> text from a `LABELS_QUERY` response."""
+    boards = data.get("boards") or []
+    columns = (boards[0].get("columns") or []) if boards else []
+    if not columns:
+        return {}
+    settings = json.loads(columns[0].get("settings_str") or "{}")
+    return {int(index): str(label) for index, label in (settings.get("labels") or {}).items()}
+
+
+def label_indexes(labels: dict[int, str], value) -> list[int]:
+    """Indexes of the labels equal to `value`, ignoring case."""
+    target = str(value).lower()
+    return sorted(index for index, label in labels.items() if label.lower() == target)
+
+
+def cached_status_labels(board_id, column_id):
+    with _labels_lock:
+        entry = _labels.get((str(board_id), column_id))
+    if entry is None or monotonic() - entry[0] > MONDAY_LABELS_TTL:
+        return None
+    return entry[1]
+
+
+def store_status_labels(board_id, column_id, labels):
+    with _labels_lock:
+        _labels[(str(board_id), column_id)] = (monotonic(), labels)
+    return labels
+
+
+def status_labels(board_id, column_id, cancel_event=None) -> dict[int, str]:
+    """Label index -> text of a status column, reused for `MONDAY_LABELS_TTL` seconds."""
+    labels = cached_status_labels(board_id, column_id)
+    if labels is None:
+        data = get_client().execute(
+            LABELS_QUERY,
+            {"board_id": [str(board_id)], "column_ids": [column_id]},
+            cancel_event=cancel_event,
+        )
+        labels = store_status_labels(board_id, column_id, parse_status_labels(data))
+    return labels
+
+
+def between_rule(column_id: str, start, end) -> dict:
+    return {"column_id": column_id, "compare_value": [str(start), str(end)], "operator": "between"}
+
+
+def updated_since_rule(day: str) -> dict:
+    """Match items updated on or after `day` (YYYY-MM-DD)."""
+    return {
+        "column_id": "__last_updated__",
+        "compare_value": ["EXACT", day],
+        "operator": "greater_than_or_equals",
+        "compare_attribute": "UPDATED_AT",
+    }
+
+
+def build_query_params(rules: list[dict], operator: str = "and") -> dict | None:
+    """Wrap item rules into an `items_page(query_params: ...)` argument."""
+    if not rules:
+        return None
+    return {"rules": rules, "operator": operator}
+
+
+def run_monday_query(query: str, variables: dict | None = None) -> dict:
+    return get_client().execute(query, variables)
+
+
+def fetch_board_items(
+    board_id: str,
+    max_page_size: int = 500,
+    tracer=None,
+    cancel_event=None,
+    column_ids: list[str] | None = None,
+    query_params: dict | None = None,
+) -> list[dict]:
+    """Download every item of a board as one list. See `iter_board_pages`."""
     items: list[dict] = []
-    cursor = None
+    for page in iter_board_pages(
+        board_id,
+        max_page_size=max_page_size,
+        tracer=tracer,
+        cancel_event=cancel_event,
+        column_ids=column_ids,
+        query_params=query_params,
+    ):
+        items.extend(page)
+    return items
 
-    first_page_query = """
-    query ($board_id: ID!, $limit: Int!) {
-      boards(ids: [$board_id]) {
-        items_page(limit: $limit) {
+
+def page_queries(column_ids: list[str] | None = None, query_params: dict | None = None) -> tuple[str, str]:
+    """GraphQL for the first `items_page` and the following `next_items_page` calls."""
+    projected = column_ids is not None
+    column_values = "column_values(ids: $column_ids)" if projected else "column_values"
+    column_var = ", $column_ids: [String!]" if projected else ""
+    filtered = query_params is not None
+    query_params_var = ", $query_params: ItemsQuery" if filtered else ""
+    query_params_arg = ", query_params: $query_params" if filtered else ""
+
+    first_page_query = f"""
+    query ($board_id: ID!, $limit: Int!{column_var}{query_params_var}) {{
+      complexity {{
+        query
+        after
+        reset_in_x_seconds
+      }}
+      boards(ids: [$board_id]) {{
+        items_page(limit: $limit{query_params_arg}) {{
           cursor
-          items {
+          items {{
             id
             name
-            column_values {
+            updated_at
+            {column_values} {{
               id
               text
-            }
-          }
-        }
-      }
-    }
+            }}
+          }}
+        }}
+      }}
+    }}
     """
 
-    next_page_query = """
-    query ($cursor: String!, $limit: Int!) {
-      next_items_page(cursor: $cursor, limit: $limit) {
+    next_page_query = f"""
+    query ($cursor: String!, $limit: Int!{column_var}) {{
+      complexity {{
+        query
+        after
+        reset_in_x_seconds
+      }}
+      next_items_page(cursor: $cursor, limit: $limit) {{
         cursor
-        items {
+        items {{
           id
           name
-          column_values {
+          updated_at
+          {column_values} {{
             id
             text
-          }
-        }
-      }
-    }
+          }}
+        }}
+      }}
+    }}
     """
+    return first_page_query, next_page_query
 
-    data = run_monday_query(
-        first_page_query,
-        {"board_id": str(board_id), "limit": limit},
-    )
-    boards = data.get("boards", [])
-    if not boards:
-        return items
-
-    page = boards[0].get("items_page", {})
-    items.extend(page.get("items", []))
-    cursor = page.get("cursor")
-
-    while cursor:
-        next_data = run_monday_query(
-            next_page_query,
-            {"cursor": cursor, "limit": limit},
+
+def iter_board_pages(
+    board_id: str,
+    max_page_size: int = 500,
+    tracer=None,
+    cancel_event=None,
+    column_ids: list[str] | None = None,
+    query_params: dict | None = None,
+    prefetch: bool = True,
+):
+    """Yield a board's items page by page, following cursor pagination."""
+    if not board_id:
+        raise RuntimeError("Board ID is not configured")
+
+    client = get_client()
+
+    first_page_query, next_page_query = page_queries(column_ids, query_params)
+    projected = column_ids is not None
+    filtered = query_params is not None
+    extra = {"column_ids": list(column_ids)} if projected else {}
+    stats = {}
+    # Prefetched pages run on another thread, so their spans name the parent
+    # explicitly: whatever span was open when iteration started.
+    parent = tracer.current() if tracer is not None else None
+
+    def _page(query, variables, key):
+        limit = client.scheduler.page_size(max_page_size)
+        with trace_span(tracer, "monday_page", f"board={board_id}, limit={limit}", parent=parent) as span:
+            data = client.execute(
+                query,
+                {**variables, "limit": limit, **extra},
+                page_size=limit,
+                cancel_event=cancel_event,
+                stats=stats,
+            )
+            page_sizes.append(limit)
+            if key == "boards":
+                boards = data.get("boards", [])
+                page = boards[0].get("items_page", {}) if boards else {}
+            else:
+                page = data.get(key, {})
+            span.rows = len(page.get("items", []))
+        return page
+
+    page_sizes = []
+    rows = 0
+    try:
+        page = _page(
+            first_page_query,
+            {
+                "board_id": str(board_id),
+                **({"query_params": query_params} if filtered else {}),
+            },
+            "boards",
         )
-        next_page = next_data.get("next_items_page", {})
-        items.extend(next_page.get("items", []))
-        cursor = next_page.get("cursor")
+        cursor = page.get("cursor")
 
-    return items
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="monday-prefetch") as pool:
+
+            def _next(cursor):
+                if not cursor:
+                    return None
+                if prefetch:
+                    return pool.submit(_page, next_page_query, {"cursor": cursor}, "next_items_page")
+                return None
+
+            pending = _next(cursor)
+            while True:
+                rows += len(page.get("items", []))
+                yield page.get("items", [])
+                if not cursor:
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    raise FetchCancelled(f"Fetch of board {board_id} cancelled after {rows} items")
+                if pending is not None:
+                    page = pending.result()
+                else:
+                    page = _page(next_page_query, {"cursor": cursor}, "next_items_page")
+                cursor = page.get("cursor")
+                pending = _next(cursor)
+    finally:
+        # Also traced when the fetch fails or the caller stops early.
+        if tracer is not None:
+            trace_fetch_stats(tracer, client, board_id, stats, page_sizes, rows)
+
+
+def trace_fetch_stats(tracer, client, board_id, stats, page_sizes, rows, transport=None):
+    """Add one board fetch's `monday_http_pool` and `monday_complexity` steps."""
+    requests_made = stats.get("requests", 0)
+    new_connections = stats.get("new_connections", 0)
+    tracer.add(
+        "monday_http_pool",
+        (
+            f"board={board_id}, requests={requests_made}, "
+            f"pool_new_connections={new_connections}, "
+            f"pool_reused_connections={max(requests_made - new_connections, 0)}"
+            + (f", transport={transport}" if transport else "")
+        ),
+        rows=rows,
+    )
+    budget = client.scheduler.snapshot()
+    tracer.add(
+        "monday_complexity",
+        (
+            f"board={board_id}, pages={len(page_sizes)}, page_sizes={page_sizes}, "
+            f"retries={stats.get('retries', 0)}, budget_remaining={budget['remaining']}"
+        ),
+        rows=rows,
+        ms=int(stats.get("waited_s", 0) * 1000),
+    )
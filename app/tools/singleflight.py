@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from time import perf_counter_ns
+
+from app.tools.monday_client import FetchCancelled
+
+
+class _Call:
+    def __init__(self, loop=None):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Set when the leader runs on an event loop; waiters on that loop
+        # park on futures instead of a thread.
+        self.loop = loop
+        self._waiters = []
+
+    def finish(self):
+        self.done.set()
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def wait_async(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            await asyncio.to_thread(self.done.wait)
+        elif not self.done.is_set():
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            await waiter
+
+
+class SingleFlight:
+    """Collapse concurrent sync or async calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _join(self, key, loop=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call(loop)
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        return call, leader
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._calls[key]
+        call.finish()
+
+    def do(self, key, fn):
+        """Return `(result, coalesced)` for `fn()` shared across callers of `key`."""
+        call, leader = self._join(key)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+    async def ado(self, key, fn):
+        """Return `(result, coalesced)` for `await fn()` shared across callers of `key`."""
+        call, leader = self._join(key, asyncio.get_running_loop())
+
+        if not leader:
+            await call.wait_async()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = await fn()
+        except asyncio.CancelledError:
+            # The leader's own task was cancelled; waiters see a cancelled
+            # fetch and retry instead of inheriting the cancellation.
+            call.error = FetchCancelled("Shared board load was cancelled")
+            raise
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+
+board_loads = SingleFlight()
+
+
+def load_once(key, fn, tracer=None, cancel_event=None):
+    """Run a board load through `board_loads`; each caller gets its own shallow copy."""
+    started = perf_counter_ns()
+    while True:
+        try:
+            df, coalesced = board_loads.do(key, fn)
+        except FetchCancelled:
+            if cancel_event is not None and cancel_event.is_set():
+                raise
+            continue
+        if coalesced and tracer is not None:
+            tracer.add("singleflight", f"coalesced=True, key={key}", rows=len(df), start_ns=started)
+        return df.copy(deep=False)
+
+
+async def aload_once(key, fn, tracer=None, cancel_event=None):
+    """Async `load_once` for a coroutine function `fn`."""
+    started = perf_counter_ns()
+    while True:
+        try:
+            df, coalesced = await board_loads.ado(key, fn)
+        except FetchCancelled:
+            if cancel_event is not None and cancel_event.is_set():
+                raise
+            continue
+        if coalesced and tracer is not None:
+            tracer.add("singleflight", f"coalesced=True, key={key}", rows=len(df), start_ns=started)
+        return df.copy(deep=False)
@@ -0,0 +1,222 @@
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from time import perf_counter_ns, time
+
+from app.config import MONDAY_SNAPSHOT_PATH, MONDAY_SNAPSHOT_SWEEP_INTERVAL
+from app.tools.monday_client import (
+    build_query_params,
+    fetch_board_items,
+    updated_since_rule,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    board_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    name TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (board_id, item_id)
+);
+CREATE TABLE IF NOT EXISTS cells (
+    board_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    column_id TEXT NOT NULL,
+    text TEXT,
+    PRIMARY KEY (board_id, column_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS cells_by_item ON cells (board_id, item_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    board_id TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL NOT NULL,
+    swept_at REAL
+);
+"""
+
+
+class BoardSnapshotStore:
+    """Local SQLite copy of monday boards, one row per cell, kept current by incremental syncs."""
+
+    def __init__(self, path=MONDAY_SNAPSHOT_PATH, sweep_interval=MONDAY_SNAPSHOT_SWEEP_INTERVAL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sweep_interval = sweep_interval
+        self._board_locks = {}
+        self._locks_guard = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(sync_state)")}
+            if "swept_at" not in columns:
+                conn.execute("ALTER TABLE sync_state ADD COLUMN swept_at REAL")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _board_lock(self, board_id):
+        with self._locks_guard:
+            return self._board_locks.setdefault(str(board_id), threading.Lock())
+
+    def age(self, board_id):
+        """Seconds since the board was last synced, or None if never synced."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT synced_at FROM sync_state WHERE board_id = ?",
+                (str(board_id),),
+            ).fetchone()
+        return None if row is None else time() - row[0]
+
+    def version(self, board_id):
+        """Sync watermark token of the board's snapshot, or None if never synced."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT watermark, synced_at FROM sync_state WHERE board_id = ?",
+                (str(board_id),),
+            ).fetchone()
+        return None if row is None else f"{board_id}:{row[0]}:{row[1]}"
+
+    def ensure_fresh(self, board_id, max_staleness, tracer=None, cancel_event=None):
+        """Sync the board unless its snapshot is younger than `max_staleness` seconds."""
+        started = perf_counter_ns()
+        with self._board_lock(board_id):
+            age = self.age(board_id)
+            if age is not None and age <= max_staleness:
+                if tracer is not None:
+                    tracer.add("snapshot_fresh", f"board={board_id}, age_s={age:.1f}", rows=0, start_ns=started)
+                return
+            self._sync(board_id, tracer=tracer, cancel_event=cancel_event)
+
+    def sync(self, board_id, tracer=None, cancel_event=None):
+        with self._board_lock(board_id):
+            self._sync(board_id, tracer=tracer, cancel_event=cancel_event)
+
+    def _sync(self, board_id, tracer=None, cancel_event=None):
+        board_id = str(board_id)
+        started = perf_counter_ns()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT watermark, swept_at FROM sync_state WHERE board_id = ?",
+                (board_id,),
+            ).fetchone()
+        watermark, swept_at = row if row else (None, None)
+        now = time()
+
+        live_ids = None
+        if watermark:
+            changed = fetch_board_items(
+                board_id,
+                tracer=tracer,
+                cancel_event=cancel_event,
+                query_params=build_query_params([updated_since_rule(watermark[:10])]),
+            )
+            if swept_at is None or now - swept_at >= self.sweep_interval:
+                live_ids = {
+                    item["id"]
+                    for item in fetch_board_items(
+                        board_id,
+                        tracer=tracer,
+                        cancel_event=cancel_event,
+                        column_ids=[],
+                    )
+                }
+        else:
+            changed = fetch_board_items(board_id, tracer=tracer, cancel_event=cancel_event)
+            live_ids = {item["id"] for item in changed}
+        if live_ids is not None:
+            swept_at = now
+
+        seen = [item.get("updated_at") for item in changed if item.get("updated_at")]
+        new_watermark = max(seen + ([watermark] if watermark else []), default=None)
+
+        with closing(self._connect()) as conn, conn:
+            deleted = []
+            if live_ids is not None:
+                known = {
+                    r[0]
+                    for r in conn.execute("SELECT item_id FROM items WHERE board_id = ?", (board_id,))
+                }
+                deleted = [(board_id, item_id) for item_id in known - live_ids]
+            conn.executemany("DELETE FROM items WHERE board_id = ? AND item_id = ?", deleted)
+            conn.executemany("DELETE FROM cells WHERE board_id = ? AND item_id = ?", deleted)
+
+            conn.executemany(
+                (
+                    "INSERT INTO items (board_id, item_id, name, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (board_id, item_id) DO UPDATE "
+                    "SET name = excluded.name, updated_at = excluded.updated_at"
+                ),
+                [(board_id, item["id"], item.get("name"), item.get("updated_at")) for item in changed],
+            )
+            conn.executemany(
+                "DELETE FROM cells WHERE board_id = ? AND item_id = ?",
+                [(board_id, item["id"]) for item in changed],
+            )
+            conn.executemany(
+                "INSERT INTO cells (board_id, item_id, column_id, text) VALUES (?, ?, ?, ?)",
+                [
+                    (board_id, item["id"], col.get("id"), col.get("text"))
+                    for item in changed
+                    for col in item.get("column_values", [])
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (board_id, watermark, synced_at, swept_at) VALUES (?, ?, ?, ?)",
+                (board_id, new_watermark, now, swept_at),
+            )
+
+        if tracer is not None:
+            tracer.add(
+                "snapshot_sync",
+                (
+                    f"board={board_id}, mode={'incremental' if watermark else 'full'}, "
+                    f"sweep={'yes' if live_ids is not None else 'no'}, "
+                    f"upserts={len(changed)}, deletes={len(deleted)}, watermark={new_watermark}"
+                ),
+                rows=len(changed) if live_ids is None else len(live_ids),
+                start_ns=started,
+            )
+
+    def items(self, board_id, column_ids=None, match=None) -> list[dict]:
+        """Snapshot items shaped like `fetch_board_items`, optionally matched on one column."""
+        board_id = str(board_id)
+        item_query = "SELECT item_id, name, updated_at FROM items WHERE board_id = ?"
+        item_params = [board_id]
+        if match is not None:
+            item_query += (
+                " AND item_id IN (SELECT item_id FROM cells"
+                " WHERE board_id = ? AND column_id = ? AND lower(text) = lower(?))"
+            )
+            item_params.extend([board_id, *match])
+        query = "SELECT item_id, column_id, text FROM cells WHERE board_id = ?"
+        params = [board_id]
+        if column_ids is not None:
+            if not column_ids:
+                query += " AND 0"
+            else:
+                query += f" AND column_id IN ({', '.join('?' for _ in column_ids)})"
+                params.extend(column_ids)
+
+        with closing(self._connect()) as conn:
+            items = {
+                item_id: {"id": item_id, "name": name, "updated_at": updated_at, "column_values": []}
+                for item_id, name, updated_at in conn.execute(item_query + " ORDER BY rowid", item_params)
+            }
+            for item_id, column_id, text in conn.execute(query, params):
+                item = items.get(item_id)
+                if item is not None:
+                    item["column_values"].append({"id": column_id, "text": text})
+        return list(items.values())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> BoardSnapshotStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BoardSnapshotStore()
+    return _store
@@ -1,28 +1,198 @@
-from dataclasses import dataclass, asdict
-from time import time
+import itertools
+import threading
+import tracemalloc
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict, replace
+from time import perf_counter_ns, thread_time_ns
 from typing import Optional
 
+from app.config import TRACE_MEMORY
+
+_span_ids = itertools.count(1)
+# The innermost open span of the running thread / task.
+_current_span = ContextVar("current_span", default=None)
+
+
 @dataclass
 class TraceEvent:
     step: str
     detail: str
     rows: Optional[int] = None
-    ms: Optional[int] = None
+    ms: Optional[float] = None
+    span_id: int = 0
+    parent_id: Optional[int] = None
+    start_ns: Optional[int] = None
+    duration_ns: Optional[int] = None
+    cpu_ns: Optional[int] = None
+    alloc_peak_bytes: Optional[int] = None
+
+
+class Span:
+    """A timed step, recorded into its tracer when the `with` block exits."""
+
+    def __init__(self, tracer, step, detail="", rows=None, parent=None):
+        self.tracer = tracer
+        self.step = step
+        self.detail = detail
+        self.rows = rows
+        self.parent = parent
+        self.id = next(_span_ids)
+        self._peak = 0
+
+    def __enter__(self):
+        if self.tracer is None:
+            return self
+        if self.parent is None:
+            self.parent = self.tracer.current()
+        self._token = _current_span.set(self)
+        if self.tracer.memory:
+            self._memory_start()
+        self._start_ns = perf_counter_ns()
+        self._cpu_ns = thread_time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.tracer is None:
+            return False
+        duration_ns = perf_counter_ns() - self._start_ns
+        cpu_ns = thread_time_ns() - self._cpu_ns
+        alloc = self._memory_end() if self.tracer.memory else None
+        _current_span.reset(self._token)
+        detail = self.detail
+        if exc_type is not None:
+            detail = f"{detail}, error={exc_type.__name__}" if detail else f"error={exc_type.__name__}"
+        self.tracer._record(
+            TraceEvent(
+                self.step,
+                detail,
+                self.rows,
+                round(duration_ns / 1e6, 3),
+                span_id=self.id,
+                parent_id=self.parent.id if self.parent is not None else None,
+                start_ns=self._start_ns,
+                duration_ns=duration_ns,
+                cpu_ns=cpu_ns,
+                alloc_peak_bytes=alloc,
+            )
+        )
+        return False
+
+    # tracemalloc keeps one process-wide peak, so each span resets it on entry
+    # and hands the peak it saw up to its parent on entry and exit.
+
+    def _memory_start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        if self.parent is not None:
+            self.parent._peak = max(self.parent._peak, peak)
+        tracemalloc.reset_peak()
+        self._alloc_start = self._peak = current
+
+    def _memory_end(self):
+        peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+        if self.parent is not None:
+            self.parent._peak = max(self.parent._peak, peak)
+        return peak - self._alloc_start
+
 
 class Tracer:
-    def __init__(self):
+    """Span tree of one request; events are kept in completion order."""
+
+    def __init__(self, memory=TRACE_MEMORY):
         self.events = []
+        self.memory = memory
+        self._lock = threading.Lock()
+
+    def span(self, step, detail="", rows=None, parent=None) -> Span:
+        return Span(self, step, detail, rows, parent=parent)
+
+    def current(self) -> Optional[Span]:
+        span = _current_span.get()
+        return span if span is not None and span.tracer is self else None
 
-    def add(self, step, detail, rows=None, ms=None):
-        self.events.append(TraceEvent(step, detail, rows, ms))
+    def _record(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def add(self, step, detail, rows=None, ms=None, start_ns=None):
+        """Record a point event. With `start_ns` (a `perf_counter_ns()` stamp) its time is measured from there."""
+        now = perf_counter_ns()
+        duration_ns = now - start_ns if start_ns is not None else None
+        if duration_ns is not None and ms is None:
+            ms = round(duration_ns / 1e6, 3)
+        parent = self.current()
+        self._record(
+            TraceEvent(
+                step,
+                detail,
+                rows,
+                ms,
+                span_id=next(_span_ids),
+                parent_id=parent.id if parent is not None else None,
+                start_ns=start_ns if start_ns is not None else now,
+                duration_ns=duration_ns,
+            )
+        )
+
+    def extend(self, other):
+        parent = self.current()
+        with other._lock:
+            events = list(other.events)
+        if parent is not None:
+            events = [e if e.parent_id is not None else replace(e, parent_id=parent.id) for e in events]
+        with self._lock:
+            self.events.extend(events)
 
     def dump(self):
-        return [asdict(e) for e in self.events]
+        """Flat list of event dicts in completion order."""
+        with self._lock:
+            events = list(self.events)
+        parents = {e.span_id: e.parent_id for e in events}
+
+        def _depth(event):
+            depth, parent = 0, event.parent_id
+            while parent in parents:
+                depth += 1
+                parent = parents[parent]
+            return depth
+
+        out = []
+        for e in events:
+            row = {
+                "step": e.step,
+                "detail": e.detail,
+                "rows": e.rows,
+                "ms": e.ms,
+                "span_id": e.span_id,
+                "parent_id": e.parent_id,
+                "depth": _depth(e),
+                "cpu_ms": round(e.cpu_ns / 1e6, 3) if e.cpu_ns is not None else None,
+            }
+            if e.alloc_peak_bytes is not None:
+                row["alloc_peak_kb"] = round(e.alloc_peak_bytes / 1024, 1)
+            out.append(row)
+        return out
+
+    def tree(self):
+        """The events as nested dicts ordered by start time, children under `children`."""
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e.start_ns or 0)
+        nodes = {e.span_id: {**asdict(e), "children": []} for e in events}
+        roots = []
+        for e in events:
+            parent = nodes.get(e.parent_id)
+            (parent["children"] if parent is not None else roots).append(nodes[e.span_id])
+        return roots
+
+
+def trace_span(tracer, step, detail="", rows=None, parent=None) -> Span:
+    """`tracer.span(...)` that also accepts `tracer=None` (records nothing)."""
+    return Span(tracer, step, detail, rows, parent=parent)
+
 
 def timed_call(tracer, step, detail, fn):
-    t0 = time()
-    out = fn()
-    ms = int((time() - t0) * 1000)
-    rows = len(out) if hasattr(out, "__len__") else None
-    tracer.add(step, detail, rows=rows, ms=ms)
+    with trace_span(tracer, step, detail) as span:
+        out = fn()
+        span.rows = len(out) if hasattr(out, "__len__") else None
     return out
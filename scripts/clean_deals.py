@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
 import re
+import sys
 import pandas as pd
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.schemas import DEALS_SCHEMA, columnar_available, columnar_path, write_parquet  # noqa: E402
+
 INPUT = Path("data/raw/Deal funnel Data.csv")
 CLEAN_OUT = Path("data/cleaned/Deal_funnel_Data.cleaned.csv")
 ANOM_OUT = Path("data/reports/Deal_funnel_Data.anomaly_report.csv")
@@ -99,9 +106,13 @@ def main():
     # Drop embedded headers + exact duplicates; keep remaining rows (even incomplete) with cleaned types
     cleaned = df[~header_like & ~exact_dup].copy()
     cleaned.to_csv(CLEAN_OUT, index=False)
+    if columnar_available():
+        write_parquet(cleaned, columnar_path(CLEAN_OUT), DEALS_SCHEMA)
 
     print("Wrote:")
     print(f"- {CLEAN_OUT}")
+    if columnar_available():
+        print(f"- {columnar_path(CLEAN_OUT)}")
     print(f"- {ANOM_OUT}")
     print(f"Rows input={len(df)}, cleaned={len(cleaned)}, anomalies={len(anomalies)}")
 
@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
+import sys
 import pandas as pd
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.schemas import WO_SCHEMA, columnar_available, columnar_path, write_parquet  # noqa: E402
+
 INPUT = Path("data/raw/Work_Order_Tracker Data.csv")
 CLEAN_OUT = Path("data/cleaned/Work_Order_Tracker_Data.cleaned.csv")
 ANOM_OUT = Path("data/reports/Work_Order_Tracker_Data.anomaly_report.csv")
@@ -132,9 +139,13 @@ def main():
 
     cleaned = df[~exact_dup].copy()
     cleaned.to_csv(CLEAN_OUT, index=False)
+    if columnar_available():
+        write_parquet(cleaned, columnar_path(CLEAN_OUT), WO_SCHEMA)
 
     print("Wrote:")
     print(f"- {CLEAN_OUT}")
+    if columnar_available():
+        print(f"- {columnar_path(CLEAN_OUT)}")
     print(f"- {ANOM_OUT}")
     print(f"Rows input={len(df)}, cleaned={len(cleaned)}, anomalies={len(anomalies)}")
 
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Invalidate cached LLM intent parses (all, one model's, or old ones)."""
+import argparse
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.agent.parse_cache import get_parse_cache  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", help="only drop parses made with this GEMINI_MODEL")
+    parser.add_argument("--older-than", type=float, metavar="SECONDS", help="only drop parses older than this")
+    args = parser.parse_args()
+
+    cache = get_parse_cache()
+    removed = cache.invalidate(model=args.model, older_than=args.older_than)
+    print(f"Removed {removed} cached parses from {cache.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,19 @@
 import os
-import requests
+import sys
 
 from pathlib import Path
 from dotenv import load_dotenv
 
 ROOT = Path(__file__).resolve().parents[1]
 load_dotenv(ROOT / ".env")
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 
 
 load_dotenv()
 
-API_URL = os.getenv("MONDAY_API_URL", "https://api.monday.com/v2")
+from app.tools.monday_client import get_client  # noqa: E402
+
 TOKEN = os.getenv("MONDAY_API_TOKEN")
 DEALS_BOARD_ID = os.getenv("MONDAY_DEALS_BOARD_ID")
 WO_BOARD_ID = os.getenv("MONDAY_WORK_ORDERS_BOARD_ID")
@@ -46,14 +49,8 @@ query ($board_ids: [ID!]) {
 
 variables = {"board_ids": [str(DEALS_BOARD_ID), str(WO_BOARD_ID)]}
 
-resp = requests.post(
-    API_URL,
-    json={"query": query, "variables": variables},
-    headers={"Authorization": TOKEN, "Content-Type": "application/json"},
-    timeout=30,
-)
-resp.raise_for_status()
-payload = resp.json()
+client = get_client()
+payload = client.post(query, variables)
 
 if "errors" in payload:
     print("GraphQL errors:", payload["errors"])
@@ -70,3 +67,10 @@ for b in payload["data"]["boards"]:
         print(f"  Item: {it['name']} (id={it['id']})")
         for cv in it["column_values"][:8]:
             print(f"    {cv['id']:<24} -> {cv.get('text')}")
+
+stats = client.stats()
+print(
+    f"\nHTTP pool: requests={stats['requests']}, "
+    f"new_connections={stats['new_connections']}, "
+    f"reused_connections={stats['reused_connections']}"
+)
@@ -3,6 +3,12 @@ from pathlib import Path
 import sys
 import pandas as pd
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.joiner import JoinIndex  # noqa: E402
+
 DEALS_CLEAN = Path("data/cleaned/Deal_funnel_Data.cleaned.csv")
 WO_CLEAN = Path("data/cleaned/Work_Order_Tracker_Data.cleaned.csv")
 DEALS_ANOM = Path("data/reports/Deal_funnel_Data.anomaly_report.csv")
@@ -135,10 +141,11 @@ def main():
 
     # Joinability check
     if "Deal Name" in deals.columns and "Deal name masked" in wo.columns:
-        dset = set(deals["Deal Name"].dropna().astype(str).str.strip())
-        wset = set(wo["Deal name masked"].dropna().astype(str).str.strip())
-        overlap = len(dset & wset)
+        index = JoinIndex()
+        overlap = index.overlap_count(deals, wo)
         info(f"Cross-board overlap (Deal Name ↔ Deal name masked): {overlap}")
+        pairs = index.pairs(deals, wo)
+        info(f"Cross-board linked rows: {pairs['deal_row'].nunique()} deals ↔ {pairs['work_order_row'].nunique()} work orders")
         if overlap == 0:
             warn("No overlap found for primary join key.")
 
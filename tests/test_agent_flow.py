@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from app.agent import orchestrator
+from app.agent.orchestrator import _rules_parse, _score_rules
+from app.tools.trace import Tracer
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "how is our pipeline for the last two quarters?",
+        "pipeline over the past two years",
+        "receivables for h1 2025",
+    ],
+)
+def test_unresolved_time_words_skip_fast_path(question):
+    _, confidence, reasons = _score_rules(question)
+    _, fast = _rules_parse(question, Tracer())
+
+    assert confidence < orchestrator.RULES_CONFIDENCE_THRESHOLD
+    assert any(r.startswith("unresolved_time_words=") for r in reasons)
+    assert not fast
+
+
+@pytest.mark.parametrize(
+    "question, timeframe",
+    [
+        ("receivables for mining last quarter", "last quarter"),
+        ("pipeline for q3 2025", "Q3 2025"),
+        ("receivables over the past 3 months", "last 3 months"),
+        ("conversion ytd", "year to date"),
+    ],
+)
+def test_resolved_timeframe_takes_fast_path(question, timeframe):
+    parsed, _, reasons = _score_rules(question)
+    _, fast = _rules_parse(question, Tracer())
+
+    assert parsed["timeframe"] == timeframe
+    assert not any(r.startswith("unresolved_time_words=") for r in reasons)
+    assert fast
+
+
+def test_missing_timeframe_earns_no_credit():
+    _, with_time, _ = _score_rules("pipeline this year")
+    _, without_time, reasons = _score_rules("pipeline")
+
+    assert "no_timeframe" in reasons
+    assert with_time - without_time == pytest.approx(0.3)
+
+
+def test_clarification_never_takes_fast_path(monkeypatch):
+    monkeypatch.setattr(orchestrator, "RULES_CONFIDENCE_THRESHOLD", 0.0)
+    rules, fast = _rules_parse("how is our pipeline doing?", Tracer())
+
+    assert rules["needs_clarification"]
+    assert not fast
+
+
+def _stub_llm(monkeypatch, delay):
+    def parse(question):
+        sector = next((s for s in orchestrator.SECTORS if s in question), None)
+        intent = "receivables" if "receivables" in question else "pipeline"
+        return {
+            "intent": intent,
+            "sector": sector,
+            "timeframe": "all-time",
+            "needs_clarification": False,
+            "clarification_question": None,
+        }
+
+    def sync_parse(question, tracer=None):
+        time.sleep(delay)
+        return parse(question)
+
+    async def async_parse(question, tracer=None):
+        await asyncio.sleep(delay)
+        return parse(question)
+
+    monkeypatch.setattr(orchestrator, "parse_query_with_llm", sync_parse)
+    monkeypatch.setattr(orchestrator, "parse_query_with_llm_async", async_parse)
+
+
+def test_batch_answers_match_single_answers_under_slow_llm(monkeypatch):
+    # Eight parallel 0.2s LLM parses queue two deep on the 4-worker LLM pool
+    # and would miss a 0.3s budget; batch parses must not fall back.
+    _stub_llm(monkeypatch, 0.2)
+    monkeypatch.setattr(orchestrator, "LLM_LATENCY_BUDGET", 0.3)
+    monkeypatch.setattr(orchestrator.answer_cache, "max_entries", 0)
+    questions = [
+        f"{topic} for {sector} over the past two years"
+        for topic in ("pipeline", "receivables")
+        for sector in ("mining", "railways", "renewables", "powerline", "construction", "others")
+    ]
+
+    results, summary = orchestrator.answer_questions(questions)
+    singles = [orchestrator.answer_question(question)[0] for question in questions]
+
+    assert [answer["intent_parser_source"] for answer, _ in results] == ["llm"] * len(questions)
+    assert [answer for answer, _ in results] == singles
+
+
+def _prefetch_trace(monkeypatch, question, clarify=False):
+    _stub_llm(monkeypatch, 0.2)
+    if clarify:
+        original = orchestrator.parse_query_with_llm_async
+
+        async def clarifying(question, tracer=None):
+            return {**await original(question, tracer), "needs_clarification": True}
+
+        monkeypatch.setattr(orchestrator, "parse_query_with_llm_async", clarifying)
+    monkeypatch.setattr(orchestrator, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(orchestrator, "SPECULATIVE_PREFETCH", True)
+    monkeypatch.setattr(orchestrator.answer_cache, "max_entries", 0)
+    answer, trace = orchestrator.answer_question(question)
+    return answer, {e["step"]: e for e in trace}
+
+
+def test_prefetched_boards_are_narrowed_for_the_parsed_question(monkeypatch):
+    question = "pipeline for mining over the past two years"
+    answer, steps = _prefetch_trace(monkeypatch, question)
+
+    assert steps["speculative_prefetch"]["detail"].startswith("used: sector=mining")
+    assert "prefetch_narrow" in steps
+    monkeypatch.setattr(orchestrator, "SPECULATIVE_PREFETCH", False)
+    direct, _ = orchestrator.answer_question(question)
+    assert answer == direct
+
+
+def test_prefetch_is_discarded_when_clarification_is_needed(monkeypatch):
+    _, steps = _prefetch_trace(monkeypatch, "pipeline for mining over the past two years", clarify=True)
+
+    assert steps["speculative_prefetch"]["detail"] == "discarded: clarification needed"
+
+
+def test_narrow_matches_a_direct_filtered_load():
+    columns = orchestrator.INTENT_COLUMNS["pipeline"]["get_deals"]
+    full = orchestrator.get_deals(Tracer())
+    narrowed = orchestrator._narrow(full, "mining", "Sector/service", columns, None, "Created Date")
+    direct = orchestrator.get_deals(Tracer(), sector="mining", columns=columns)
+
+    shared = [c for c in direct.columns if c in narrowed.columns]
+    assert set(columns) <= set(shared)
+    pd.testing.assert_frame_equal(narrowed[shared], direct[shared])
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from app.services import analytics
+from app.services.metrics import METRIC_INPUTS, MetricsEngine
+from app.tools.trace import Tracer
+
+
+@pytest.fixture
+def deals():
+    return pd.DataFrame(
+        {
+            "Deal Name": ["A", "B", "C", "D", None],
+            "Deal Status": ["Open", "Won", "Won", "Dead", "Open"],
+            "Deal Stage": ["B. Sales", "H. Won", "H. Won", "L. Lost", "B. Sales"],
+            "Sector/service": ["Mining", "Mining", "Railways", "Railways", None],
+        }
+    )
+
+
+@pytest.fixture
+def work_orders():
+    return pd.DataFrame(
+        {
+            "Deal name masked": ["A ", "C", "X"],
+            "Sector": ["Mining", "Railways", "Mining"],
+            "Amount Receivable (Masked)": ["1,000", "-50", "200"],
+        }
+    )
+
+
+def test_shared_intermediates_are_built_once(deals, work_orders, monkeypatch):
+    builds = []
+    original = MetricsEngine._build_status_counts
+
+    def counting(self):
+        builds.append("status_counts")
+        return original(self)
+
+    monkeypatch.setattr(MetricsEngine, "_build_status_counts", counting)
+    engine = MetricsEngine(deals, work_orders, tracer=Tracer())
+    engine.compute(list(METRIC_INPUTS))
+    engine.conversion_metrics()
+
+    assert builds == ["status_counts"]
+    needed = {i for inputs in METRIC_INPUTS.values() for i in inputs}
+    spans = [e["detail"] for e in engine.tracer.dump() if e["step"] == "metric_input"]
+    assert set(spans) >= needed
+    assert len(spans) == len(set(spans))
+
+
+def test_engine_results_match_single_metric_wrappers(deals, work_orders):
+    results = MetricsEngine(deals, work_orders).compute(list(METRIC_INPUTS))
+
+    assert results["pipeline_summary"] == analytics.pipeline_summary(deals)
+    assert results["receivable_summary"] == analytics.receivable_summary(work_orders)
+    assert results["cross_board_overlap"] == analytics.cross_board_overlap(deals, work_orders)
+    assert results["sector_performance"] == analytics.sector_performance(deals, work_orders)
+    assert results["conversion_metrics"] == analytics.conversion_metrics(deals)
+    assert results["receivable_risk"] == analytics.receivable_risk(work_orders)
+
+
+def test_metric_values(deals, work_orders):
+    engine = MetricsEngine(deals, work_orders)
+
+    assert engine.pipeline_summary()["by_status"] == {"Open": 2, "Won": 2, "Dead": 1}
+    assert engine.receivable_summary() == {"total_receivable": 1150.0, "negative_count": 1}
+    assert engine.cross_board_overlap() == {"overlap_count": 2}
+    conversion = engine.conversion_metrics()
+    assert (conversion["won_count"], conversion["won_rate"]) == (2, 0.4)
+    sectors = {row["index"]: row for row in engine.sector_performance()["sector_metrics"]}
+    assert sectors["Mining"]["work_order_count"] == 2
+    assert sectors["Railways"]["win_rate"] == 0.5
+
+
+def test_frames_are_optional_per_metric(work_orders):
+    engine = MetricsEngine(work_orders=work_orders)
+
+    assert engine.receivable_risk()["negative_rows"] == 1
+    assert engine.intermediates == 2
@@ -0,0 +1,63 @@
+from app.agent import answer_cache as answer_cache_module
+from app.agent import orchestrator
+from app.agent.answer_cache import AnswerCache, answer_cache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(answer_cache_module, "monotonic", lambda: now[0])
+    cache = AnswerCache(max_entries=4, ttl=10)
+    cache.put("k", {"a": 1})
+
+    now[0] = 105.0
+    assert cache.get("k") == ({"a": 1}, 5.0)
+    now[0] = 111.0
+    assert cache.get("k") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a")[0] == 1
+    assert cache.get("c")[0] == 3
+
+
+def test_answers_are_copied_in_and_out():
+    cache = AnswerCache(max_entries=2, ttl=60)
+    answer = {"caveats": ["x"]}
+    cache.put("k", answer)
+    answer["caveats"].append("mutated")
+
+    got, _ = cache.get("k")
+    got["caveats"].append("again")
+    assert cache.get("k")[0] == {"caveats": ["x"]}
+
+
+def test_zero_ttl_disables_the_cache():
+    assert not AnswerCache(max_entries=2, ttl=0).enabled
+
+
+def _cache_steps(trace):
+    return [e["detail"] for e in trace if e["step"] == "answer_cache"]
+
+
+def test_repeat_question_is_served_from_cache_until_data_changes(monkeypatch):
+    answer_cache.clear()
+    question = "receivables for mining all-time"
+
+    first, trace = orchestrator.answer_question(question)
+    assert _cache_steps(trace) == ["miss"]
+
+    second, trace = orchestrator.answer_question(question)
+    assert _cache_steps(trace)[0].startswith("hit:")
+    assert second["final_answer"] == first["final_answer"]
+
+    monkeypatch.setattr(orchestrator, "deals_version", lambda max_staleness=None: "changed")
+    _, trace = orchestrator.answer_question(question)
+    assert _cache_steps(trace) == ["miss"]
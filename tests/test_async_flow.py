@@ -0,0 +1,161 @@
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+from app.agent import orchestrator
+from app.tools import deals_tool, monday_async
+from app.tools.board_decoder import ColumnarDecoder
+from app.tools.monday_client import FetchCancelled
+from app.tools.singleflight import aload_once, board_loads, load_once
+
+
+def test_answer_question_refuses_the_shared_loop():
+    async def nested():
+        return orchestrator.answer_question("overview all-time")
+
+    future = asyncio.run_coroutine_threadsafe(nested(), orchestrator._event_loop())
+    with pytest.raises(RuntimeError, match="answer_question_async"):
+        future.result(timeout=10)
+
+
+def test_aload_once_coalesces_concurrent_callers():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return pd.DataFrame({"a": [1, 2]})
+
+    async def main():
+        return await asyncio.gather(*(aload_once(("test", "coalesce"), load) for _ in range(3)))
+
+    frames = asyncio.run(main())
+    assert len(calls) == 1
+    assert [len(df) for df in frames] == [2, 2, 2]
+    assert frames[0] is not frames[1]
+
+
+def test_sync_caller_joins_async_load():
+    started, calls = threading.Event(), []
+
+    async def load():
+        calls.append("async")
+        started.set()
+        await asyncio.sleep(0.1)
+        return pd.DataFrame({"a": [1]})
+
+    result = {}
+    thread = threading.Thread(
+        target=lambda: (started.wait(5), result.setdefault("df", load_once(("test", "mixed"), lambda: calls.append("sync"))))
+    )
+    thread.start()
+    asyncio.run(aload_once(("test", "mixed"), load))
+    thread.join(5)
+
+    assert calls == ["async"]
+    assert len(result["df"]) == 1
+
+
+def test_waiter_retries_when_leader_is_cancelled():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return pd.DataFrame({"a": [len(calls)]})
+
+    async def main():
+        leader = asyncio.ensure_future(aload_once(("test", "cancel"), load))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(aload_once(("test", "cancel"), load, cancel_event=threading.Event()))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    df = asyncio.run(main())
+    assert len(calls) == 2
+    assert df["a"].iloc[0] == 2
+
+
+def test_waiter_with_own_cancel_event_stops():
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    async def load():
+        raise FetchCancelled("cancelled")
+
+    with pytest.raises(FetchCancelled):
+        asyncio.run(aload_once(("test", "own-cancel"), load, cancel_event=cancel_event))
+    assert not board_loads._calls
+
+
+def test_live_async_deals_coalesce_and_pass_cancel_event(monkeypatch):
+    seen = []
+
+    async def fake_consume(board_id, consume, tracer=None, column_ids=None, query_params=None, cancel_event=None):
+        seen.append(cancel_event)
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(deals_tool, "DATA_BACKEND", "monday")
+    monkeypatch.setattr(deals_tool, "MONDAY_DEALS_BOARD_ID", "123")
+    monkeypatch.setattr(deals_tool, "aconsume_board_pages", fake_consume)
+    cancel_event = threading.Event()
+
+    async def main():
+        return await asyncio.gather(
+            deals_tool.get_deals_async(None, cancel_event=cancel_event),
+            deals_tool.get_deals_async(None, cancel_event=cancel_event),
+        )
+
+    asyncio.run(main())
+    assert seen == [cancel_event]
+
+
+def test_live_async_pages_decode_as_they_arrive_off_the_loop(monkeypatch):
+    decoded = []
+    real_decode = ColumnarDecoder.decode
+
+    def decode(self, items):
+        decoded.append((threading.current_thread(), len(items)))
+        return real_decode(self, items)
+
+    async def fake_pages(board_id, max_page_size=500, tracer=None, column_ids=None, query_params=None, cancel_event=None):
+        yield [{"name": "A", "column_values": []}]
+        # The first page is decoded before the second one is requested.
+        assert len(decoded) == 1
+        yield [{"name": "B", "column_values": []}, {"name": "C", "column_values": []}]
+
+    monkeypatch.setattr(deals_tool, "DATA_BACKEND", "monday")
+    monkeypatch.setattr(deals_tool, "MONDAY_DEALS_BOARD_ID", "123")
+    monkeypatch.setattr(monday_async, "aiter_board_pages", fake_pages)
+    monkeypatch.setattr(ColumnarDecoder, "decode", decode)
+
+    async def main():
+        return threading.current_thread(), await deals_tool.get_deals_async(None)
+
+    loop_thread, df = asyncio.run(main())
+    assert df["Deal Name"].tolist() == ["A", "B", "C"]
+    assert [rows for _, rows in decoded] == [1, 2]
+    assert all(thread is not loop_thread for thread, _ in decoded)
+
+
+def test_cache_versions_are_read_off_the_loop(monkeypatch):
+    threads = []
+
+    def version(max_staleness=None):
+        threads.append(threading.current_thread())
+        return None
+
+    monkeypatch.setattr(orchestrator, "deals_version", version)
+    monkeypatch.setattr(orchestrator, "work_orders_version", version)
+
+    async def main():
+        loop_thread = threading.current_thread()
+        answer, _ = await orchestrator.answer_question_async("overview all-time")
+        return loop_thread, answer
+
+    loop_thread, answer = asyncio.run(main())
+    assert "error" not in answer
+    assert threads and loop_thread not in threads
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from app.tools.board_decoder import ColumnarDecoder
+
+COLUMN_MAP = {"status": "Deal Status", "numeric_value": "Masked Deal value"}
+
+
+def _item(name, status=None, value=None):
+    columns = []
+    if status is not None:
+        columns.append({"id": "status", "text": status})
+    if value is not None:
+        columns.append({"id": "numeric_value", "text": value})
+    return {"name": name, "column_values": columns}
+
+
+def test_pages_decode_into_one_frame_across_buffer_growth():
+    decoder = ColumnarDecoder("Deal Name", COLUMN_MAP, capacity=1)
+    decoder.decode([_item("A", "Open", "1,200"), _item("B", "Won", "3.5")])
+    decoder.decode([_item(f"C{i}", "Dead", str(i)) for i in range(5)])
+
+    df = decoder.frame()
+    assert decoder.rows == 7
+    assert decoder._capacity >= 7
+    assert df["Deal Name"].tolist() == ["A", "B", "C0", "C1", "C2", "C3", "C4"]
+    assert df["Deal Status"].tolist()[:3] == ["Open", "Won", "Dead"]
+    assert df["Masked Deal value"].tolist()[:3] == [1200.0, 3.5, 0.0]
+
+
+def test_numeric_columns_are_float_and_missing_cells_stay_empty():
+    decoder = ColumnarDecoder("Deal Name", COLUMN_MAP)
+    decoder.decode([_item("A", value="n/a"), _item("B", "Open", ""), _item("C", "Won", "7")])
+
+    df = decoder.frame()
+    assert df["Masked Deal value"].dtype == np.float64
+    assert np.isnan(df["Masked Deal value"][0]) and np.isnan(df["Masked Deal value"][1])
+    assert df["Masked Deal value"][2] == 7.0
+    assert pd.isna(df["Deal Status"][0])
+
+
+def test_unmapped_columns_keep_their_monday_id():
+    decoder = ColumnarDecoder("Deal Name", COLUMN_MAP)
+    decoder.decode([{"name": "A", "column_values": [{"id": "text_extra", "text": "x"}]}])
+
+    assert list(decoder.frame().columns) == ["Deal Name", "text_extra"]
+
+
+def test_empty_board_gives_an_empty_frame():
+    df = ColumnarDecoder("Deal Name", COLUMN_MAP).frame()
+    assert list(df.columns) == ["Deal Name"] and len(df) == 0
@@ -0,0 +1,66 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from app.schemas import DEALS_SCHEMA, apply_schema, columnar_path, preferred_dataset_path, read_dataset, write_parquet
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _deals():
+    return pd.DataFrame(
+        {
+            "Deal Name": ["A", "B", None],
+            "Deal Status": ["Open", "Won", None],
+            "Deal Stage": ["B. Sales", "H. Won", "B. Sales"],
+            "Masked Deal value": ["1,200", "", "₹300"],
+            "Sector/service": ["Mining", "Railways", ""],
+            "Created Date": ["2025-01-05", "not a date", "2025-03-01"],
+            "source_row_number": [1, 2, 3],
+        }
+    )
+
+
+def test_parquet_round_trip_keeps_canonical_types(tmp_path):
+    csv = tmp_path / "deals.csv"
+    _deals().to_csv(csv, index=False)
+    expected = apply_schema(read_dataset(csv), DEALS_SCHEMA)
+    write_parquet(expected, columnar_path(csv), DEALS_SCHEMA)
+
+    arrow = pq.read_schema(columnar_path(csv))
+    assert str(arrow.field("Created Date").type) == "date32[day]"
+    assert str(arrow.field("Masked Deal value").type) == "double"
+    assert str(arrow.field("Deal Status").type) == "dictionary<values=string, indices=int32, ordered=0>"
+
+    loaded = apply_schema(read_dataset(columnar_path(csv)), DEALS_SCHEMA)
+    assert loaded["Created Date"].dtype.kind == "M"
+    plain = {"Sector/service": object, "Deal Stage": object, "Created Date": "datetime64[ns]"}
+    pd.testing.assert_frame_equal(loaded.astype(plain), expected.astype(plain), check_dtype=False)
+    assert list(loaded["Deal Status"].cat.categories) == list(expected["Deal Status"].cat.categories)
+
+
+def test_preferred_path_uses_parquet_only_while_it_is_current(tmp_path):
+    csv = tmp_path / "deals.csv"
+    _deals().to_csv(csv, index=False)
+    assert preferred_dataset_path(csv) == str(csv)
+
+    write_parquet(apply_schema(_deals(), DEALS_SCHEMA), columnar_path(csv), DEALS_SCHEMA)
+    now = time.time_ns()
+    os.utime(csv, ns=(now, now))
+    os.utime(columnar_path(csv), ns=(now + 1_000_000, now + 1_000_000))
+    assert preferred_dataset_path(csv) == str(columnar_path(csv))
+
+    # A CSV edited after the Parquet was written wins.
+    os.utime(csv, ns=(now + 2_000_000, now + 2_000_000))
+    assert preferred_dataset_path(csv) == str(csv)
+
+
+def test_preferred_path_falls_back_without_pyarrow(tmp_path, monkeypatch):
+    csv = tmp_path / "deals.csv"
+    _deals().to_csv(csv, index=False)
+    write_parquet(apply_schema(_deals(), DEALS_SCHEMA), columnar_path(csv), DEALS_SCHEMA)
+    monkeypatch.setattr("app.schemas.pa", None)
+
+    assert preferred_dataset_path(csv) == str(csv)
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from app.services.cube import AggregateCube, build_work_orders_cube, counts, cube_views
+from app.services.metrics import MetricsEngine
+from app.tools.dataset_cache import DatasetCache
+
+
+def _work_orders(sectors, receivables, start_row=1):
+    return pd.DataFrame(
+        {
+            "Deal name masked": [f"WO {i}" for i in range(len(sectors))],
+            "Sector": pd.Categorical(sectors),
+            "Date of PO/LOI": pd.to_datetime(["2025-01-15"] * len(sectors)),
+            "Amount Receivable (Masked)": receivables,
+            "source_row_number": range(start_row, start_row + len(sectors)),
+        }
+    )
+
+
+def _totals(cube):
+    grouped = cube.cells.groupby("Sector", dropna=False, observed=True)[["rows", "named", "negative"]].sum()
+    return {sector: tuple(int(v) for v in row) for sector, row in zip(grouped.index, grouped.to_numpy())}
+
+
+def test_apply_new_category_matches_full_rebuild():
+    old = _work_orders(["Mining", "Railways", "Mining"], [10.0, -5.0, 2.5])
+    added = _work_orders(["Defense"], [7.0], start_row=4)
+    new = pd.concat([old.astype({"Sector": object}), added.astype({"Sector": object})], ignore_index=True)
+    new["Sector"] = new["Sector"].astype("category")
+
+    incremental = build_work_orders_cube(old).copy().apply(added=added, current=new)
+    rebuilt = build_work_orders_cube(new)
+
+    assert isinstance(incremental.cells["Sector"].dtype, pd.CategoricalDtype)
+    assert "Defense" in incremental.cells["Sector"].dtype.categories
+    assert not incremental.cells["Sector"].isna().any()
+    assert _totals(incremental) == _totals(rebuilt)
+    assert counts(incremental.cells, "Sector").to_dict() == counts(rebuilt.cells, "Sector").to_dict()
+
+
+def test_apply_removal_matches_full_rebuild():
+    old = _work_orders(["Mining", "Railways", "Mining"], [10.0, -5.0, 2.5])
+    new = old.iloc[[1, 2]]
+
+    incremental = build_work_orders_cube(old).copy().apply(removed=old.iloc[[0]], current=new)
+    rebuilt = build_work_orders_cube(new)
+
+    assert _totals(incremental) == _totals(rebuilt)
+    assert incremental.cells["receivable"].sum() == pytest.approx(rebuilt.cells["receivable"].sum())
+
+
+def test_slice_rejects_partial_month_timeframe():
+    cube = AggregateCube.from_frame(
+        _work_orders(["Mining"], [1.0]), dims=["Sector"], date_column="Date of PO/LOI", measures={}
+    )
+
+    class Window:
+        start = pd.Timestamp("2025-01-10").date()
+        end = pd.Timestamp("2025-02-01").date()
+
+    assert cube.slice("Sector", None, Window, "Date of PO/LOI") is None
+
+
+def test_derived_same_length_frame_does_not_use_the_cube(tmp_path):
+    path = tmp_path / "wo.csv"
+    _work_orders(["Mining", "Railways", "Mining"], [10.0, -5.0, 2.5]).to_csv(path, index=False)
+    dataset = DatasetCache().get(path, lambda p: pd.read_csv(p, parse_dates=["Date of PO/LOI"]))
+    dataset.cube(build_work_orders_cube)
+    view = dataset.view()
+    # Same length and same attrs (pandas copies them), different contents.
+    edited = view[view["Sector"].notna()].assign(**{"Amount Receivable (Masked)": [-1.0, -2.0, -3.0]})
+
+    assert cube_views.get(view) is not None
+    assert edited.attrs == view.attrs and len(edited) == len(view)
+    assert cube_views.get(edited) is None
+    assert MetricsEngine(work_orders=view).receivable_summary()["negative_count"] == 1
+    assert MetricsEngine(work_orders=edited).receivable_summary()["negative_count"] == 3
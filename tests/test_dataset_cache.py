@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app.tools.dataset_cache import DatasetCache
+
+
+def _write(path, sectors):
+    pd.DataFrame({"Sector": sectors, "Amount": range(len(sectors))}).to_csv(path, index=False)
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / "board.csv"
+    _write(path, ["Mining", "Railways", "mining"])
+    return path
+
+
+def _counting_loader(calls):
+    def load(path):
+        calls.append(path)
+        time.sleep(0.02)
+        return pd.read_csv(path)
+
+    return load
+
+
+def test_second_get_is_a_hit(csv):
+    cache, calls = DatasetCache(), []
+    first = cache.get(csv, _counting_loader(calls))
+    second = cache.get(csv, _counting_loader(calls))
+
+    assert first is second
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_changed_file_is_reloaded(csv):
+    cache, calls = DatasetCache(), []
+    first = cache.get(csv, _counting_loader(calls))
+    _write(csv, ["Mining", "Railways", "mining", "Powerline"])
+    os.utime(csv, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+    second = cache.get(csv, _counting_loader(calls))
+    assert second is not first
+    assert second.version != first.version
+    assert len(second.frame) == 4
+
+
+def test_concurrent_misses_load_once(csv):
+    cache, calls = DatasetCache(), []
+    threads = [threading.Thread(target=cache.get, args=(csv, _counting_loader(calls))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+
+
+def test_least_recently_used_dataset_is_evicted(tmp_path):
+    cache = DatasetCache(max_entries=2)
+    paths = []
+    for name in "abc":
+        paths.append(tmp_path / f"{name}.csv")
+        _write(paths[-1], ["Mining"])
+    cache.get(paths[0], pd.read_csv)
+    cache.get(paths[1], pd.read_csv)
+    cache.get(paths[0], pd.read_csv)
+    cache.get(paths[2], pd.read_csv)
+
+    cached = {os.path.basename(p) for p in cache._entries}
+    assert cached == {"a.csv", "c.csv"}
+
+
+def test_view_filters_sector_case_insensitively_and_projects(csv):
+    dataset = DatasetCache().get(csv, pd.read_csv)
+    view = dataset.view(columns=["Amount"], sector="MINING", sector_column="Sector")
+
+    assert list(view.columns) == ["Amount"]
+    assert list(view["Amount"]) == [0, 2]
+    assert view.attrs["data_version"] == dataset.version
+    assert dataset.frame.attrs == {}
+
+
+def test_previous_version_counts_toward_memory_budget(csv):
+    cache = DatasetCache()
+    first = cache.get(csv, pd.read_csv)
+    first.cube(lambda frame: SimpleNamespace(cells=[]))
+    _write(csv, ["Mining", "Railways", "mining", "Powerline"])
+    os.utime(csv, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+    second = cache.get(csv, pd.read_csv)
+    assert second._previous is first
+    assert second.footprint == first.nbytes + second.nbytes
+
+    cache.max_bytes = second.footprint - 1
+    cache._evict()
+    assert second._previous is None
+    assert list(cache._entries.values()) == [second]
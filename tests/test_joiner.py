@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from app.services import joiner
+from app.services.joiner import DEALS_KEY, WO_KEY, JoinIndex, key_codes
+
+
+def _deals(names, version, index=None):
+    df = pd.DataFrame({DEALS_KEY: names}, index=index)
+    df.attrs["data_version"] = version
+    return df
+
+
+def _work_orders(names, version=None):
+    df = pd.DataFrame({WO_KEY: names})
+    if version is not None:
+        df.attrs["data_version"] = version
+    return df
+
+
+def test_codes_agree_across_boards_and_ignore_whitespace():
+    index = JoinIndex()
+    deals = _deals(["Alpha", " Beta ", None], "v1")
+    wos = _work_orders(["Beta", "Gamma", "Alpha "])
+
+    assert index.overlap_count(deals, wos) == 2
+    assert index.deal_codes(deals).iloc[2] == -1
+    pairs = index.pairs(deals, wos)
+    assert sorted(zip(pairs["deal_row"], pairs["work_order_row"])) == [(0, 2), (1, 0)]
+
+
+def test_new_version_reencodes_only_changed_rows():
+    index = JoinIndex()
+    index.deal_codes(_deals(["Alpha", "Beta", "Gamma"], "v1"))
+    before = index.rows_encoded
+
+    updated = _deals(["Alpha", "Delta", "Gamma", "Omega"], "v2")
+    codes = index.deal_codes(updated)
+
+    assert index.rows_encoded - before == 2
+    np.testing.assert_array_equal(codes.to_numpy(), key_codes(["Alpha", "Delta", "Gamma", "Omega"]))
+
+
+def test_sector_views_of_one_version_encode_each_row_once():
+    index = JoinIndex()
+    full = _deals(["Alpha", "Beta", "Gamma", "Delta"], "v1")
+    index.deal_codes(full.iloc[[0, 1]])
+    index.deal_codes(full.iloc[[1, 2]])
+    index.deal_codes(full)
+
+    assert index.rows_encoded == 4
+
+
+def test_unversioned_frames_leave_no_state():
+    index = JoinIndex()
+    for i in range(50):
+        index.work_order_codes(_work_orders([f"Deal {i}", f"Deal {i + 1}"]))
+
+    assert index._boards == {}
+
+
+def test_work_orders_for_deal_name():
+    index = JoinIndex()
+    wos = _work_orders(["Alpha", "Beta", " Alpha"], "w1")
+
+    assert list(index.work_orders_for("Alpha", wos).index) == [0, 2]
+    assert index.work_orders_for("Missing", wos).empty
+
+
+def _merged_pairs(index, deals, wos):
+    d, w = index.deal_codes(deals), index.work_order_codes(wos)
+    left = pd.DataFrame({"key": d.to_numpy(), "deal_row": d.index})
+    right = pd.DataFrame({"key": w.to_numpy(), "work_order_row": w.index})
+    merged = left[left["key"] >= 0].merge(right[right["key"] >= 0], on="key")
+    return sorted(zip(merged["deal_row"], merged["work_order_row"]))
+
+
+def test_pairs_sort_work_orders_once_per_version(monkeypatch):
+    sorts = []
+    original = joiner._sorted_codes
+    monkeypatch.setattr(joiner, "_sorted_codes", lambda codes: sorts.append(len(codes)) or original(codes))
+    index = JoinIndex()
+    deals = _deals(["Alpha", "Beta", "Gamma", None], "d1")
+    wos = _work_orders(["Beta", "Alpha", "Beta", "Delta", None], "w1")
+
+    for view in (wos, wos.iloc[[0, 1]], wos.iloc[[2, 3, 4]], wos):
+        pairs = index.pairs(deals, view)
+        assert sorted(zip(pairs["deal_row"], pairs["work_order_row"])) == _merged_pairs(index, deals, view)
+
+    assert sorts == [5]
+    assert sorted(index.pairs(deals.iloc[[1]], wos)["work_order_row"]) == [0, 2]
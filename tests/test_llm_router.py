@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app.agent import llm_router, orchestrator
+from app.agent.parse_cache import ParseCache
+from app.tools.trace import Tracer
+
+PAYLOAD = {"intent": "Receivables", "sector": "MINING", "timeframe": " last quarter ", "needs_clarification": False}
+
+
+class _Response:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"candidates": [{"content": {"parts": [{"text": json.dumps(PAYLOAD)}]}}]}
+
+
+@pytest.fixture
+def gemini(tmp_path, monkeypatch):
+    posts = []
+
+    class Session:
+        def post(self, url, json=None, timeout=None):
+            posts.append(timeout)
+            return _Response()
+
+    monkeypatch.setattr(llm_router, "GEMINI_API_KEY", "key")
+    monkeypatch.setattr(llm_router, "get_parse_cache", lambda: ParseCache(tmp_path / "p.sqlite", ttl=0))
+    monkeypatch.setattr(llm_router, "get_session", lambda: Session())
+    return posts
+
+
+def test_session_is_shared_and_pooled():
+    session = llm_router.get_session()
+
+    assert llm_router.get_session() is session
+    assert session.get_adapter("https://example.com")._pool_maxsize == llm_router.GEMINI_POOL_MAXSIZE
+
+
+def test_calls_use_the_request_timeout_and_validate_the_reply(gemini):
+    parsed = llm_router.parse_query_with_llm("receivables for mining")
+
+    assert gemini == [llm_router.GEMINI_TIMEOUT]
+    assert parsed["intent"] == "overview"  # not an allowed intent spelling
+    assert (parsed["sector"], parsed["timeframe"]) == ("mining", "last quarter")
+
+
+def test_slow_llm_falls_back_to_rules_at_the_budget(monkeypatch):
+    release = threading.Event()
+
+    def slow(question, tracer=None):
+        release.wait(5)
+        return {**PAYLOAD, "intent": "receivables", "sector": "mining"}
+
+    monkeypatch.setattr(orchestrator, "parse_query_with_llm", slow)
+    tracer = Tracer()
+    parsed = orchestrator._parse_query("pipeline for mining over the past two years", tracer, budget=0.1)
+    release.set()
+
+    assert parsed["source"] == "rules"
+    step = next(e for e in tracer.dump() if e["step"] == "intent_parse_fallback")
+    assert "budget, finishing in background" in step["detail"]
+
+
+def test_async_slow_llm_keeps_running_after_the_budget(monkeypatch):
+    finished = []
+
+    async def slow(question, tracer=None):
+        await asyncio.sleep(0.2)
+        finished.append(question)
+        return {**PAYLOAD, "intent": "receivables", "sector": "mining"}
+
+    monkeypatch.setattr(orchestrator, "parse_query_with_llm_async", slow)
+    monkeypatch.setattr(orchestrator, "LLM_LATENCY_BUDGET", 0.05)
+
+    async def main():
+        parsed = await orchestrator._parse_query_async("pipeline for mining over the past two years", Tracer())
+        await asyncio.sleep(0.3)
+        return parsed
+
+    assert asyncio.run(main())["source"] == "rules"
+    assert finished == ["pipeline for mining over the past two years"]
+
+
+def test_cached_parse_needs_no_api_key(gemini, tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path / "cached.sqlite", ttl=60)
+    monkeypatch.setattr(llm_router, "get_parse_cache", lambda: cache)
+    first = llm_router.parse_query_with_llm("receivables for mining")
+    monkeypatch.setattr(llm_router, "GEMINI_API_KEY", "")
+
+    assert llm_router.parse_query_with_llm("receivables for mining") == first
+    assert asyncio.run(llm_router.parse_query_with_llm_async("receivables for mining")) == first
+    assert len(gemini) == 1
+    with pytest.raises(RuntimeError, match="GEMINI_API_KEY"):
+        llm_router.parse_query_with_llm("pipeline for railways")
+
+
+def test_shared_loop_closes_its_clients_at_shutdown(monkeypatch):
+    pytest.importorskip("httpx")
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(orchestrator, "_loop", loop)
+
+    async def open_client():
+        return llm_router._async_client()
+
+    client = asyncio.run_coroutine_threadsafe(open_client(), loop).result(5)
+    orchestrator._shutdown_event_loop()
+    thread.join(5)
+    loop.close()
+
+    assert client.is_closed
+    assert not thread.is_alive()
+    assert loop not in llm_router._async_clients
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.tools import monday_client
+from app.tools.monday_async import AsyncMondayClient
+from app.tools.monday_client import MondayClient, iter_board_pages
+from app.tools.trace import Tracer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({"data": {}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connection_stats_are_counted_per_request(api_url):
+    client = MondayClient(api_url=api_url, token="x")
+    first, second = {}, {}
+    client.post("query { a }", stats=first)
+    client.post("query { b }", stats=second)
+
+    assert first == {"new_connections": 1}
+    assert second == {"new_connections": 0}
+    client.close()
+
+
+def test_async_client_counts_new_connections(api_url):
+    async def main():
+        client = AsyncMondayClient(api_url=api_url, token="x")
+        stats = {}
+        await client.post("query { a }", stats=stats)
+        await client.post("query { b }", stats=stats)
+        await client.http.aclose()
+        return stats
+
+    assert asyncio.run(main()) == {"new_connections": 1}
+
+
+def test_pool_trace_is_written_when_the_caller_stops_early(monkeypatch):
+    client = MondayClient(token="x")
+
+    def execute(query, variables=None, page_size=None, cancel_event=None, stats=None):
+        stats["requests"] = stats.get("requests", 0) + 1
+        page = {"cursor": "next", "items": [{"id": "1"}]}
+        return {"boards": [{"items_page": page}]} if "board_id" in variables else {"next_items_page": page}
+
+    monkeypatch.setattr(monday_client, "get_client", lambda: client)
+    monkeypatch.setattr(client, "execute", execute)
+    tracer = Tracer()
+    pages = iter_board_pages("1", tracer=tracer, prefetch=False)
+    next(pages)
+    pages.close()
+
+    steps = {e["step"]: e for e in tracer.dump()}
+    assert steps["monday_http_pool"]["detail"].startswith("board=1, requests=1,")
+    assert steps["monday_complexity"]["rows"] == 1
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+from app.tools import deals_tool, monday_client, work_orders_tool
+from app.tools.monday_client import (
+    MondayClient,
+    MondayQueryError,
+    MondayThrottled,
+    label_indexes,
+    parse_status_labels,
+)
+from app.tools.trace import Tracer
+
+LABELS = {0: "Mining", 1: "Renewables", 2: "Railways"}
+
+
+def test_parse_status_labels():
+    data = {"boards": [{"columns": [{"id": "color_x", "settings_str": json.dumps({"labels": {"0": "Mining", "5": "Railways"}})}]}]}
+
+    assert parse_status_labels(data) == {0: "Mining", 5: "Railways"}
+    assert parse_status_labels({"boards": []}) == {}
+
+
+def test_sector_rule_uses_label_indexes_case_insensitively():
+    assert label_indexes({0: "Mining", 1: "MINING", 2: "Railways"}, "mining") == [0, 1]
+
+    params = deals_tool._sector_query_params("renewables", LABELS)
+    rule = params["rules"][0]
+    assert rule["operator"] == "any_of"
+    assert rule["compare_value"] == [1]
+    assert rule["column_id"] == deals_tool._sector_column("renewables")
+
+
+def test_unknown_sector_is_filtered_in_pandas():
+    assert work_orders_tool._sector_query_params("defense", LABELS) is None
+
+
+@pytest.fixture
+def live_deals(monkeypatch):
+    calls = []
+
+    def fake_pages(board_id, tracer=None, cancel_event=None, column_ids=None, query_params=None):
+        calls.append(query_params)
+        error = fake_pages.errors.pop(0) if fake_pages.errors else None
+        if error is not None:
+            raise error
+        return iter([[]])
+
+    fake_pages.errors = []
+    monkeypatch.setattr(deals_tool, "MONDAY_DEALS_BOARD_ID", "1")
+    monkeypatch.setattr(deals_tool, "status_labels", lambda board_id, column_id, cancel_event=None: LABELS)
+    monkeypatch.setattr(deals_tool, "iter_board_pages", fake_pages)
+    return fake_pages, calls
+
+
+def test_rejected_rule_falls_back_to_unfiltered_fetch(live_deals):
+    fake_pages, calls = live_deals
+    fake_pages.errors = [MondayQueryError("Monday API errors: invalid compare_value")]
+    tracer = Tracer()
+
+    deals_tool._load_monday(sector="mining", tracer=tracer)
+
+    assert calls[0]["rules"][0]["compare_value"] == [0]
+    assert calls[1] is None
+    assert "filter_pushdown_fallback" in [e["step"] for e in tracer.dump()]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [RuntimeError("Monday API throttled (gave up after 4 retries)"), ConnectionError("connection reset")],
+)
+def test_transport_errors_do_not_refetch_unfiltered(live_deals, error):
+    fake_pages, calls = live_deals
+    fake_pages.errors = [error]
+
+    with pytest.raises(type(error)):
+        deals_tool._load_monday(sector="mining")
+    assert len(calls) == 1
+
+
+def test_async_rejected_rule_falls_back(monkeypatch):
+    calls = []
+
+    async def fake_consume(board_id, consume, tracer=None, column_ids=None, query_params=None, cancel_event=None):
+        calls.append(query_params)
+        if query_params is not None:
+            raise MondayQueryError("Monday API errors: invalid compare_value")
+
+    async def fake_labels(board_id, column_id):
+        return LABELS
+
+    monkeypatch.setattr(work_orders_tool, "DATA_BACKEND", "monday")
+    monkeypatch.setattr(work_orders_tool, "MONDAY_WORK_ORDERS_BOARD_ID", "2")
+    monkeypatch.setattr(work_orders_tool, "aconsume_board_pages", fake_consume)
+    monkeypatch.setattr(work_orders_tool, "astatus_labels", fake_labels)
+
+    asyncio.run(work_orders_tool.get_work_orders_async(None, sector="railways"))
+    assert calls[0]["rules"][0]["compare_value"] == [2]
+    assert calls[1] is None
+
+
+def test_execute_separates_rejections_from_exhausted_retries(monkeypatch):
+    monkeypatch.setattr(monday_client, "_sleep", lambda delay, cancel_event=None: None)
+    client = MondayClient(token="x")
+
+    monkeypatch.setattr(client, "post", lambda query, variables=None, stats=None: {"errors": [{"message": "invalid rule"}]})
+    with pytest.raises(MondayQueryError):
+        client.execute("query { boards { id } }")
+
+    def throttled(query, variables=None, stats=None):
+        raise MondayThrottled("Monday API returned HTTP 503", retry_after=0)
+
+    monkeypatch.setattr(client, "post", throttled)
+    with pytest.raises(RuntimeError) as exc:
+        client.execute("query { boards { id } }")
+    assert not isinstance(exc.value, MondayQueryError)
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from app.agent import orchestrator
+from app.tools.monday_client import FetchCancelled
+from app.tools.trace import Tracer
+
+
+def _slow(name, delay, calls):
+    def fetch(tracer, sector=None, cancel_event=None, columns=None, max_staleness=None, **kwargs):
+        calls.append((name, columns))
+        time.sleep(delay)
+        return pd.DataFrame({"board": [name]})
+
+    return fetch
+
+
+def test_boards_are_fetched_concurrently_with_their_projections(monkeypatch):
+    calls = []
+    monkeypatch.setattr(orchestrator, "get_deals", _slow("deals", 0.3, calls))
+    monkeypatch.setattr(orchestrator, "get_work_orders", _slow("work_orders", 0.3, calls))
+    tracer = Tracer()
+
+    started = time.perf_counter()
+    deals, wos = orchestrator._fetch_boards(tracer, None, intent="receivables")
+    elapsed = time.perf_counter() - started
+
+    assert (deals["board"][0], wos["board"][0]) == ("deals", "work_orders")
+    assert elapsed < 0.5
+    assert dict(calls) == {
+        "deals": orchestrator.INTENT_COLUMNS["receivables"]["get_deals"],
+        "work_orders": orchestrator.INTENT_COLUMNS["receivables"]["get_work_orders"],
+    }
+    span = next(e for e in tracer.dump() if e["step"] == "parallel_fetch")
+    assert span["detail"].startswith("critical_path=")
+
+
+def test_failed_fetch_stops_its_sibling(monkeypatch):
+    sibling = {"started": threading.Event()}
+
+    def failing(tracer, **kwargs):
+        sibling["started"].wait(5)
+        raise ValueError("deals board unavailable")
+
+    def waiting(tracer, cancel_event=None, **kwargs):
+        sibling["started"].set()
+        sibling["stopped"] = cancel_event.wait(5)
+        raise FetchCancelled("stopped")
+
+    monkeypatch.setattr(orchestrator, "get_deals", failing)
+    monkeypatch.setattr(orchestrator, "get_work_orders", waiting)
+    tracer = Tracer()
+
+    started = time.perf_counter()
+    with pytest.raises(ValueError, match="unavailable"):
+        orchestrator._fetch_boards(tracer, None)
+
+    assert sibling["stopped"]
+    assert time.perf_counter() - started < 2
+    span = next(e for e in tracer.dump() if e["step"] == "parallel_fetch")
+    assert span["detail"] == "failed=get_deals, cancelled=get_work_orders"
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from app.agent import llm_router, parse_cache
+from app.agent.parse_cache import ParseCache
+
+PAYLOAD = {"intent": "pipeline", "sector": "mining", "timeframe": "last quarter", "needs_clarification": False}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(tmp_path / "parses.sqlite", ttl=60, max_entries=3)
+
+
+def test_normalised_question_hits(cache):
+    cache.put("How is the Mining pipeline?", "m", "prompt", PAYLOAD)
+
+    assert cache.get("how is the  mining pipeline", "m", "prompt") == PAYLOAD
+
+
+def test_model_or_prompt_change_misses(cache):
+    cache.put("pipeline", "m1", "prompt", PAYLOAD)
+
+    assert cache.get("pipeline", "m2", "prompt") is None
+    assert cache.get("pipeline", "m1", "new prompt") is None
+
+
+def test_expired_entries_are_dropped(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(parse_cache, "time", lambda: now[0])
+    cache.put("pipeline", "m", "prompt", PAYLOAD)
+
+    now[0] = 1061.0
+    assert cache.get("pipeline", "m", "prompt") is None
+    assert cache.invalidate() == 0
+
+
+def test_least_recently_used_entries_are_evicted(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(parse_cache, "time", lambda: now[0])
+    for i, question in enumerate(["a", "b", "c"]):
+        now[0] = 1000.0 + i
+        cache.put(question, "m", "prompt", PAYLOAD)
+    now[0] = 1010.0
+    cache.get("a", "m", "prompt")
+    now[0] = 1011.0
+    cache.put("d", "m", "prompt", PAYLOAD)
+
+    assert cache.get("b", "m", "prompt") is None
+    assert cache.get("a", "m", "prompt") == PAYLOAD
+
+
+def test_invalidate_by_model(cache):
+    cache.put("a", "m1", "prompt", PAYLOAD)
+    cache.put("b", "m2", "prompt", PAYLOAD)
+
+    assert cache.invalidate(model="m1") == 1
+    assert cache.get("b", "m2", "prompt") == PAYLOAD
+
+
+def test_broken_database_is_a_miss(cache):
+    cache.path.write_bytes(b"not a sqlite database")
+
+    assert cache.get("pipeline", "m", "prompt") is None
+    cache.put("pipeline", "m", "prompt", PAYLOAD)
+
+
+def test_llm_parse_is_cached(cache, monkeypatch):
+    posts = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"candidates": [{"content": {"parts": [{"text": json.dumps(PAYLOAD)}]}}]}
+
+    class Session:
+        def post(self, url, json=None, timeout=None):
+            posts.append(json)
+            return Response()
+
+    monkeypatch.setattr(llm_router, "GEMINI_API_KEY", "key")
+    monkeypatch.setattr(llm_router, "get_parse_cache", lambda: cache)
+    monkeypatch.setattr(llm_router, "get_session", lambda: Session())
+
+    first = llm_router.parse_query_with_llm("How is the mining pipeline last quarter?")
+    second = llm_router.parse_query_with_llm("how is the mining pipeline last quarter")
+
+    assert len(posts) == 1
+    assert first == second
+    assert second["sector"] == "mining"
@@ -0,0 +1,55 @@
+import pytest
+
+from app.agent import orchestrator
+from app.tools import deals_tool, work_orders_tool
+from app.tools.deals_tool import DEALS_COLUMN_MAP
+from app.tools.monday_client import page_queries
+from app.tools.work_orders_tool import WO_COLUMN_MAP
+
+
+def test_page_queries_project_column_values_only_when_asked():
+    first, following = page_queries(["status", "date4"])
+    assert "column_values(ids: $column_ids)" in first
+    assert "column_values(ids: $column_ids)" in following
+    assert "$column_ids: [String!]" in first
+
+    first, following = page_queries()
+    assert "column_values {" in first
+    assert "$column_ids" not in first + following
+
+
+def test_projection_adds_sector_and_date_columns():
+    wanted = deals_tool._projection(["Deal Name", "Deal Status"], sector="mining", date_column="Created Date")
+
+    assert wanted == ["Deal Name", "Deal Status", "Sector/service", "Created Date"]
+    assert deals_tool._projection(None, sector="mining") is None
+
+
+def test_live_fetch_requests_only_the_intent_columns(monkeypatch):
+    seen = []
+
+    def fake_pages(board_id, tracer=None, cancel_event=None, column_ids=None, query_params=None):
+        seen.append(column_ids)
+        return iter([[{"name": "Deal A", "column_values": []}]])
+
+    monkeypatch.setattr(deals_tool, "MONDAY_DEALS_BOARD_ID", "1")
+    monkeypatch.setattr(deals_tool, "iter_board_pages", fake_pages)
+    columns = orchestrator.INTENT_COLUMNS["pipeline"]["get_deals"]
+
+    df = deals_tool._load_monday(columns=columns)
+
+    by_name = {name: col_id for col_id, name in DEALS_COLUMN_MAP.items()}
+    assert seen == [[by_name[c] for c in columns if c in by_name]]
+    # Required columns that were not fetched still exist, empty and typed.
+    assert {"Deal Status", "Deal Stage", "Sector/service"} <= set(df.columns)
+
+
+@pytest.mark.parametrize("intent", sorted(orchestrator.INTENT_COLUMNS))
+def test_intent_projections_cover_their_metrics_inputs(intent):
+    deals = orchestrator.INTENT_COLUMNS[intent]["get_deals"]
+    wos = orchestrator.INTENT_COLUMNS[intent]["get_work_orders"]
+
+    assert set(orchestrator._BASE_DEAL_COLUMNS) <= set(deals)
+    assert set(orchestrator._BASE_WO_COLUMNS) <= set(wos)
+    assert len(deals_tool._column_ids(deals)) < len(DEALS_COLUMN_MAP)
+    assert len(work_orders_tool._column_ids(wos)) < len(WO_COLUMN_MAP)
@@ -0,0 +1,82 @@
+import pytest
+
+from app.tools import monday_client
+from app.tools.monday_client import ComplexityScheduler, MondayClient, MondayThrottled
+
+
+def test_page_size_shrinks_to_the_remaining_budget():
+    scheduler = ComplexityScheduler(budget=10_000, reserve=0.1, min_page_size=25)
+    assert scheduler.page_size(500) == 500
+
+    scheduler.record({"query": 1_000, "after": 9_000, "reset_in_x_seconds": 30}, page_size=500)
+    assert scheduler.cost_per_item == 2
+    assert scheduler.page_size(500) == 500
+
+    scheduler.record({"query": 1_000, "after": 1_500, "reset_in_x_seconds": 30}, page_size=500)
+    # (1500 - 0.1 * 10000) / 2 per item
+    assert scheduler.page_size(500) == 250
+
+    scheduler.record({"after": 1_010}, page_size=500)
+    assert scheduler.page_size(500) == 25
+
+
+def test_acquire_waits_for_the_reset_below_the_reserve(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(monday_client, "monotonic", lambda: clock[0])
+    scheduler = ComplexityScheduler(budget=1_000, reserve=0.1)
+    scheduler.record({"after": 150, "reset_in_x_seconds": 20})
+
+    assert scheduler.try_acquire(100) == pytest.approx(20)
+    clock[0] += 20
+    assert scheduler.try_acquire(100) == 0
+    assert scheduler.remaining == 900
+
+
+def test_backoff_is_jittered_and_honours_retry_after():
+    scheduler = ComplexityScheduler(backoff_base=1.0)
+    assert 2.0 <= scheduler.backoff(2) <= 6.0
+    assert 5.0 <= scheduler.backoff(0, retry_after=10) <= 15.0
+
+
+def test_execute_retries_throttled_attempts(monkeypatch):
+    delays = []
+    monkeypatch.setattr(monday_client, "_sleep", lambda delay, cancel_event=None: delays.append(delay))
+    client = MondayClient(token="x")
+    client.scheduler.max_retries = 3
+    responses = [
+        MondayThrottled("Monday API returned HTTP 429", retry_after=2),
+        {"errors": [{"message": "Complexity budget exhausted, reset in 7 seconds"}]},
+        {"data": {"ok": True, "complexity": {"query": 10, "after": 900}}},
+    ]
+
+    def post(query, variables=None, stats=None):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(client, "post", post)
+    stats = {}
+    data = client.execute("query { boards { id } }", page_size=5, stats=stats)
+
+    assert data["ok"]
+    assert stats["requests"] == 3 and stats["retries"] == 2
+    assert 1.0 <= delays[0] <= 3.0 and 3.5 <= delays[1] <= 10.5
+    assert client.scheduler.remaining == 900
+    assert client.scheduler.cost_per_item == 2
+
+
+def test_execute_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(monday_client, "_sleep", lambda delay, cancel_event=None: None)
+    client = MondayClient(token="x")
+    client.scheduler.max_retries = 2
+    calls = []
+
+    def post(query, variables=None, stats=None):
+        calls.append(query)
+        raise MondayThrottled("Monday API returned HTTP 503")
+
+    monkeypatch.setattr(client, "post", post)
+    with pytest.raises(RuntimeError, match="gave up after 2 retries"):
+        client.execute("query { boards { id } }")
+    assert len(calls) == 3
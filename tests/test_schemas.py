@@ -0,0 +1,63 @@
+import pandas as pd
+
+from app.schemas import DEALS_SCHEMA, WO_SCHEMA, apply_schema, ensure_columns, matches_ci
+
+
+def test_apply_schema_coerces_each_kind():
+    df = apply_schema(
+        pd.DataFrame(
+            {
+                "Deal Name": ["A", "B"],
+                "Masked Deal value": ["₹1,200", "n/a"],
+                "Created Date": ["2025-01-05", "soon"],
+                "Sector/service": ["Mining", ""],
+                "source_row_number": ["1", "x"],
+                "Unlisted": ["kept", "as text"],
+            }
+        ),
+        DEALS_SCHEMA,
+    )
+
+    assert df["Masked Deal value"].tolist()[0] == 1200.0 and pd.isna(df["Masked Deal value"][1])
+    assert df["Created Date"].dtype.kind == "M" and pd.isna(df["Created Date"][1])
+    assert isinstance(df["Sector/service"].dtype, pd.CategoricalDtype)
+    assert list(df["Sector/service"].cat.categories) == ["Mining"]
+    assert str(df["source_row_number"].dtype) == "Int64"
+    assert df["Unlisted"].tolist() == ["kept", "as text"]
+
+
+def test_missing_required_columns_are_added_empty_and_typed():
+    df = ensure_columns(pd.DataFrame({"Deal name masked": ["WO 1"]}), WO_SCHEMA)
+
+    assert df["Amount Receivable (Masked)"].dtype == "float64"
+    assert isinstance(df["Sector"].dtype, pd.CategoricalDtype)
+    assert df["Sector"].isna().all()
+    assert "Collection Date" not in df.columns
+
+
+def test_apply_schema_is_idempotent():
+    raw = pd.DataFrame({"Deal Name": ["A"], "Masked Deal value": ["5"], "Created Date": ["2025-02-01"]})
+    once = apply_schema(raw.copy(), DEALS_SCHEMA)
+    twice = apply_schema(once.copy(), DEALS_SCHEMA)
+
+    pd.testing.assert_frame_equal(once, twice)
+
+
+def test_matches_ci_on_categorical_and_text_columns():
+    categorical = pd.Series(["Mining", "MINING", "Railways", None], dtype="category")
+    text = categorical.astype(object)
+
+    assert matches_ci(categorical, "mining").tolist() == [True, True, False, False]
+    assert matches_ci(text, "mining").tolist() == [True, True, False, False]
+
+
+def test_unknown_pinned_category_values_are_kept():
+    df = apply_schema(
+        pd.DataFrame({"Deal Name": ["A", "B", "C", "D"], "Deal Status": ["Won", "Cancelled", "", None]}),
+        DEALS_SCHEMA,
+    )
+
+    assert df["Deal Status"].tolist()[:2] == ["Won", "Cancelled"]
+    assert df["Deal Status"].isna().tolist() == [False, False, True, True]
+    assert list(df["Deal Status"].cat.categories) == ["Dead", "On Hold", "Open", "Won", "Cancelled"]
+    pd.testing.assert_frame_equal(apply_schema(df.copy(), DEALS_SCHEMA), df)
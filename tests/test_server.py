@@ -0,0 +1,113 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from app import server
+from app.server import Overloaded, QueryService, make_handler
+
+
+@pytest.fixture
+def base_url():
+    service = QueryService(workers=2, queue_size=2, deadline=5)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    service.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _request(url, payload=None):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=10) as resp:
+            return resp.status, resp.read().decode("utf-8")
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read().decode("utf-8")
+
+
+def test_ask_returns_answer(base_url, monkeypatch):
+    monkeypatch.setattr(server, "answer_question", lambda q: ({"summary": q}, [{"step": "x"}]))
+    status, body = _request(f"{base_url}/ask", {"question": "overview all-time"})
+
+    assert status == 200
+    assert json.loads(body)["answer"] == {"summary": "overview all-time"}
+
+
+def test_orchestrator_errors_are_500(base_url, monkeypatch):
+    def broken(question):
+        raise KeyError("missing column")
+
+    monkeypatch.setattr(server, "answer_question", broken)
+    status, body = _request(f"{base_url}/ask", {"question": "overview all-time"})
+
+    assert status == 500
+    assert json.loads(body)["error"] == "internal error"
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"question": "overview", "deadline_s": 0},
+        {"question": "overview", "deadline_s": -1},
+        {"question": "overview", "deadline_s": "10"},
+        {"question": "overview", "deadline_s": False},
+        {"question": ""},
+        {},
+    ],
+)
+def test_invalid_payload_is_400(base_url, monkeypatch, payload):
+    monkeypatch.setattr(server, "answer_question", lambda q: pytest.fail("must not run"))
+    status, _ = _request(f"{base_url}/ask", payload)
+
+    assert status == 400
+
+
+def test_invalid_json_is_400(base_url):
+    req = urllib.request.Request(f"{base_url}/ask", data=b"{not json")
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        urllib.request.urlopen(req, timeout=10)
+
+    assert exc.value.code == 400
+
+
+def test_paths_ignore_query_string(base_url):
+    status, body = _request(f"{base_url}/metrics?format=prometheus")
+    assert status == 200
+    assert "bi_requests_pending" in body
+
+    status, _ = _request(f"{base_url}/healthz?probe=1")
+    assert status == 200
+
+
+def test_service_sheds_load_past_queue():
+    service = QueryService(workers=1, queue_size=1, deadline=5)
+    release = threading.Event()
+    try:
+        service.submit(release.wait)
+        service.submit(release.wait)
+        with pytest.raises(Overloaded):
+            service.submit(release.wait)
+        assert service.rejected == 1
+    finally:
+        release.set()
+        service.pool.shutdown(wait=True)
+
+
+def test_service_deadline_is_capped_and_counted():
+    service = QueryService(workers=1, queue_size=0, deadline=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(FutureTimeout):
+            service.run(release.wait, deadline=60)
+        assert service.timeouts == 1
+    finally:
+        release.set()
+        service.pool.shutdown(wait=True)
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from app.tools.monday_client import FetchCancelled
+from app.tools.singleflight import SingleFlight, load_once
+from app.tools.trace import Tracer
+
+
+def test_concurrent_calls_share_one_execution():
+    flight, calls, results = SingleFlight(), [], []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return "rows"
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(coalesced for _, coalesced in results) == [False, True, True, True, True]
+    assert (flight.leaders, flight.coalesced) == (1, 4)
+
+
+def test_errors_reach_every_waiter_and_key_is_forgotten():
+    flight, errors = SingleFlight(), []
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except ValueError as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    leader.join()
+    waiter.join()
+
+    assert len(errors) == 2
+    assert flight.do("k", lambda: "fresh") == ("fresh", False)
+
+
+def test_load_once_traces_coalesced_callers_and_copies():
+    tracers, frames = [Tracer() for _ in range(3)], []
+    gate = threading.Event()
+
+    def load():
+        gate.wait(5)
+        return pd.DataFrame({"a": [1, 2]})
+
+    threads = [
+        threading.Thread(target=lambda t=t: frames.append(load_once(("test", "trace"), load, tracer=t)))
+        for t in tracers
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    coalesced = [e for t in tracers for e in t.dump() if e["step"] == "singleflight"]
+    assert len(coalesced) == 2
+    assert len({id(df) for df in frames}) == 3
+
+
+def test_waiter_retries_after_leader_is_cancelled():
+    calls, started = [], threading.Event()
+    leader_cancel = threading.Event()
+
+    def load():
+        calls.append(1)
+        if len(calls) == 1:
+            started.set()
+            leader_cancel.wait(5)
+            raise FetchCancelled("sibling failed")
+        return pd.DataFrame({"a": [1]})
+
+    errors, frames = [], []
+
+    def leader():
+        try:
+            load_once(("test", "retry"), load, cancel_event=leader_cancel)
+        except FetchCancelled as exc:
+            errors.append(exc)
+
+    t1 = threading.Thread(target=leader)
+    t1.start()
+    started.wait(5)
+    t2 = threading.Thread(target=lambda: frames.append(load_once(("test", "retry"), load, cancel_event=threading.Event())))
+    t2.start()
+    time.sleep(0.02)
+    leader_cancel.set()
+    t1.join()
+    t2.join()
+
+    assert len(errors) == 1
+    assert len(frames) == 1 and len(calls) == 2
+
+
+def test_cancelled_caller_does_not_retry():
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    def load():
+        raise FetchCancelled("cancelled")
+
+    with pytest.raises(FetchCancelled):
+        load_once(("test", "own"), load, cancel_event=cancel_event)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.cube import CubeView, build_work_orders_cube, cube_views
+from app.services.metrics import MetricsEngine
+from app.services.sketch import KLLSketch, kll_rank_error, merge_all
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 150])
+@pytest.mark.parametrize("q", [0.0, 0.1, 0.5, 0.9, 1.0])
+def test_uncompacted_sketch_matches_pandas_quantile(n, q):
+    values = np.random.default_rng(n).normal(size=n) * 1000
+
+    assert KLLSketch.from_values(values).quantile(q) == pytest.approx(pd.Series(values).quantile(q))
+
+
+def test_compacted_sketch_stays_within_rank_error():
+    values = np.random.default_rng(7).lognormal(size=200_000)
+    sketch = merge_all([KLLSketch.from_values(chunk) for chunk in np.array_split(values, 20)])
+
+    assert sketch.n == len(values)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        rank = (values < sketch.quantile(q)).mean()
+        assert abs(rank - q) <= kll_rank_error(sketch.k)
+
+
+def test_empty_sketch_quantile_is_nan():
+    assert np.isnan(KLLSketch().quantile(0.5))
+
+
+def _work_orders(n=400):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "Deal name masked": [f"WO {i}" for i in range(n)],
+            "Sector": pd.Categorical(rng.choice(["Mining", "Railways", "Renewables"], size=n)),
+            "Date of PO/LOI": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D"),
+            "Amount Receivable (Masked)": rng.normal(100_000, 50_000, size=n).round(2),
+            "source_row_number": range(1, n + 1),
+        }
+    )
+    cube = build_work_orders_cube(df)
+    cube_views.attach(df, CubeView(cube, date_column="Date of PO/LOI"))
+    return df, cube
+
+
+def test_approx_and_exact_modes_agree_within_rank_error():
+    wos, _ = _work_orders()
+    exact = MetricsEngine(work_orders=wos, quantile_mode="exact").receivable_risk()
+    approx = MetricsEngine(work_orders=wos, quantile_mode="approx").receivable_risk()
+    values = wos["Amount Receivable (Masked)"]
+
+    assert approx["quantile_mode"] == "approx"
+    assert abs((values < approx["threshold"]).mean() - 0.9) <= approx["rank_error"]
+    assert abs(approx["high_outstanding_rows"] - exact["high_outstanding_rows"]) <= approx["rank_error"] * len(values)
+
+
+def test_merged_sketch_is_cached_per_slice_until_apply():
+    wos, cube = _work_orders()
+    first = cube.merged_sketch("Sector", "mining")
+    assert cube.merged_sketch("Sector", "Mining") is first
+    assert cube.merged_sketch("Sector", "railways") is not first
+
+    cube.apply(added=wos.iloc[:1].assign(source_row_number=10_000), current=wos)
+    assert cube.merged_sketch("Sector", "mining") is not first
+    rows, sketch = cube.merged_sketch("Sector", None)
+    assert rows == len(wos) + 1
+    assert sketch.n == len(wos) + 1
@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+from app.tools import deals_tool, snapshot_store
+from app.tools.snapshot_store import BoardSnapshotStore
+from app.tools.trace import Tracer
+
+
+def _item(item_id, sector, updated_at="2025-01-01T00:00:00Z"):
+    return {
+        "id": item_id,
+        "name": f"Deal {item_id}",
+        "updated_at": updated_at,
+        "column_values": [{"id": "sector", "text": sector}, {"id": "value", "text": "10"}],
+    }
+
+
+@pytest.fixture
+def board(monkeypatch):
+    items = {i["id"]: i for i in [_item("1", "Mining"), _item("2", "Railways"), _item("3", "mining")]}
+    calls = []
+
+    def fetch(board_id, tracer=None, cancel_event=None, column_ids=None, query_params=None):
+        calls.append("ids" if column_ids == [] else "updates" if query_params else "full")
+        if column_ids == []:
+            return [{"id": item_id} for item_id in items]
+        return list(items.values())
+
+    monkeypatch.setattr(snapshot_store, "fetch_board_items", fetch)
+    return items, calls
+
+
+def test_incremental_sync_skips_the_id_sweep_until_it_is_due(tmp_path, board):
+    items, calls = board
+    store = BoardSnapshotStore(tmp_path / "snap.sqlite", sweep_interval=3600)
+    store.sync("1")
+    del items["2"]
+    store.sync("1")
+
+    assert calls == ["full", "updates"]
+    assert {i["id"] for i in store.items("1")} == {"1", "2", "3"}
+
+    store.sweep_interval = 0
+    store.sync("1")
+    assert calls[-2:] == ["updates", "ids"]
+    assert {i["id"] for i in store.items("1")} == {"1", "3"}
+
+
+def test_items_filter_sector_case_insensitively_and_project(tmp_path, board):
+    store = BoardSnapshotStore(tmp_path / "snap.sqlite")
+    store.sync("1")
+
+    items = store.items("1", column_ids=["value"], match=("sector", "MINING"))
+    assert [i["id"] for i in items] == ["1", "3"]
+    assert all(i["column_values"] == [{"id": "value", "text": "10"}] for i in items)
+
+
+def test_store_adds_sweep_column_to_older_snapshots(tmp_path, board):
+    path = tmp_path / "snap.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE sync_state (board_id TEXT PRIMARY KEY, watermark TEXT, synced_at REAL NOT NULL)")
+    store = BoardSnapshotStore(path)
+    store.sync("1")
+
+    assert store.version("1") is not None
+
+
+def test_snapshot_sector_reads_skip_the_pandas_filter(tmp_path, board, monkeypatch):
+    sector_id = deals_tool._sector_column("mining")
+    items, _ = board
+    for item in items.values():
+        item["column_values"][0]["id"] = sector_id
+    store = BoardSnapshotStore(tmp_path / "snap.sqlite")
+    monkeypatch.setattr(deals_tool, "MONDAY_DEALS_BOARD_ID", "1")
+    monkeypatch.setattr(deals_tool, "get_snapshot_store", lambda: store)
+    tracer = Tracer()
+
+    df = deals_tool._load_monday(sector="mining", tracer=tracer, max_staleness=60)
+
+    assert df["Deal Name"].tolist() == ["Deal 1", "Deal 3"]
+    assert "pandas_filter" not in [step["step"] for step in tracer.dump()]
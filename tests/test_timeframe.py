@@ -0,0 +1,75 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.timeframe import DateIndex, filter_frame, resolve_timeframe
+
+TODAY = date(2025, 8, 20)
+
+
+@pytest.mark.parametrize(
+    "text, label, start, end",
+    [
+        ("this quarter", "this quarter", date(2025, 7, 1), date(2025, 10, 1)),
+        ("previous quarter", "last quarter", date(2025, 4, 1), date(2025, 7, 1)),
+        ("last month", "last month", date(2025, 7, 1), date(2025, 8, 1)),
+        ("this year", "this year", date(2025, 1, 1), date(2026, 1, 1)),
+        ("last 3 months", "last 3 months", date(2025, 5, 21), date(2025, 8, 21)),
+        ("past 2 weeks", "last 2 weeks", date(2025, 8, 7), date(2025, 8, 21)),
+        ("ytd", "year to date", date(2025, 1, 1), date(2025, 8, 21)),
+        ("q3 2024", "Q3 2024", date(2024, 7, 1), date(2024, 10, 1)),
+        ("2024q1", "Q1 2024", date(2024, 1, 1), date(2024, 4, 1)),
+        ("q2", "Q2 2025", date(2025, 4, 1), date(2025, 7, 1)),
+        ("march 2024", "March 2024", date(2024, 3, 1), date(2024, 4, 1)),
+        ("in february", "February 2025", date(2025, 2, 1), date(2025, 3, 1)),
+        ("2023", "2023", date(2023, 1, 1), date(2024, 1, 1)),
+        ("since 2025-06-15", "since 2025-06-15", date(2025, 6, 15), date(2025, 8, 21)),
+        ("from 2025-03-31 to 2025-01-01", "2025-01-01 to 2025-03-31", date(2025, 1, 1), date(2025, 4, 1)),
+    ],
+)
+def test_resolve_timeframe(text, label, start, end):
+    timeframe = resolve_timeframe(text, today=TODAY)
+
+    assert (timeframe.label, timeframe.start, timeframe.end) == (label, start, end)
+
+
+@pytest.mark.parametrize("text", ["", None, "all-time", "how is the pipeline", "deals closing in may"])
+def test_no_timeframe(text):
+    assert resolve_timeframe(text, today=TODAY) is None
+
+
+def test_last_n_months_clamps_month_end():
+    timeframe = resolve_timeframe("last 1 month", today=date(2025, 3, 31))
+
+    assert timeframe.start == date(2025, 3, 1)
+    assert timeframe.describe() == "last 1 month (2025-03-01 to 2025-03-31)"
+
+
+def test_date_index_selects_window_in_row_order():
+    dates = pd.Series(pd.to_datetime(["2025-03-05", None, "2025-01-10", "2025-02-28", "2025-03-01", None]))
+    rows, undated = DateIndex(dates).select(resolve_timeframe("q1 2025"), within=np.array([0, 1, 2, 3]))
+
+    assert list(rows) == [0, 2, 3]
+    assert undated == 1
+
+
+def test_filter_frame_counts_undated_rows():
+    df = pd.DataFrame({"when": ["2025-07-02", None, "2025-10-01", "not a date"]})
+    out = filter_frame(df, "when", resolve_timeframe("q3 2025"))
+
+    assert list(out.index) == [0]
+    assert out.attrs["undated_rows"] == 2
+    assert filter_frame(df, "missing", resolve_timeframe("q3 2025")).attrs["undated_rows"] == 4
+
+
+def test_filter_frame_without_index_skips_sorting(monkeypatch):
+    df = pd.DataFrame({"when": pd.to_datetime(["2025-03-05", None, "2025-01-10", "2025-04-01", "2025-02-28"])})
+    timeframe = resolve_timeframe("q1 2025")
+    indexed = filter_frame(df, "when", timeframe, index=DateIndex(df["when"]))
+    monkeypatch.setattr(DateIndex, "__init__", lambda self, series: pytest.fail("built a throwaway index"))
+    out = filter_frame(df, "when", timeframe)
+
+    pd.testing.assert_frame_equal(out, indexed)
+    assert out.attrs["undated_rows"] == indexed.attrs["undated_rows"] == 1
@@ -0,0 +1,92 @@
+import asyncio
+import tracemalloc
+
+import pytest
+
+from app.tools.trace import Tracer, trace_span
+
+
+def _by_step(tracer):
+    return {e["step"]: e for e in tracer.dump()}
+
+
+def test_spans_nest_and_children_complete_first():
+    tracer = Tracer(memory=False)
+    with tracer.span("request") as outer:
+        with tracer.span("fetch", "board=1") as inner:
+            tracer.add("page", "limit=500", rows=10)
+            inner.rows = 10
+        outer.detail = "done"
+
+    steps = _by_step(tracer)
+    assert [e["step"] for e in tracer.dump()] == ["page", "fetch", "request"]
+    assert steps["page"]["parent_id"] == steps["fetch"]["span_id"]
+    assert steps["fetch"]["parent_id"] == steps["request"]["span_id"]
+    assert [steps[s]["depth"] for s in ("request", "fetch", "page")] == [0, 1, 2]
+    assert steps["request"]["detail"] == "done" and steps["fetch"]["rows"] == 10
+    assert steps["request"]["ms"] >= steps["fetch"]["ms"] >= 0
+    assert steps["fetch"]["cpu_ms"] is not None
+
+    (root,) = tracer.tree()
+    assert root["step"] == "request"
+    assert root["children"][0]["children"][0]["step"] == "page"
+
+
+def test_failed_span_is_recorded_with_the_error():
+    tracer = Tracer(memory=False)
+    with pytest.raises(KeyError):
+        with tracer.span("lookup", "key=a"):
+            raise KeyError("a")
+
+    assert _by_step(tracer)["lookup"]["detail"] == "key=a, error=KeyError"
+
+
+def test_extend_attaches_child_roots_under_the_current_span():
+    parent, child = Tracer(memory=False), Tracer(memory=False)
+    with child.span("get_deals"):
+        child.add("decode", "", rows=3)
+    with parent.span("parallel_fetch"):
+        parent.extend(child)
+
+    steps = _by_step(parent)
+    assert steps["get_deals"]["parent_id"] == steps["parallel_fetch"]["span_id"]
+    assert steps["decode"]["parent_id"] == steps["get_deals"]["span_id"]
+
+
+def test_concurrent_tasks_keep_separate_parents():
+    tracer = Tracer(memory=False)
+
+    async def fetch(name):
+        with tracer.span(name):
+            await asyncio.sleep(0.01)
+            tracer.add(f"{name}_page", "")
+
+    async def main():
+        with tracer.span("parallel_fetch"):
+            await asyncio.gather(fetch("deals"), fetch("work_orders"))
+
+    asyncio.run(main())
+    steps = _by_step(tracer)
+    assert steps["deals_page"]["parent_id"] == steps["deals"]["span_id"]
+    assert steps["work_orders_page"]["parent_id"] == steps["work_orders"]["span_id"]
+
+
+def test_memory_peaks_are_reported_per_span():
+    tracing = tracemalloc.is_tracing()
+    tracer = Tracer(memory=True)
+    with tracer.span("outer"):
+        with tracer.span("allocate"):
+            block = bytearray(2_000_000)
+        del block
+    if not tracing:
+        tracemalloc.stop()
+
+    steps = _by_step(tracer)
+    assert steps["allocate"]["alloc_peak_kb"] >= 1900
+    assert steps["outer"]["alloc_peak_kb"] >= steps["allocate"]["alloc_peak_kb"]
+
+
+def test_trace_span_without_a_tracer_records_nothing():
+    with trace_span(None, "noop") as span:
+        span.rows = 1
+    assert span.tracer is None